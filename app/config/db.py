@@ -1,10 +1,13 @@
 import firebase_admin
 from firebase_admin import credentials, firestore
+from utils.structuredLog import get_logger
+
+log = get_logger("db")
 
 try:
   cred = credentials.Certificate("/app/secrets_db/news-agent.json")
   firebase_admin.initialize_app(cred)
 except Exception as e:
-  print(f"Error initializing Firestore: {e}")
+  log.error("firestore_init_failed", error=str(e))
   
 db = firestore.client()
\ No newline at end of file
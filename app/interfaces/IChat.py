@@ -10,6 +10,15 @@ class ResponseChat(BaseModel):
   prompt: str
   response: str
   session_id: str
+  cached: bool = False
+  cache_age_seconds: Optional[float] = None
+  
+class RequestBatchChat(BaseModel):
+  prompts: List[str]
+  
+class BatchChatItem(ResponseChat):
+  item: int
+  input_indexes: List[int]
   
 class SessionData(BaseModel):
   user_id: str
@@ -25,6 +34,18 @@ class MessageHistory(BaseModel):
 class SessionHistoryResponse(BaseModel):
   session_id: str
   messages: List[MessageHistory]
+  next_page_token: Optional[str] = None
   
 class DeleteSessionResponse(BaseModel):
-  message: str
\ No newline at end of file
+  message: str
+  
+class DeleteAllSessionsJob(BaseModel):
+  job_id: str
+  status: str
+  sessions_total: Optional[int] = None
+  sessions_deleted: int
+  sessions_failed: int = 0
+  messages_deleted: int
+  started_at: datetime
+  finished_at: Optional[datetime] = None
+  error: Optional[str] = None
@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from typing import Optional, List, Dict, Any
+
+class CompactArticle(BaseModel):
+  url: Optional[str] = None
+  title: Optional[str] = None
+  text: Optional[str] = ""
+  publish_date: Optional[str] = None
+  sentiment: Optional[float] = None
+
+class SearchNewsResult(BaseModel):
+  available: int = 0
+  offset: Optional[int] = None
+  number: Optional[int] = None
+  news: List[CompactArticle] = []
+  status: Optional[str] = None
+  error_message: Optional[str] = None
+
+class AgentRunResult(BaseModel):
+  text: str
+  tool_calls: Dict[str, Dict[str, Any]] = {}
+  tool_responses: Dict[str, Dict[str, Any]] = {}
+  search_queries: List[str] = []
+
+class VerificationOutcome(BaseModel):
+  text: str
+  persist: bool = False
+  cached: bool = False
+  cache_age_seconds: Optional[float] = None
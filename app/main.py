@@ -1,8 +1,44 @@
-from fastapi import FastAPI
-from routes import auth_router, chat_router, worldnewsapi_router, sessions_router
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from routes import auth_router, chat_router, worldnewsapi_router, sessions_router, stats_router, metrics_router
+from routes.sessions_router import NEXT_PAGE_HEADER
 from fastapi.middleware.cors import CORSMiddleware
+from services.worldnewsapi_async import api_scheduler, async_api
+from services.history_writer import history_writer
+from services.id_token_cache import id_token_cache
+from services.article_index import article_index, ARTICLE_INDEX_COMPACTION_INTERVAL
+from utils.metrics import REQUESTS_IN_FLIGHT, format_server_timing, start_request_timing
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+  await async_api.start()
+  history_writer.start()
+  id_token_cache.start_key_refresh()
+  if article_index is not None:
+    article_index.start_compaction(ARTICLE_INDEX_COMPACTION_INTERVAL)
+  yield
+  if article_index is not None:
+    await article_index.stop_compaction()
+  await id_token_cache.stop_key_refresh()
+  await history_writer.close()
+  await async_api.close()
+  api_scheduler.close()
+
+app = FastAPI(lifespan=lifespan)
+
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+  # Stages record into this request's timings; streamed responses only see stages done before the first byte.
+  timings = start_request_timing()
+  started = time.perf_counter()
+  REQUESTS_IN_FLIGHT.inc()
+  try:
+    response = await call_next(request)
+  finally:
+    REQUESTS_IN_FLIGHT.dec()
+  response.headers["Server-Timing"] = format_server_timing(timings, time.perf_counter() - started)
+  return response
 
 app.add_middleware(
   CORSMiddleware,
@@ -10,6 +46,7 @@ app.add_middleware(
   allow_credentials=True,
   allow_methods=["*"],
   allow_headers=["*"],
+  expose_headers=[NEXT_PAGE_HEADER],
 )
 
 @app.get("/")
@@ -19,4 +56,6 @@ def read_root():
 app.include_router(worldnewsapi_router.router_worldnewsapi)
 app.include_router(auth_router.auth_router)
 app.include_router(chat_router.chat_router)
-app.include_router(sessions_router.session_router)
\ No newline at end of file
+app.include_router(sessions_router.session_router)
+app.include_router(stats_router.stats_router)
+app.include_router(metrics_router.metrics_router)
\ No newline at end of file
@@ -1,20 +1,85 @@
-import json
-import uuid
+import os
 import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from pydantic import ValidationError
 from google.adk.agents.llm_agent import Agent
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.errors.already_exists_error import AlreadyExistsError
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
 from google.genai import types
+from interfaces.INews import AgentRunResult, CompactArticle, SearchNewsResult, VerificationOutcome
 from news_agent.tools import tools, fact_check_tools
-from starlette.concurrency import run_in_threadpool
-from services.worldnewsapi_client import ( 
-  extract_news
-)
+from services.news_cache import EXTRACTION_FAILED_SENTINEL, verdict_cache
+from services.worldnewsapi_async import ExtractionUnavailable, extract_article, search_news_by_text
+from news_agent.dedupe import collapse_near_duplicates
+from news_agent.query_builder import build_search_query, slug_query
+from news_agent.search_fanout import build_query_variants, reciprocal_rank_fusion, run_variants
+from news_agent.session_service import BoundedSessionService
+from news_agent.snippets import select_snippets
+from utils.canonicalUrl import canonicalize_url
+from utils.normalizeText import normalize_query
 from utils.saveHistory import save_chat_history_to_firestore
+from utils.singleFlight import SingleFlight
+from utils.metrics import record_cache, record_error, stage
+from utils.stats import LatencyStats, register_stats
+from utils.structuredLog import get_logger
+
+log = get_logger("pipeline")
 
 AGENT_NAME = "news_agent"
 APP_NAME = "example"
 GEMINI_MODEL = "gemini-2.5-flash"
+SEARCH_TOOL_NAME = "search_news"
+SEARCH_RESULTS_NUMBER = 3
+# Everything up to the next whitespace or quote, so hyphenated article slugs stay intact.
+URL_PATTERN = r"https?://[^\s<>\"']+"
+
+# Receives pipeline progress as (stage, data), e.g. ("sources_found", {"count": 3, ...}).
+StageEmitter = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+async def ignore_stage(stage: str, data: Dict[str, Any]):
+  pass
+
+# "local" builds the search query with rule-based keyword extraction and only
+# falls back to root_agent when that finds nothing; "agent" always uses root_agent.
+QUERY_BUILDER_MODE = os.getenv("QUERY_BUILDER_MODE", "local").lower()
+query_path_latency = LatencyStats()
+register_stats("query_builder", lambda: {"mode": QUERY_BUILDER_MODE, "paths": query_path_latency.stats()})
+
+# SimHash bit distance under which two articles count as the same story.
+DEDUPE_MAX_DISTANCE = int(os.getenv("DEDUPE_MAX_DISTANCE", "10"))
+DEDUPE_BACKFILL_ROUNDS = int(os.getenv("DEDUPE_BACKFILL_ROUNDS", "2"))
+dedupe_counters = {"collapsed": 0, "backfill_searches": 0}
+
+# Token budget shared by the text snippets of all articles in the fact-check prompt.
+SNIPPET_TOKEN_BUDGET = int(os.getenv("SNIPPET_TOKEN_BUDGET", "900"))
+register_stats("article_dedupe", lambda: dict(dedupe_counters))
+
+# In "local" mode the claim is searched as several variants at once (keywords,
+# entity filter, claim language, English) whose results are merged with
+# reciprocal-rank fusion. Variants still running after SEARCH_FANOUT_TIMEOUT
+# seconds are dropped, so the slowest allowed variant caps the stage.
+SEARCH_FANOUT_ENABLED = os.getenv("SEARCH_FANOUT_ENABLED", "true").lower() in ("1", "true", "yes")
+SEARCH_FANOUT_TIMEOUT = float(os.getenv("SEARCH_FANOUT_TIMEOUT", "5"))
+SEARCH_RRF_K = int(os.getenv("SEARCH_RRF_K", "60"))
+fanout_counters = {"searches": 0, "variants": 0, "timed_out": 0, "failed": 0, "fused_articles": 0}
+register_stats("search_fanout", lambda: {"enabled": SEARCH_FANOUT_ENABLED, **fanout_counters})
+
+def force_compact_search(tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext) -> Optional[Dict]:
+  # The pipeline only reads the compact projection, so never let the model ask for full articles.
+  if tool.name == SEARCH_TOOL_NAME:
+    args["compact"] = True
+  return None
+
+def stop_after_search(tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext, tool_response: Dict) -> Optional[Dict]:
+  # Ends the turn on the tool result: the pipeline reads the function_response
+  # event directly, so the model never has to echo the articles back as text.
+  if tool.name == SEARCH_TOOL_NAME:
+    tool_context.actions.skip_summarization = True
+  return None
 
 root_agent = Agent(
   name=AGENT_NAME,
@@ -26,14 +91,12 @@ root_agent = Agent(
   2.  If the query is a question like "Is it true that...", extract the main claim (e.g., "Earth will explode").
   3.  If the query is a news headline, extract the key entities and concepts.
   4.  You MUST call the 'search_news' tool using these refined keywords in the 'text' parameter.
-  5.  You MUST set the 'number' parameter to 3.
-  6.  You MUST return ONLY the raw JSON output from the tool call.
-  
-  Do not add any text, markdown (like ```json), or thoughts. Your output must be a valid, parseable JSON object.
-  If the tool returns no results, return the empty JSON provided by the tool (e.g., {"available": 0, "news": []}).
-  DO NOT say "No results found" in text.
+  5.  You MUST set the 'number' parameter to 3 and the 'compact' parameter to true.
+  6.  Call the tool exactly once. Its result is returned to the user automatically, so do not repeat it.
   """,
-  tools=tools
+  tools=tools,
+  before_tool_callback=force_compact_search,
+  after_tool_callback=stop_after_search
 )
 
 fact_checker_agent = Agent(
@@ -69,65 +132,95 @@ The news that support this veredict are:
   tools=fact_check_tools
 )
 
-session_service = InMemorySessionService()
+# Sessions only hold the working context of each agent (the chat history lives in Firestore),
+# so they are bounded and evicted instead of growing for the life of the process.
+session_service = BoundedSessionService(
+  max_sessions=int(os.getenv("SESSION_MAX_SESSIONS", "5000")),
+  idle_ttl=float(os.getenv("SESSION_IDLE_TTL", "3600")),
+  max_bytes=int(os.getenv("SESSION_MAX_BYTES", str(128 * 1024 * 1024))),
+  max_events=int(os.getenv("SESSION_MAX_EVENTS", "20")),
+  max_tokens=int(os.getenv("SESSION_MAX_TOKENS", "8000"))
+)
+register_stats("agent_sessions", session_service.stats)
+
+verification_flight = SingleFlight()
+register_stats("verification_single_flight", verification_flight.stats)
+
+def agent_app_name(agent: Agent) -> str:
+  # Each agent gets its own session namespace, so the fact-checker's context
+  # never contains Agent 1's tool traffic.
+  return f"{APP_NAME}.{agent.name}"
+
+# Built once at startup and reused by every request.
+runners = {
+  agent.name: Runner(agent=agent, app_name=agent_app_name(agent), session_service=session_service)
+  for agent in (root_agent, fact_checker_agent)
+}
 
 async def get_runner_and_session(user_id: str, session_id: str, agent: Agent):
-  session = None
-  try:
-    session = await session_service.create_session(
-      app_name=APP_NAME,
-      user_id=user_id,
-      session_id=session_id
-    )
-    
-  except Exception as e:
-    msg = str(e)
-    
-    if "AlreadyExists" in msg or "already exists" in msg:
-      
-      try:
-        session = await session_service.get_session(
-          app_name=APP_NAME, 
-          user_id=user_id, 
-          session_id=session_id
-        )
+  runner = runners[agent.name]
+  app_name = agent_app_name(agent)
 
-      except Exception as retrieve_error:
-        print(f"ERROR: Fallo al recuperar la sesión existente: {retrieve_error}")
-        raise retrieve_error
+  session = await session_service.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+  if session is None:
+    try:
+      session = await session_service.create_session(app_name=app_name, user_id=user_id, session_id=session_id)
+    except AlreadyExistsError:
+      # Another request created it between our lookup and create.
+      session = await session_service.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
 
-    else:
-      raise
-    
   if session is None:
-    raise RuntimeError("Failed to obtain a session object. Check the inner exception details.")
-  
-  runner = Runner(
-      agent=agent,
-      app_name=APP_NAME,
-      session_service=session_service
-    )
-  
-    
+    raise RuntimeError(f"Failed to obtain session '{session_id}' for agent '{agent.name}'.")
+
   return runner, session
 
-async def call_agent_async(runner_instance: Runner, session_id: str, query: str, user_id: str) -> str:
+async def call_agent_async(
+  runner_instance: Runner,
+  session_id: str,
+  query: str,
+  user_id: str,
+  on_text: Optional[Callable[[str], Awaitable[None]]] = None
+) -> AgentRunResult:
   content = types.Content(role="user", parts=[types.Part(text=query)])
+  # With on_text the model output is streamed and every partial text chunk is forwarded.
+  run_config = RunConfig(streaming_mode=StreamingMode.SSE) if on_text else None
   
   final_response_text = "Error: No final text response captured." # Default
+  tool_calls = {}
+  tool_responses = {}
+  search_queries = []
   try:
     async for event in runner_instance.run_async(
-      user_id=user_id, session_id=session_id, new_message=content
+      user_id=user_id, session_id=session_id, new_message=content, run_config=run_config
     ):
       has_specific_part = False
+
+      if event.partial:
+        if on_text and event.content and event.content.parts:
+          chunk = "".join(part.text for part in event.content.parts if part.text)
+          if chunk:
+            await on_text(chunk)
+        continue
+
+      for function_call in event.get_function_calls():
+        tool_calls[function_call.name] = dict(function_call.args or {})
+
+      # Tool results are taken as-is from the event stream instead of being parsed out of the model's text.
+      for function_response in event.get_function_responses():
+        tool_responses[function_response.name] = function_response.response or {}
+        log.debug("function_response_captured", tool=function_response.name)
+
+      # google_search runs inside the model call; its queries only show up as grounding metadata.
+      if event.grounding_metadata and event.grounding_metadata.web_search_queries:
+        search_queries.extend(event.grounding_metadata.web_search_queries)
       
       if event.content and event.content.parts:
         for part in event.content.parts:
           if part.executable_code:
-            print(f"  Debug: Agent generated code: {part.executable_code.code}")
+            log.debug("agent_generated_code", code=part.executable_code.code)
             has_specific_part = True
           elif part.code_execution_result:
-            print(f"  Debug: Code Execution Result: {part.code_execution_result.outcome}")
+            log.debug("code_execution_result", outcome=part.code_execution_result.outcome)
             has_specific_part = True
             
       # Capturamos la respuesta final de texto
@@ -138,24 +231,49 @@ async def call_agent_async(runner_instance: Runner, session_id: str, query: str,
           and event.content.parts[0].text
         ):
           final_response_text = event.content.parts[0].text.strip()
-          print(f"==> Final Agent Response (Raw Text): {final_response_text}")
+          log.debug("agent_final_response", text=final_response_text)
+          break
+        elif tool_responses:
+          # The run ended on a tool result (Agent 1's search); the caller reads that, not the text.
+          log.debug("agent_final_response_tool_only", tools=list(tool_responses))
           break
         else:
-          print("==> Final Agent Response: [No text content in final event]")
+          log.warning("agent_final_response_empty")
           break
 
   except Exception as e:
-    print(f"ERROR during agent run: {e}")
+    log.error("agent_run_failed", error=str(e))
     final_response_text = f"Error: {e}"
     
-  print("Agent run completed.")
-  return final_response_text
+  log.debug("agent_run_completed", tools=list(tool_calls), search_queries=len(search_queries))
+  return AgentRunResult(text=final_response_text, tool_calls=tool_calls, tool_responses=tool_responses, search_queries=search_queries)
+
 
+async def run_verification_pipeline(user_id: str, query: str, session_id: str) -> VerificationOutcome:
+  outcome = await verify(user_id, query, session_id)
 
-async def run_verification_pipeline(user_id: str, query: str, session_id: str) -> str:
+  # The write-behind queue commits the turn later; the response does not wait for Firestore.
+  if outcome.persist:
+    await save_chat_history_to_firestore(user_id, session_id, query, outcome.text)
   
+  return outcome
+
+
+def verification_key(query: str) -> str:
+  """Key under which identical verifications are shared: the canonical URL, or the normalized claim."""
   cleaned_query = query.strip().rstrip('?').strip()
-  url_match = re.search(r"https://?[\w./-?&=]+", cleaned_query)
+  url_match = re.search(URL_PATTERN, cleaned_query)
+  return f"url:{canonicalize_url(url_match.group(0))}" if url_match else f"query:{normalize_query(cleaned_query)}"
+
+
+async def verify(user_id: str, query: str, session_id: str, emit: Optional[StageEmitter] = None) -> VerificationOutcome:
+  """
+  Runs the pipeline without writing history, so callers decide when to
+  persist. Progress is reported through emit(stage, data) when given.
+  """
+  
+  cleaned_query = query.strip().rstrip('?').strip()
+  url_match = re.search(URL_PATTERN, cleaned_query)
   
   general_chat_keywords = [
     'hola', 'resumen', 'dame las noticias', 'qué haces', 'buenos días', 
@@ -165,114 +283,293 @@ async def run_verification_pipeline(user_id: str, query: str, session_id: str) -
   is_general_chat = any(keyword in cleaned_query.lower() for keyword in general_chat_keywords)
   
   if is_general_chat and not url_match: 
-    print("DEBUG: General query detected. Responding directly.")
+    log.info("general_chat_detected")
     response_text = "I am a news verification agent. Please send me a specific question (e.g., 'Is it true that...') or a link to verify."
 
-    await run_in_threadpool(save_chat_history_to_firestore, user_id, session_id, query, response_text)
-    return response_text
-
-  runner_1, session_1 = await get_runner_and_session(user_id, session_id, root_agent)
-  runner_2, session_2 = await get_runner_and_session(user_id, session_id, fact_checker_agent) 
-  
+    return VerificationOutcome(text=response_text, persist=True)
+
+  url = url_match.group(0) if url_match else None
+  # The run uses the caller's agent sessions, so only the same user's identical requests share it.
+  flight_key = f"{user_id}:{verification_key(query)}"
+
+  # Identical concurrent requests share one run; each caller still writes its own history.
+  # Only the caller that started the run receives its stage events.
+  if emit and verification_flight.is_in_flight(flight_key):
+    await emit("coalesced", {"message": "Joined an identical verification already in progress."})
+
+  return await verification_flight.do(
+    flight_key,
+    lambda: verify_query(user_id, query, session_id, cleaned_query, url, emit)
+  )
+
+
+def article_from_search(article: CompactArticle) -> Dict[str, str]:
+  return {
+    "url": article.url,
+    "title": article.title or "No Title",
+    "text": article.text or ""
+  }
+
+
+async def fan_out_search(text: str, language: Optional[str]) -> Tuple[Optional[SearchNewsResult], Optional[str]]:
+  """
+  Searches every query variant of text concurrently and returns the fused
+  ranking, plus the keywords variant's text for backfill paging (None when
+  that variant did not answer). The result is None when no variant found
+  anything.
+  """
+  variants = build_query_variants(text, language)
+  if not variants:
+    return None, None
+
+  with stage("search_fanout"):
+    responses, timed_out = await run_variants(search_news_by_text, variants, SEARCH_RESULTS_NUMBER, SEARCH_FANOUT_TIMEOUT)
+
+  results = {}
+  for name, _ in variants:
+    if name in responses:
+      result = SearchNewsResult.model_validate(responses[name])
+      if result.status != "error":
+        results[name] = result
+
+  fanout_counters["searches"] += 1
+  fanout_counters["variants"] += len(variants)
+  fanout_counters["timed_out"] += len(timed_out)
+  fanout_counters["failed"] += len(responses) - len(results)
+  if timed_out:
+    log.warning("search_variants_timed_out", variants=timed_out, timeout_seconds=SEARCH_FANOUT_TIMEOUT)
+
+  fused = reciprocal_rank_fusion([[article.model_dump() for article in result.news] for result in results.values()], SEARCH_RRF_K)
+  fanout_counters["fused_articles"] += len(fused)
+  log.info("search_variants_fused", variants=list(results), articles=len(fused))
+  if not fused:
+    return None, None
+
+  search_text = variants[0][1]["text"] if "keywords" in results else None
+  fused_response = SearchNewsResult(available=max(result.available for result in results.values()), news=fused)
+  return fused_response, search_text
+
+
+async def collapse_and_backfill(
+  articles: List[Dict[str, str]],
+  search_text: Optional[str],
+  offset: int,
+  available: int,
+  pinned: int
+) -> List[Dict[str, str]]:
+  """
+  Collapses near-duplicate articles (e.g. the same wire story syndicated by
+  several outlets) and fetches further pages of the same search until there
+  are enough distinct sources again, or DEDUPE_BACKFILL_ROUNDS run out.
+  """
+  target = SEARCH_RESULTS_NUMBER + pinned
+  distinct = collapse_near_duplicates(articles, DEDUPE_MAX_DISTANCE, pinned)
+  collapsed = len(articles) - len(distinct)
+
+  rounds = 0
+  while search_text and len(distinct) < target and rounds < DEDUPE_BACKFILL_ROUNDS and offset < available:
+    rounds += 1
+    more = SearchNewsResult.model_validate(
+      await search_news_by_text(search_text, number=SEARCH_RESULTS_NUMBER, offset=offset)
+    )
+    if more.status == "error" or not more.news:
+      break
+
+    offset += len(more.news)
+    seen_urls = {article["url"] for article in distinct}
+    candidates = distinct + [article_from_search(a) for a in more.news if a.url and a.url not in seen_urls]
+    distinct = collapse_near_duplicates(candidates, DEDUPE_MAX_DISTANCE, pinned)
+    collapsed += len(candidates) - len(distinct)
+
+  dedupe_counters["collapsed"] += collapsed
+  dedupe_counters["backfill_searches"] += rounds
+  if collapsed:
+    log.info("near_duplicates_collapsed", collapsed=collapsed, backfill_searches=rounds)
+
+  return distinct[:target]
+
+
+async def verify_query(
+  user_id: str,
+  query: str,
+  session_id: str,
+  cleaned_query: str,
+  url: Optional[str],
+  emit: Optional[StageEmitter] = None
+) -> VerificationOutcome:
+  stream_verdict = emit is not None
+  emit = emit or ignore_stage
   search_query_for_agent1 = ""
+  claim_language = None
   original_article_data = None
   article_data_list = []
 
   try:
-    if url_match:
-      url = url_match.group(0)
-      print(f"DEBUG: URL detected. Extracting content from: {url}")
+    if url:
+      log.info("url_detected", url=url)
       
       try:
-        article = await run_in_threadpool(extract_news, url=url)
-        
+        with stage("url_extraction"):
+          article = await extract_article(url=url)
+
+      except ExtractionUnavailable as e:
+        # Slow or failing publisher: search with the words of the URL path instead of waiting for its title.
+        article = None
+        search_query_for_agent1 = slug_query(url)
+        log.warning("url_extraction_unavailable", url=url, reason=str(e), fallback_query=search_query_for_agent1)
+        if not search_query_for_agent1:
+          return VerificationOutcome(text="Error: I could not extract the content from the URL you provided. The link might be broken or it might not be a news article.")
+        await emit("article_unavailable", {"url": url, "query": search_query_for_agent1})
+
+      except Exception as e:
+        log.error("url_extraction_error", url=url, error=str(e))
+        return VerificationOutcome(text=f"Error processing the URL: {e}")
+
+      if article is not None:
         if (article and article.get("title") and 
             article.get("text") and 
-            "try searching for it instead" not in article.get("title", "").lower()):
+            EXTRACTION_FAILED_SENTINEL not in article.get("title", "").lower()):
           
           search_query_for_agent1 = article['title']
+          claim_language = article.get("language")
           original_article_data = {
               "url": article.get("url"),
               "title": article.get("title"),
-              "text": article.get("text", "")[:1500]
+              "text": article.get("text", "")
           }
           article_data_list.append(original_article_data)
-          print(f"DEBUG: Title extracted: '{search_query_for_agent1}'. Searching for similar articles...")
+          log.info("title_extracted", title=search_query_for_agent1)
+          await emit("article_extracted", {"url": original_article_data["url"], "title": original_article_data["title"]})
         else:
-          print(f"ERROR: Could not extract content from URL: {url}. API Response: {article}")
-          return "Error: I could not extract the content from the URL you provided. The link might be broken or it might not be a news article."
-      except Exception as e:
-        print(f"Error extracting individual URL {url}: {e}")
-        return f"Error processing the URL: {e}"
+          record_error("url_extraction")
+          log.warning("url_extraction_failed", url=url, response=article)
+          return VerificationOutcome(text="Error: I could not extract the content from the URL you provided. The link might be broken or it might not be a news article.")
 
     else:
-      print("DEBUG: Text query detected. Searching for articles...")
+      log.info("text_query_detected")
       search_query_for_agent1 = cleaned_query
 
-    print(f"Starting Agent 1 with search query: '{search_query_for_agent1}'")
-    agent_1_result = await call_agent_async(runner_1, session_1.id, search_query_for_agent1, user_id)
-    print(f"DEBUG | Raw response from Agent 1: {agent_1_result[:500]}...")
-
-    match = re.search(r'\{.*\}', agent_1_result, re.DOTALL)
-    if not match:
-      print(f"ERROR: No valid JSON found in Agent 1's response. Response: {agent_1_result}")
-      if "No final text response captured" in agent_1_result:
-        return "Error: Agent 1 did not produce a response."
-      
-      return f"Agent 1 did not return news: {agent_1_result}"
-
-    json_string = match.group(0)
-    news_data = json.loads(json_string)
-
-    search_response = news_data.get("search_news_response", news_data)
-
-    if search_response.get("status") == "error":
-      raise Exception(f"News API returned an error: {search_response.get('error_message')}")
-
-    if "news" in search_response and search_response.get("available", 0) > 0:
-      print("DEBUG: Processing 'search_news' response")
-      for article in search_response["news"]:
-        if article.get("url") and (not original_article_data or article.get("url") != original_article_data["url"]):
-          article_data_list.append({
-            "url": article.get("url"),
-            "title": article.get("title", "No Title"),
-            "text": article.get("text", "")[:1500]
-          })
+    search_response = None
+    search_text = None
+    # Where the next page of search_text starts when backfilling after deduplication.
+    next_offset = SEARCH_RESULTS_NUMBER
+    # Set when the local query found nothing: the agent_fallback path times the local attempt plus the agent run.
+    fallback_started = None
+
+    if QUERY_BUILDER_MODE == "local":
+      started = time.perf_counter()
+      if SEARCH_FANOUT_ENABLED:
+        search_response, search_text = await fan_out_search(search_query_for_agent1, claim_language)
+      else:
+        local_query = build_search_query(search_query_for_agent1)
+        log.info("local_query_built", query=local_query)
+
+        if local_query:
+          search_text = local_query
+          search_response = SearchNewsResult.model_validate(
+            await search_news_by_text(local_query, number=SEARCH_RESULTS_NUMBER)
+          )
+      query_path_latency.record("local", time.perf_counter() - started)
+
+      if search_response is None or search_response.status == "error" or not search_response.news:
+        log.info("local_query_empty_falling_back")
+        fallback_started = started
+        search_response = None
+
+    if search_response is None:
+      started = time.perf_counter()
+      log.info("agent1_started", query=search_query_for_agent1)
+      runner_1, session_1 = await get_runner_and_session(user_id, session_id, root_agent)
+      with stage("agent1"):
+        agent_1_result = await call_agent_async(runner_1, session_1.id, search_query_for_agent1, user_id)
+      query_path_latency.record("agent", time.perf_counter() - started)
+      if fallback_started is not None:
+        query_path_latency.record("agent_fallback", time.perf_counter() - fallback_started)
+
+      search_payload = agent_1_result.tool_responses.get(SEARCH_TOOL_NAME)
+      if search_payload is None:
+        record_error("agent1")
+        log.warning("agent1_did_not_search", tool=SEARCH_TOOL_NAME, response=agent_1_result.text)
+        if "No final text response captured" in agent_1_result.text:
+          return VerificationOutcome(text="Error: Agent 1 did not produce a response.")
+        
+        return VerificationOutcome(text=f"Agent 1 did not return news: {agent_1_result.text}")
+
+      search_response = SearchNewsResult.model_validate(search_payload)
+      search_text = agent_1_result.tool_calls.get(SEARCH_TOOL_NAME, {}).get("text")
+      next_offset = len(search_response.news)
+
+    if search_response.status == "error":
+      raise Exception(f"News API returned an error: {search_response.error_message}")
+
+    if search_response.available > 0 and search_response.news:
+      log.debug("search_results_received", count=len(search_response.news), available=search_response.available)
+      for article in search_response.news:
+        if article.url and (not original_article_data or article.url != original_article_data["url"]):
+          article_data_list.append(article_from_search(article))
+
+      article_data_list = await collapse_and_backfill(
+        article_data_list,
+        search_text,
+        offset=next_offset,
+        available=search_response.available,
+        pinned=1 if original_article_data else 0
+      )
     else:
-      print("DEBUG: 'search_news' did not return additional articles.")
+      log.info("search_returned_nothing")
       # If no similar articles are found, continue with only the original (if it exists)
 
-  except json.JSONDecodeError as e:
-    print(f"ERROR: Agent 1's result is not valid JSON: {e}. Parsed string: {json_string[:200]}...")
-    return f"Format Error (Code 1.1): The agent returned an unreadable response. Please try rephrasing your query."
+  except ValidationError as e:
+    log.error("search_result_invalid", error=str(e))
+    return VerificationOutcome(text="Format Error (Code 1.1): The agent returned an unreadable response. Please try rephrasing your query.")
   
   except Exception as e:
-    print(f"FATAL ERROR processing Agent 1 response: {e}")
-    return f"Unexpected error processing the first agent's response: {e}"
+    log.error("search_stage_failed", error=str(e))
+    return VerificationOutcome(text=f"Unexpected error processing the first agent's response: {e}")
   
   if not article_data_list:
-    return "No relevant news articles were found for that query."
+    return VerificationOutcome(text="No relevant news articles were found for that query.")
   
-  print(f"Total articles for Agent 2: {len(article_data_list)}. URLs: {[a['url'] for a in article_data_list]}")
+  log.info("sources_selected", count=len(article_data_list), urls=[a['url'] for a in article_data_list])
+  await emit("sources_found", {"count": len(article_data_list), "urls": [a['url'] for a in article_data_list]})
   
   fact_check_prompt = f"User query: '{query}'\n\nPlease analyze the following articles and determine the veracity of the user's query:\n\n"
   
-  for i, article in enumerate(article_data_list):
+  # Only the passages most relevant to the claim are sent, within one budget for the whole prompt.
+  # For a URL the raw query shares no words with the articles; the extracted title does.
+  snippets = select_snippets(search_query_for_agent1 or query, article_data_list, SNIPPET_TOKEN_BUDGET)
+  
+  for i, (article, snippet) in enumerate(zip(article_data_list, snippets)):
     fact_check_prompt += f"--- Article {i+1} ---\n"
     fact_check_prompt += f"URL: {article['url']}\n"
     fact_check_prompt += f"Title: {article['title']}\n"
-    fact_check_prompt += f"Text Snippet: {article['text']}...\n\n"
-
-  print(f"Sending consolidated prompt to Agent 2 (Fact-Checker)...")
+    fact_check_prompt += f"Text Snippet: {snippet}...\n\n"
+
+  verdict_query = normalize_query(query)
+  article_urls = [a['url'] for a in article_data_list]
+  cached_verdict = verdict_cache.get(verdict_query, article_urls)
+  record_cache("verdict", cached_verdict is not None)
+  if cached_verdict is not None:
+    verdict_text, age = cached_verdict
+    log.info("verdict_cache_hit", age_seconds=round(age, 1))
+    return VerificationOutcome(text=verdict_text, persist=True, cached=True, cache_age_seconds=round(age, 1))
+
+  log.info("agent2_started", prompt_chars=len(fact_check_prompt))
   
-  final_response_text = await call_agent_async(runner_2, session_2.id, fact_check_prompt, user_id)
+  runner_2, session_2 = await get_runner_and_session(user_id, session_id, fact_checker_agent)
+  with stage("agent2"):
+    agent_2_result = await call_agent_async(
+      runner_2, session_2.id, fact_check_prompt, user_id,
+      on_text=(lambda chunk: emit("verdict_delta", {"text": chunk})) if stream_verdict else None
+    )
+  # google_search runs inside the model call and cannot be timed apart from it; only its queries are counted.
+  final_response_text = agent_2_result.text
   
-  print(f"Final response from Agent 2: {final_response_text}")
+  log.info("agent2_completed", response=final_response_text, google_search_queries=len(agent_2_result.search_queries))
 
-  await run_in_threadpool(save_chat_history_to_firestore, user_id, session_id, query, final_response_text)
+  if final_response_text.startswith("Error"):
+    record_error("agent2")
+  else:
+    verdict_cache.set(verdict_query, article_urls, final_response_text)
   
-  return final_response_text
-
-
-
-
+  return VerificationOutcome(text=final_response_text, persist=True)
@@ -0,0 +1,63 @@
+import hashlib
+import re
+from typing import Any, Dict, List
+
+SIMHASH_BITS = 64
+SHINGLE_SIZE = 3
+
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> List[str]:
+  words = WORD_PATTERN.findall(text.lower())
+  if len(words) <= size:
+    return [" ".join(words)] if words else []
+  return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+def simhash(text: str) -> int:
+  """64-bit SimHash over word shingles: near-identical texts differ in only a few bits."""
+  weights = [0] * SIMHASH_BITS
+  for shingle in shingles(text):
+    value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+    for bit in range(SIMHASH_BITS):
+      weights[bit] += 1 if value >> bit & 1 else -1
+
+  fingerprint = 0
+  for bit, weight in enumerate(weights):
+    if weight > 0:
+      fingerprint |= 1 << bit
+  return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+  return bin(a ^ b).count("1")
+
+
+def article_fingerprint(article: Dict[str, Any]) -> int:
+  return simhash(f"{article.get('title') or ''} {article.get('text') or ''}")
+
+
+def collapse_near_duplicates(articles: List[Dict[str, Any]], max_distance: int, pinned: int = 0) -> List[Dict[str, Any]]:
+  """
+  Keeps one representative per group of near-duplicate articles (SimHash
+  distance <= max_distance), preserving the original order.
+
+  The first `pinned` articles (e.g. the article the user linked) always
+  represent their group. Otherwise the representative is the article with
+  the most text, since the fact-checker gets more to work with.
+  """
+  groups: List[Dict[str, Any]] = []
+
+  for index, article in enumerate(articles):
+    fingerprint = article_fingerprint(article)
+    group = next((g for g in groups if hamming_distance(g["fingerprint"], fingerprint) <= max_distance), None)
+
+    if group is None:
+      groups.append({"fingerprint": fingerprint, "article": article, "pinned": index < pinned})
+      continue
+
+    if not group["pinned"] and len(article.get("text") or "") > len(group["article"].get("text") or ""):
+      group["article"] = article
+
+  return [group["article"] for group in groups]
@@ -0,0 +1,123 @@
+import re
+from typing import List
+from urllib.parse import unquote, urlsplit
+
+# Maximum length of the 'text' parameter accepted by search_news.
+MAX_QUERY_CHARS = 100
+MAX_TERMS = 5
+
+CLAIM_PATTERNS = [
+  r"^(?:is it (?:true|real|correct|a fact) that|is it true|did you know that|true or false:?|fact check:?|verify( that)?:?)\s+",
+  r"^(?:es (?:verdad|cierto|real) que|ser[aá] (?:verdad|cierto) que|es verdad|verifica(?:r)?(?: que)?:?|(?:me )?confirmas que)\s+",
+]
+
+STOP_WORDS = {
+  # English
+  "a", "about", "after", "again", "against", "all", "also", "am", "an", "and", "any", "are", "as", "at",
+  "be", "because", "been", "before", "being", "between", "both", "but", "by", "can", "could", "did", "do",
+  "does", "doing", "down", "during", "each", "few", "for", "from", "further", "had", "has", "have", "having",
+  "he", "her", "here", "hers", "him", "his", "how", "i", "if", "in", "into", "is", "it", "its", "just", "me",
+  "more", "most", "my", "no", "nor", "not", "now", "of", "off", "on", "once", "only", "or", "other", "our",
+  "out", "over", "own", "really", "said", "same", "says", "she", "should", "so", "some", "such", "than", "that",
+  "the", "their", "them", "then", "there", "these", "they", "this", "those", "through", "to", "too", "true",
+  "under", "until", "up", "very", "was", "we", "were", "what", "when", "where", "which", "while", "who",
+  "whom", "why", "will", "with", "would", "you", "your", "news", "today", "yesterday", "according",
+  # Spanish
+  "al", "algo", "algunos", "ante", "antes", "aqui", "aquí", "como", "cómo", "con", "contra", "cual", "cuál",
+  "cuando", "cuándo", "de", "del", "desde", "donde", "dónde", "durante", "el", "él", "ella", "ellas", "ellos",
+  "en", "entre", "era", "es", "esa", "ese", "eso", "esta", "está", "estaba", "estado", "están", "este", "esto",
+  "fue", "fueron", "ha", "han", "hay", "hoy", "la", "las", "le", "les", "lo", "los", "más", "mas", "me", "mi",
+  "muy", "nada", "ni", "no", "nos", "nosotros", "noticia", "noticias", "o", "otra", "otro", "para", "pero",
+  "por", "porque", "qué", "que", "quien", "quién", "se", "sea", "ser", "será", "si", "sí", "sin", "sobre",
+  "son", "su", "sus", "también", "tiene", "todo", "todos", "tras", "un", "una", "uno", "unos", "verdad",
+  "cierto", "y", "ya", "yo", "ayer", "dice", "dicen", "según",
+}
+
+TOKEN_PATTERN = re.compile(r"[\w'’-]+", re.UNICODE)
+
+
+def extract_claim(text: str) -> str:
+  """Removes question wrappers like "Is it true that..." or "¿Es verdad que...", keeping the claim."""
+  claim = (text or "").strip().lstrip("¿¡").rstrip("?!. ").strip()
+  for pattern in CLAIM_PATTERNS:
+    claim = re.sub(pattern, "", claim, flags=re.IGNORECASE)
+  return claim.strip()
+
+
+def close_phrase(phrase: List[str]) -> str:
+  """Trims stop words from the ends of a capitalized run ("The New York Times" -> "New York Times")."""
+  while phrase and phrase[0].lower() in STOP_WORDS:
+    phrase = phrase[1:]
+  while phrase and phrase[-1].lower() in STOP_WORDS:
+    phrase = phrase[:-1]
+  if len(phrase) > 1:
+    return f"\"{' '.join(phrase)}\""
+  return phrase[0] if phrase else ""
+
+
+def extract_terms(claim: str) -> List[str]:
+  """
+  Returns search terms in priority order: capitalized phrases (entity-ish,
+  quoted when they span several words) first, then the remaining keywords.
+  """
+  tokens = TOKEN_PATTERN.findall(claim)
+  entities, keywords = [], []
+  phrase: List[str] = []
+
+  for token in tokens + [""]:
+    if token[:1].isupper():
+      phrase.append(token)
+      continue
+
+    if phrase:
+      entity = close_phrase(phrase)
+      if entity:
+        entities.append(entity)
+      phrase = []
+
+    lowered = token.lower()
+    if token and lowered not in STOP_WORDS and len(token) > 2 and not token.isdigit():
+      keywords.append(lowered)
+
+  terms = []
+  for term in entities + keywords:
+    if term.lower() not in (t.lower() for t in terms):
+      terms.append(term)
+  return terms
+
+
+def build_search_query(text: str) -> str:
+  """
+  Builds the 'text' parameter for search_news from a user query or an
+  article title without calling the LLM. Returns an empty string when
+  nothing searchable is left.
+  """
+  query = ""
+  for term in extract_terms(extract_claim(text))[:MAX_TERMS]:
+    candidate = f"{query} {term}".strip()
+    if len(candidate) > MAX_QUERY_CHARS:
+      break
+    query = candidate
+  return query
+
+
+def slug_query(url: str) -> str:
+  """
+  Builds a search query from the slug in an article URL's path, for when the
+  article itself cannot be extracted: ".../2024/05/ecb-cuts-rates-again.html"
+  becomes "ecb cuts rates again". Numeric segments and ids are ignored.
+  Returns an empty string when the path has no readable words.
+  """
+  segments = [unquote(segment) for segment in urlsplit(url).path.split("/") if segment]
+  words_per_segment = []
+  for segment in segments:
+    segment = re.sub(r"\.\w{2,5}$", "", segment)
+    words = [word for word in re.split(r"[-_+.]+", segment) if word and not any(char.isdigit() for char in word)]
+    words_per_segment.append(words)
+
+  # The slug is the segment with the most words; section names like "world" or "article" are single
+  # words and too generic to search for on their own.
+  slug = max(words_per_segment, key=len, default=[])
+  if len(slug) < 2:
+    return ""
+  return build_search_query(" ".join(slug))
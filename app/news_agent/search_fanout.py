@@ -0,0 +1,191 @@
+import asyncio
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from news_agent.query_builder import MAX_QUERY_CHARS, MAX_TERMS, TOKEN_PATTERN, extract_claim, extract_terms
+from utils.canonicalUrl import canonicalize_url
+
+# Words that only show up in one of the two languages the query builder knows.
+LANGUAGE_MARKERS = {
+  "en": {"the", "is", "are", "was", "were", "that", "of", "and", "did", "does", "has", "have", "will", "true", "with", "from"},
+  "es": {"el", "la", "los", "las", "es", "son", "que", "de", "del", "y", "fue", "ha", "han", "verdad", "cierto", "con", "por", "según"},
+}
+
+# A capitalized phrase ending in one of these is filtered as an organization.
+ORG_MARKERS = {
+  "agency", "airlines", "association", "bank", "board", "commission", "committee", "company", "corp", "corporation",
+  "council", "court", "department", "fund", "group", "inc", "ministry", "motors", "nations", "organization",
+  "parliament", "party", "senate", "union", "university",
+  "agencia", "banco", "comisión", "consejo", "corte", "ministerio", "partido", "senado", "secretaría", "universidad",
+}
+ORG_PREFIXES = {"banco", "partido", "ministerio", "secretaría", "universidad", "comisión", "consejo", "corte", "senado"}
+
+# Capitalized words that show a phrase is a title, place or date rather than a person's name.
+NON_NAME_WORDS = {
+  "president", "minister", "prime", "secretary", "general", "governor", "mayor", "senator", "chancellor", "king",
+  "queen", "prince", "pope", "ceo", "chief", "director", "judge", "house", "city", "state", "states", "united",
+  "kingdom", "republic", "north", "south", "east", "west", "new", "street", "island", "day", "cup", "world",
+  "presidente", "presidenta", "ministro", "ministra", "secretario", "gobernador", "alcalde", "senador", "rey",
+  "reina", "papa", "ciudad", "estado", "estados", "unidos", "reino", "unido", "república", "norte", "sur", "casa",
+  "january", "february", "march", "april", "may", "june", "july", "august", "september", "october", "november",
+  "december", "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday",
+  "enero", "febrero", "marzo", "abril", "mayo", "junio", "julio", "agosto", "septiembre", "octubre", "noviembre",
+  "diciembre", "lunes", "martes", "miércoles", "jueves", "viernes", "sábado", "domingo",
+}
+MAX_NAME_WORDS = 4
+
+MAX_ENTITIES = 2
+
+# Figures read the same in any language: years, amounts, percentages.
+NUMBER_PATTERN = re.compile(r"\d+(?:[.,]\d+)*%?")
+
+
+def detect_language(text: str) -> Optional[str]:
+  """Guesses "en" or "es" from function words; None when the text gives no clear signal."""
+  tokens = [token.lower() for token in TOKEN_PATTERN.findall(text or "")]
+  scores = {language: sum(token in markers for token in tokens) for language, markers in LANGUAGE_MARKERS.items()}
+  best = max(scores, key=scores.get)
+  if scores[best] == 0 or list(scores.values()).count(scores[best]) > 1:
+    return None
+  return best
+
+
+def looks_like_person(words: List[str]) -> bool:
+  """Two to MAX_NAME_WORDS capitalized words ("Elon Musk"), none of them an acronym, title, place or date."""
+  return 2 <= len(words) <= MAX_NAME_WORDS and all(
+    word[:1].isupper() and not word.isupper() and word.replace("-", "").replace("'", "").isalpha()
+    and word.lower() not in NON_NAME_WORDS
+    for word in words
+  )
+
+
+def entity_filter(entities: List[str]) -> Optional[str]:
+  """
+  Builds the 'entities' parameter ("ORG:European Central Bank,PER:Elon Musk")
+  from capitalized phrases. Single words, and phrases that are neither an
+  organization nor look like a person's name ("US President", "Casa Blanca"),
+  are skipped: a wrongly typed filter returns nothing.
+  """
+  typed = []
+  for entity in entities:
+    words = entity.split()
+    if len(words) < 2:
+      continue
+    if words[-1].lower() in ORG_MARKERS or words[0].lower() in ORG_PREFIXES:
+      typed.append(f"ORG:{entity}")
+    elif looks_like_person(words):
+      typed.append(f"PER:{entity}")
+  return ",".join(typed[:MAX_ENTITIES]) or None
+
+
+def neutral_terms(claim: str, terms: List[str]) -> List[str]:
+  """
+  The terms of a claim that do not need translating: names (multi-word
+  phrases, acronyms and capitalized words past the first one) and numbers.
+  A capitalized first word is usually just the start of the sentence.
+  """
+  first_word = (TOKEN_PATTERN.findall(claim) or [""])[0]
+  names = [
+    term for term in terms
+    if term.startswith('"') or (term[:1].isupper() and (term != first_word or term.isupper()))
+  ]
+  return names + [number for number in dict.fromkeys(NUMBER_PATTERN.findall(claim)) if len(number) > 1]
+
+
+def join_terms(terms: List[str]) -> str:
+  query = ""
+  for term in terms[:MAX_TERMS]:
+    candidate = f"{query} {term}".strip()
+    if len(candidate) > MAX_QUERY_CHARS:
+      break
+    query = candidate
+  return query
+
+
+def build_query_variants(text: str, language: Optional[str] = None) -> List[Tuple[str, Dict[str, Any]]]:
+  """
+  Returns (name, search_news_by_text kwargs) pairs for the same claim:
+  keywords: the title keywords, as build_search_query makes them.
+  entities: the remaining keywords, with the named people/organizations as an 'entities' filter.
+  language: the keywords restricted to the claim's language.
+  english: only the names and numbers of the claim, restricted to English, for
+    claims in another language. Translating the other keywords would need a model
+    call, and untranslated ones only match articles in the claim's own language.
+  Variants that would repeat another one, or have nothing to search, are left out.
+  """
+  claim = extract_claim(text)
+  terms = extract_terms(claim)
+  keywords = join_terms(terms)
+  if not keywords:
+    return []
+
+  variants = [("keywords", {"text": keywords})]
+
+  # Only multi-word names are typed and moved into the filter; the rest stays in the text.
+  entities = [term.strip('"') for term in terms if term.startswith('"')][:MAX_ENTITIES]
+  entities_param = entity_filter(entities)
+  if entities_param:
+    # Phrases left untyped stay in the text.
+    filtered = {entity.split(":", 1)[1] for entity in entities_param.split(",")}
+    rest = join_terms([term for term in terms if term.strip('"') not in filtered]) or keywords
+    variants.append(("entities", {"text": rest, "entities": entities_param}))
+
+  language = (language or detect_language(claim) or "").lower() or None
+  if language:
+    variants.append(("language", {"text": keywords, "language": language}))
+  neutral = neutral_terms(claim, terms)
+  if language != "en" and any(not NUMBER_PATTERN.fullmatch(term) for term in neutral):
+    variants.append(("english", {"text": join_terms(neutral), "language": "en"}))
+
+  return variants
+
+
+def reciprocal_rank_fusion(ranked_lists: List[List[Dict[str, Any]]], k: int) -> List[Dict[str, Any]]:
+  """
+  Merges ranked article lists: each article scores sum(1 / (k + rank)) over
+  the lists it appears in (rank starting at 1), so articles found by several
+  variants rise to the top. Articles are deduplicated by canonical URL,
+  keeping the first copy seen.
+  """
+  scores: Dict[str, float] = {}
+  articles: Dict[str, Dict[str, Any]] = {}
+  for ranked in ranked_lists:
+    seen = set()
+    for rank, article in enumerate(ranked, start=1):
+      if not article.get("url"):
+        continue
+      key = canonicalize_url(article["url"])
+      if key in seen:
+        continue
+      seen.add(key)
+      articles.setdefault(key, article)
+      scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+
+  # Ties keep first-seen order, so the keywords variant wins among equals.
+  order = sorted(scores, key=lambda key: -scores[key])
+  return [articles[key] for key in order]
+
+
+async def run_variants(
+  search,
+  variants: List[Tuple[str, Dict[str, Any]]],
+  number: int,
+  timeout: float
+) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+  """
+  Runs every variant concurrently through search(text, number, **filters)
+  and waits at most timeout seconds. Returns the responses that arrived,
+  keyed by variant name, and the names of the variants that timed out.
+  """
+  tasks = {
+    asyncio.ensure_future(search(params["text"], number=number, **{k: v for k, v in params.items() if k != "text"})): name
+    for name, params in variants
+  }
+  done, pending = await asyncio.wait(tasks, timeout=timeout)
+  for task in pending:
+    task.cancel()
+
+  responses = {}
+  for task in done:
+    if task.exception() is None:
+      responses[tasks[task]] = task.result()
+  return responses, [tasks[task] for task in pending]
@@ -0,0 +1,174 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk.events.event import Event
+from google.adk.sessions import InMemorySessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig
+
+SessionKey = Tuple[str, str, str]
+
+# Rough characters-per-token ratio used to turn event sizes into a token budget.
+CHARS_PER_TOKEN = 4
+
+def estimate_event_size(event: Event) -> int:
+  return len(event.model_dump_json(exclude_none=True))
+
+
+class BoundedSessionService(InMemorySessionService):
+  """
+  InMemorySessionService with bounded memory.
+
+  Sessions are evicted when idle for longer than idle_ttl, when there are
+  more than max_sessions (least recently used first) and when their
+  estimated total size exceeds max_bytes. Each session also keeps only a
+  sliding window of its last max_events events / max_tokens tokens, cut at a
+  user turn so tool calls are never separated from their responses.
+
+  Args:
+    max_sessions: Maximum number of sessions kept across all apps.
+    idle_ttl: Seconds without access after which a session is dropped.
+    max_bytes: Maximum estimated size of all stored events.
+    max_events: Maximum number of events kept per session.
+    max_tokens: Maximum estimated tokens kept per session.
+  """
+
+  def __init__(self, max_sessions: int, idle_ttl: float, max_bytes: int, max_events: int, max_tokens: int):
+    super().__init__()
+    self.max_sessions = max_sessions
+    self.idle_ttl = idle_ttl
+    self.max_bytes = max_bytes
+    self.max_events = max_events
+    self.max_tokens = max_tokens
+
+    self._last_access: "OrderedDict[SessionKey, float]" = OrderedDict()
+    self._bytes: Dict[SessionKey, int] = {}
+    self._total_bytes = 0
+
+    self.evictions = {"idle": 0, "lru": 0, "memory": 0}
+    self.trimmed_events = 0
+
+  def _create_session_impl(self, *, app_name: str, user_id: str, state: Optional[Dict[str, Any]] = None, session_id: Optional[str] = None) -> Session:
+    self._evict_idle()
+    session = super()._create_session_impl(app_name=app_name, user_id=user_id, state=state, session_id=session_id)
+
+    key = (app_name, user_id, session.id)
+    self._touch(key)
+    self._bytes[key] = 0
+    self._enforce_limits(keep=key)
+    return session
+
+  def _get_session_impl(self, *, app_name: str, user_id: str, session_id: str, config: Optional[GetSessionConfig] = None) -> Optional[Session]:
+    key = (app_name, user_id, session_id)
+    last_access = self._last_access.get(key)
+    if last_access is not None and time.time() - last_access > self.idle_ttl:
+      self._evict(key, "idle")
+      return None
+
+    session = super()._get_session_impl(app_name=app_name, user_id=user_id, session_id=session_id, config=config)
+    if session is not None:
+      self._touch(key)
+    return session
+
+  def _delete_session_impl(self, *, app_name: str, user_id: str, session_id: str) -> None:
+    super()._delete_session_impl(app_name=app_name, user_id=user_id, session_id=session_id)
+    self._forget((app_name, user_id, session_id))
+
+  async def append_event(self, session: Session, event: Event) -> Event:
+    event = await super().append_event(session=session, event=event)
+    if event.partial:
+      return event
+
+    key = (session.app_name, session.user_id, session.id)
+    stored = self.sessions.get(session.app_name, {}).get(session.user_id, {}).get(session.id)
+    if stored is None:
+      return event
+
+    size = estimate_event_size(event)
+    self._bytes[key] = self._bytes.get(key, 0) + size
+    self._total_bytes += size
+    self._touch(key)
+
+    self._trim_window(key, stored)
+    self._enforce_limits(keep=key)
+    return event
+
+  def _trim_window(self, key: SessionKey, stored: Session):
+    events: List[Event] = stored.events
+    size = self._bytes.get(key, 0)
+    if len(events) <= self.max_events and size // CHARS_PER_TOKEN <= self.max_tokens:
+      return
+
+    # Find the oldest user turn that fits the window; everything before it is dropped.
+    cut = None
+    kept_size = 0
+    for index in range(len(events) - 1, 0, -1):
+      kept_size += estimate_event_size(events[index])
+      if len(events) - index > self.max_events or kept_size // CHARS_PER_TOKEN > self.max_tokens:
+        break
+      if events[index].author == "user":
+        cut = index
+
+    if not cut:
+      return
+
+    removed = events[:cut]
+    removed_size = sum(estimate_event_size(event) for event in removed)
+    stored.events = events[cut:]
+    self._bytes[key] = max(0, size - removed_size)
+    self._total_bytes = max(0, self._total_bytes - removed_size)
+    self.trimmed_events += len(removed)
+
+  def _touch(self, key: SessionKey):
+    self._last_access[key] = time.time()
+    self._last_access.move_to_end(key)
+
+  def _evict_idle(self):
+    deadline = time.time() - self.idle_ttl
+    while self._last_access:
+      key, last_access = next(iter(self._last_access.items()))
+      if last_access > deadline:
+        break
+      self._evict(key, "idle")
+
+  def _enforce_limits(self, keep: SessionKey):
+    self._evict_idle()
+    while len(self._last_access) > self.max_sessions:
+      if not self._evict_oldest("lru", keep):
+        break
+    while self._total_bytes > self.max_bytes:
+      if not self._evict_oldest("memory", keep):
+        break
+
+  def _evict_oldest(self, reason: str, keep: SessionKey) -> bool:
+    for key in self._last_access:
+      if key != keep:
+        self._evict(key, reason)
+        return True
+    return False
+
+  def _evict(self, key: SessionKey, reason: str):
+    app_name, user_id, session_id = key
+    user_sessions = self.sessions.get(app_name, {}).get(user_id, {})
+    user_sessions.pop(session_id, None)
+    if not user_sessions:
+      self.sessions.get(app_name, {}).pop(user_id, None)
+    self._forget(key)
+    self.evictions[reason] += 1
+
+  def _forget(self, key: SessionKey):
+    self._last_access.pop(key, None)
+    self._total_bytes = max(0, self._total_bytes - self._bytes.pop(key, 0))
+
+  def stats(self) -> Dict[str, Any]:
+    return {
+      "sessions": len(self._last_access),
+      "bytes": self._total_bytes,
+      "max_sessions": self.max_sessions,
+      "max_bytes": self.max_bytes,
+      "idle_ttl_seconds": self.idle_ttl,
+      "window_max_events": self.max_events,
+      "window_max_tokens": self.max_tokens,
+      "evictions": dict(self.evictions),
+      "trimmed_events": self.trimmed_events,
+    }
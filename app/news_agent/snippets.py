@@ -0,0 +1,130 @@
+import math
+import re
+from typing import Dict, List
+
+import numpy as np
+
+from news_agent.query_builder import STOP_WORDS, extract_claim
+
+# Rough characters-per-token ratio used to fit snippets into the prompt budget.
+CHARS_PER_TOKEN = 4
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?…])\s+(?=[\"'“¿¡(]?[A-ZÁÉÍÓÚÑ0-9])|\n+")
+WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def split_sentences(text: str) -> List[str]:
+  return [sentence.strip() for sentence in SENTENCE_SPLIT.split(text or "") if sentence and sentence.strip()]
+
+
+def tokenize(text: str) -> List[str]:
+  return [word for word in WORD_PATTERN.findall(text.lower()) if word not in STOP_WORDS and len(word) > 1]
+
+
+def estimate_tokens(text: str) -> int:
+  return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, tokens: int) -> str:
+  """Cuts text to fit the token estimate, at the last word boundary, marking the cut with an ellipsis."""
+  limit = tokens * CHARS_PER_TOKEN
+  if len(text) <= limit:
+    return text
+  if limit < 2:
+    return ""
+  cut = text[:limit - 1]
+  if " " in cut:
+    cut = cut[:cut.rindex(" ")]
+  return cut.rstrip(" ,;:") + "…"
+
+
+def bm25_scores(sentences: List[List[str]], query: List[str]) -> np.ndarray:
+  """Scores every tokenized sentence against the query with Okapi BM25."""
+  vocabulary = {term: index for index, term in enumerate(dict.fromkeys(query))}
+  if not sentences or not vocabulary:
+    return np.zeros(len(sentences))
+
+  tf = np.zeros((len(sentences), len(vocabulary)))
+  for row, tokens in enumerate(sentences):
+    for token in tokens:
+      column = vocabulary.get(token)
+      if column is not None:
+        tf[row, column] += 1
+
+  lengths = np.array([len(tokens) for tokens in sentences], dtype=float)
+  avg_length = lengths.mean() or 1.0
+  df = (tf > 0).sum(axis=0)
+  idf = np.log(1 + (len(sentences) - df + 0.5) / (df + 0.5))
+
+  norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[:, None] / avg_length)
+  return (tf * (BM25_K1 + 1) / (tf + norm)) @ idf
+
+
+def select_snippets(query: str, articles: List[Dict[str, str]], token_budget: int) -> List[str]:
+  """
+  Picks the sentences most relevant to the query from every article,
+  sharing one token budget across all of them.
+
+  Every article first gets its best sentence (its lede if nothing matches)
+  so each source stays represented, cut at a word boundary when it is
+  longer than the article's share of the budget left; the rest of the budget goes to the
+  highest-scoring matching sentences regardless of article. What is left then
+  goes to the articles that share no term with the query (e.g. written in
+  another language), lede first. Sentences are returned in their original
+  order, one snippet per article.
+  """
+  sentences = []
+  for article_index, article in enumerate(articles):
+    for position, sentence in enumerate(split_sentences(article.get("text") or "")):
+      sentences.append((article_index, position, sentence))
+
+  if not sentences:
+    return ["" for _ in articles]
+
+  scores = bm25_scores([tokenize(sentence) for _, _, sentence in sentences], tokenize(extract_claim(query)))
+  costs = [estimate_tokens(sentence) for _, _, sentence in sentences]
+
+  texts = [sentence for _, _, sentence in sentences]
+  selected = set()
+  remaining = token_budget
+
+  owners = sorted({owner for owner, _, _ in sentences})
+  for left, article_index in enumerate(owners):
+    candidates = [i for i, (owner, _, _) in enumerate(sentences) if owner == article_index]
+    best = max(candidates, key=lambda i: (scores[i], -sentences[i][1]))
+    if costs[best] > remaining:
+      # Long or unpunctuated bodies can be one huge "sentence"; keep its start rather than nothing.
+      texts[best] = truncate_to_tokens(texts[best], remaining // (len(owners) - left))
+      costs[best] = estimate_tokens(texts[best])
+      if not texts[best]:
+        continue
+    selected.add(best)
+    remaining -= costs[best]
+
+  # Highest score first; among equal scores, earlier sentences (closer to the lede) win.
+  # Sentences that share no term with the query are never used as filler.
+  for i in sorted(range(len(sentences)), key=lambda i: (-scores[i], sentences[i][1], sentences[i][0])):
+    if scores[i] > 0 and i not in selected and costs[i] <= remaining:
+      selected.add(i)
+      remaining -= costs[i]
+
+  # Without a single match the article's opening is the best guess, rather than one sentence of it.
+  matched = {sentences[i][0] for i in range(len(sentences)) if scores[i] > 0}
+  for i in sorted(range(len(sentences)), key=lambda i: (sentences[i][1], sentences[i][0])):
+    if sentences[i][0] not in matched and i not in selected and costs[i] <= remaining:
+      selected.add(i)
+      remaining -= costs[i]
+
+  snippets = ["" for _ in articles]
+  previous = {}
+  for i in sorted(selected):
+    article_index, position, _ = sentences[i]
+    sentence = texts[i]
+    if snippets[article_index]:
+      # Adjacent sentences read as one passage; gaps are marked.
+      snippets[article_index] += " " if previous[article_index] == position - 1 else " ... "
+    snippets[article_index] += sentence
+    previous[article_index] = position
+  return snippets
@@ -1,24 +1,36 @@
+import asyncio
+import os
 import uuid
 from fastapi import Depends, APIRouter, HTTPException, status
-from interfaces.IChat import RequestChat, ResponseChat
-from news_agent.agent import run_verification_pipeline as run_agent_query
-from starlette.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from interfaces.IChat import BatchChatItem, RequestBatchChat, RequestChat, ResponseChat
+from news_agent.agent import run_verification_pipeline as run_agent_query, verification_key, verify
+from services.history_writer import FIRESTORE_BATCH_LIMIT
+from services.worldnewsapi_scheduler import BATCH, api_priority
 from utils.getUser import get_current_user_uid
 from utils.newSession import create_new_session_in_firestore
+from utils.saveHistory import save_batch_history_to_firestore, save_chat_history_to_firestore
+from utils.sse import format_sse
+from utils.structuredLog import get_logger
 
 chat_router = APIRouter()
+log = get_logger("chat")
+
+# Each batch item is saved as a session document plus two messages, all in one Firestore batch.
+BATCH_WRITES_PER_ITEM = 3
+BATCH_MAX_ITEMS = min(int(os.getenv("BATCH_MAX_ITEMS", "50")), FIRESTORE_BATCH_LIMIT // BATCH_WRITES_PER_ITEM)
+BATCH_CONCURRENCY = max(1, int(os.getenv("BATCH_CONCURRENCY", "4")))
+
+# Streams whose client went away, finishing and saving their turn; kept referenced until done.
+_detached_streams = set()
 
 @chat_router.post("/start", response_model=ResponseChat)
 async def start_chat(request: RequestChat, user_id: str = Depends(get_current_user_uid)):
+  current_session_id = None
   try:
     if not request.session_id:
       current_session_id = str(uuid.uuid4())
-      await run_in_threadpool(
-        create_new_session_in_firestore,
-        user_id,
-        current_session_id,
-        request.prompt
-      )
+      await create_new_session_in_firestore(user_id, current_session_id, request.prompt)
     else:
       current_session_id = request.session_id.strip()
       
@@ -30,16 +42,188 @@ async def start_chat(request: RequestChat, user_id: str = Depends(get_current_us
 
     return ResponseChat(
       prompt=request.prompt,
-      response=agent_result,
-      session_id=current_session_id
+      response=agent_result.text,
+      session_id=current_session_id,
+      cached=agent_result.cached,
+      cache_age_seconds=agent_result.cache_age_seconds
     )
     
   except Exception as e:
-    session_info = f" (SESSION ID: {current_session_id})" if current_session_id else ""
-    print(f"FATAL ERROR RUNNING AGENT{session_info}: {type(e).__name__} - {e}")
-    
-    
+    log.error("agent_request_failed", exc_info=e, session_id=current_session_id, error_type=type(e).__name__, error=str(e))
+
     raise HTTPException(
       status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
       detail="An internal error occurred while processing your request. Please try again or start a new conversation."
-    )
\ No newline at end of file
+    )
+
+@chat_router.post("/start/stream")
+async def start_chat_stream(request: RequestChat, user_id: str = Depends(get_current_user_uid)):
+  """
+  Streaming variant of /start. Sends server-sent events as the pipeline
+  progresses: session, article_extracted (or article_unavailable when the
+  URL's slug is searched instead), sources_found, verdict_delta
+  (verdict text chunks), verdict and finally saved, after the history has
+  been written. Failures are sent as an error event. When the client
+  disconnects, the pipeline still finishes in the background and its turn
+  is saved, so the session it already created is not left empty.
+  """
+  is_new_session = not request.session_id
+  current_session_id = str(uuid.uuid4()) if is_new_session else request.session_id.strip()
+
+  async def event_stream():
+    yield format_sse("session", {"session_id": current_session_id})
+
+    # The session document is queued for the write-behind writer; the pipeline does not wait for it.
+    session_saved = await create_new_session_in_firestore(user_id, current_session_id, request.prompt) if is_new_session else None
+
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def emit(stage, data):
+      await queue.put((stage, data))
+
+    pipeline = asyncio.ensure_future(verify(user_id, request.prompt, current_session_id, emit))
+    pipeline.add_done_callback(lambda _: queue.put_nowait(None))
+
+    async def persist(outcome) -> bool:
+      if not outcome.persist:
+        return False
+      history_saved = await save_chat_history_to_firestore(user_id, current_session_id, request.prompt, outcome.text)
+      if session_saved:
+        await session_saved
+      await history_saved
+      return True
+
+    async def finish_detached(saving):
+      try:
+        if saving is None:
+          saving = persist(await pipeline)
+        await saving
+      except Exception as e:
+        log.error("agent_stream_failed", exc_info=e, session_id=current_session_id, detached=True, error_type=type(e).__name__, error=str(e))
+
+    saving = None
+    ended = False
+    try:
+      while (item := await queue.get()) is not None:
+        yield format_sse(*item)
+
+      outcome = pipeline.result()
+      # Saved in its own task, so a client disconnecting from here on does not interrupt it.
+      saving = asyncio.ensure_future(persist(outcome))
+      yield format_sse("verdict", ResponseChat(
+        prompt=request.prompt,
+        response=outcome.text,
+        session_id=current_session_id,
+        cached=outcome.cached,
+        cache_age_seconds=outcome.cache_age_seconds
+      ).model_dump())
+
+      if await asyncio.shield(saving):
+        yield format_sse("saved", {"session_id": current_session_id})
+      ended = True
+
+    except Exception as e:
+      ended = True
+      log.error("agent_stream_failed", exc_info=e, session_id=current_session_id, error_type=type(e).__name__, error=str(e))
+      yield format_sse("error", {
+        "detail": "An internal error occurred while processing your request. Please try again or start a new conversation."
+      })
+
+    finally:
+      # The client went away before the turn was saved: finish it without them.
+      if not ended:
+        task = asyncio.ensure_future(finish_detached(saving))
+        _detached_streams.add(task)
+        task.add_done_callback(_detached_streams.discard)
+
+  return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@chat_router.post("/start/batch")
+async def start_chat_batch(request: RequestBatchChat, user_id: str = Depends(get_current_user_uid)):
+  """
+  Verifies a list of claims and/or article URLs, each in a new session.
+  Duplicate inputs (same canonical URL or normalized claim) are verified
+  once, at most BATCH_CONCURRENCY items run at a time, and items needing
+  the same extraction or search share one API call. Sends server-sent
+  events: batch (the deduplicated items), item or item_error as each one
+  finishes, and saved once every session and its turn have been written
+  in a single Firestore batch.
+  """
+  items = {}
+  for index, prompt in enumerate(request.prompts):
+    prompt = prompt.strip()
+    if not prompt:
+      continue
+    key = verification_key(prompt)
+    if key not in items:
+      items[key] = {"item": len(items), "prompt": prompt, "session_id": str(uuid.uuid4()), "input_indexes": []}
+    items[key]["input_indexes"].append(index)
+
+  batch_items = list(items.values())
+  if not batch_items:
+    raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="The batch has no claims or URLs to verify.")
+  if len(batch_items) > BATCH_MAX_ITEMS:
+    raise HTTPException(
+      status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+      detail=f"A batch can verify at most {BATCH_MAX_ITEMS} distinct claims or URLs."
+    )
+
+  async def event_stream():
+    yield format_sse("batch", {"items": batch_items, "duplicates": sum(len(item["input_indexes"]) - 1 for item in batch_items)})
+
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run_item(item):
+      # Batch items queue for WorldNewsAPI behind interactive /start requests.
+      async with semaphore:
+        try:
+          with api_priority(BATCH):
+            return item, await verify(user_id, item["prompt"], item["session_id"])
+        except Exception as e:
+          log.error("batch_item_failed", exc_info=e, session_id=item["session_id"], error_type=type(e).__name__, error=str(e))
+          return item, None
+
+    tasks = [asyncio.ensure_future(run_item(item)) for item in batch_items]
+    turns = []
+    try:
+      for finished in asyncio.as_completed(tasks):
+        item, outcome = await finished
+        if outcome is None:
+          yield format_sse("item_error", {
+            "item": item["item"],
+            "input_indexes": item["input_indexes"],
+            "detail": "An internal error occurred while verifying this item."
+          })
+          continue
+
+        yield format_sse("item", BatchChatItem(
+          item=item["item"],
+          input_indexes=item["input_indexes"],
+          prompt=item["prompt"],
+          response=outcome.text,
+          session_id=item["session_id"],
+          cached=outcome.cached,
+          cache_age_seconds=outcome.cache_age_seconds
+        ).model_dump())
+
+        if outcome.persist:
+          turns.append((item["item"], item["session_id"], item["prompt"], outcome.text))
+
+      # Sessions are only created for items that produced a turn worth keeping.
+      turns.sort()
+      if turns:
+        await (await save_batch_history_to_firestore(user_id, [turn[1:] for turn in turns]))
+      yield format_sse("saved", {"session_ids": [turn[1] for turn in turns]})
+
+    except Exception as e:
+      log.error("batch_save_failed", exc_info=e, items=len(batch_items), error_type=type(e).__name__, error=str(e))
+      yield format_sse("error", {
+        "detail": "An internal error occurred while saving the batch. Please try again."
+      })
+
+    finally:
+      # A disconnected client stops the items that have not finished yet.
+      for task in tasks:
+        task.cancel()
+
+  return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
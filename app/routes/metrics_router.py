@@ -0,0 +1,9 @@
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from utils.metricsToken import require_metrics_token
+
+metrics_router = APIRouter(dependencies=[Depends(require_metrics_token)])
+
+@metrics_router.get("/metrics")
+def get_metrics():
+  return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,40 +1,125 @@
 from datetime import timezone
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from config.db import db
-from interfaces.IChat import DeleteSessionResponse, SessionData, List, SessionHistoryResponse
+from interfaces.IChat import DeleteAllSessionsJob, DeleteSessionResponse, SessionData, SessionHistoryResponse
 from starlette.concurrency import run_in_threadpool
+from services.session_deletion import session_deleter
+from services.session_list_cache import paginate, session_list_cache
 from utils.getUser import get_current_user_uid
+from utils.pageCursor import decode_cursor, encode_cursor
+from utils.structuredLog import get_logger
 from google.cloud import firestore
 
 session_router = APIRouter()
+log = get_logger("sessions")
+
+# Pagination is opt-in: without ?limit= both listings return everything, as they always did.
+PAGE_MAX = 100
+# GET /sessions returns a plain list, so its next-page token travels in this header.
+NEXT_PAGE_HEADER = "X-Next-Page-Token"
+
+def parse_page_token(start_after: Optional[str]):
+  if not start_after:
+    return None
+  try:
+    return decode_cursor(start_after)
+  except ValueError as e:
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+def apply_page_cursor(query, cursor, field: str):
+  """Continues an ordered query after the document the decoded cursor points to."""
+  if not cursor:
+    return query
+  return query.start_after({field: cursor["at"], u'__name__': cursor["id"]})
+
+def fetch_page(query, limit: Optional[int], field: str):
+  """Reads one page (plus one document to know if another page exists) and its next-page token; everything when limit is None."""
+  docs = list((query if limit is None else query.limit(limit + 1)).stream())
+  next_page_token = None
+  if limit is not None and len(docs) > limit:
+    docs = docs[:limit]
+    last = docs[-1]
+    next_page_token = encode_cursor(last.id, last.get(field))
+  return docs, next_page_token
+
+def fetch_session_rows(query, limit: Optional[int]):
+  """Reads up to limit sessions (all when None) as cache rows, and whether more exist."""
+  docs = list((query if limit is None else query.limit(limit + 1)).stream())
+  rows = []
+  for doc in docs[:limit]:
+    data = doc.to_dict()
+    rows.append({
+      "session_id": doc.id,
+      "title": data.get('title', 'Untitled Conversation'),
+      "created_at": data.get('created_at').astimezone(timezone.utc)
+    })
+  return rows, limit is not None and len(docs) > limit, len(docs)
 
 @session_router.get("/sessions", response_model=List[SessionData])
-async def list_sessions(user_id: str = Depends(get_current_user_uid)):
-  sessions_ref = db.collection(u'chats').document(user_id).collection(u'sessions')
-  query = sessions_ref.order_by(u'created_at', direction=firestore.Query.DESCENDING).stream()
-  
-  sessions = []
+async def list_sessions(
+  response: Response,
+  limit: Optional[int] = Query(None, ge=1, le=PAGE_MAX),
+  start_after: Optional[str] = None,
+  user_id: str = Depends(get_current_user_uid)
+):
+  """
+  Lists the user's sessions, newest first. With ?limit= only one page is
+  returned; when more sessions follow, the X-Next-Page-Token response
+  header holds the start_after value for the next page.
+  """
+  cursor = parse_page_token(start_after)
+  page = session_list_cache.get_page(user_id, cursor, limit)
   
-  for doc in await run_in_threadpool(lambda: list(query)):
-    data = doc.to_dict()
+  if page is None:
+    sessions_ref = db.collection(u'chats').document(user_id).collection(u'sessions')
+    query = (
+      sessions_ref
+      .select([u'title', u'created_at'])
+      .order_by(u'created_at', direction=firestore.Query.DESCENDING)
+      .order_by(u'__name__', direction=firestore.Query.DESCENDING)
+    )
+    query = apply_page_cursor(query, cursor, u'created_at')
+    
+    # The first page reads a whole cache head, so later pages and calls can be served from it.
+    fill = cursor is None and session_list_cache.enabled
+    generation = session_list_cache.generation(user_id)
+    fetch_limit = max(limit, session_list_cache.depth) if fill and limit is not None else limit
     
-    created_at_dt = data.get('created_at').astimezone(timezone.utc)
-    print(f"Session ID of firebase: {doc.id}", len(doc.id))
-    sessions.append(SessionData(
-      user_id=user_id, 
-      session_id=doc.id,
-      title=data.get('title', 'Untitled Conversation'), 
-      created_at=created_at_dt
-    ))
+    rows, has_more, documents_read = await run_in_threadpool(fetch_session_rows, query, fetch_limit)
+    session_list_cache.record_firestore_read(documents_read)
     
-  return sessions
+    if cursor is None:
+      rows = session_list_cache.fill(user_id, generation, rows, complete=not has_more)
+    page = paginate(rows, not has_more, None, limit) or (rows[:limit], True)
+  
+  rows, has_more = page
+  if has_more and rows:
+    response.headers[NEXT_PAGE_HEADER] = encode_cursor(rows[-1]["session_id"], rows[-1]["created_at"])
+    
+  return [SessionData(user_id=user_id, **row) for row in rows]
 
 @session_router.get("/sessions/{session_id}/history", response_model=SessionHistoryResponse)
-async def get_session_history(session_id: str, user_id: str = Depends(get_current_user_uid)):
-  messages_ref = db.collection(u'chats').document(user_id).collection(u'sessions').document(session_id).collection(u'messages').order_by(u'timestamp').stream()
-  print("Fetching session history for Session ID:", session_id, len(session_id))
+async def get_session_history(
+  session_id: str,
+  limit: Optional[int] = Query(None, ge=1, le=PAGE_MAX),
+  start_after: Optional[str] = None,
+  user_id: str = Depends(get_current_user_uid)
+):
+  messages_ref = db.collection(u'chats').document(user_id).collection(u'sessions').document(session_id).collection(u'messages')
+  query = (
+    messages_ref
+    .select([u'author', u'text', u'timestamp'])
+    .order_by(u'timestamp')
+    .order_by(u'__name__')
+  )
+  query = apply_page_cursor(query, parse_page_token(start_after), u'timestamp')
+  log.debug("session_history_requested", session_id=session_id, paged=start_after is not None)
+  
+  docs, next_page_token = await run_in_threadpool(fetch_page, query, limit, u'timestamp')
+  
   history = []
-  for doc in messages_ref:
+  for doc in docs:
     data = doc.to_dict()
     history.append({
       "author": data.get('author'),
@@ -42,20 +127,40 @@ async def get_session_history(session_id: str, user_id: str = Depends(get_curren
       "timestamp": data.get('timestamp').astimezone(timezone.utc)
     })
       
-  if not history:
+  if not history and not start_after:
     raise HTTPException(
       status_code=status.HTTP_404_NOT_FOUND, 
       detail="Session not found or has no messages."
     )
 
-  return SessionHistoryResponse(session_id=session_id, messages=history)
+  return SessionHistoryResponse(session_id=session_id, messages=history, next_page_token=next_page_token)
 
 
+@session_router.delete("/sessions", response_model=DeleteAllSessionsJob, status_code=status.HTTP_202_ACCEPTED)
+async def delete_all_sessions(user_id: str = Depends(get_current_user_uid)):
+  """
+  Starts deleting every session of the user in the background. Progress is
+  available from GET /sessions/deletions/{job_id}.
+  """
+  job = await session_deleter.start_delete_all(user_id)
+  return DeleteAllSessionsJob(**job.to_dict())
+
+@session_router.get("/sessions/deletions/{job_id}", response_model=DeleteAllSessionsJob)
+async def get_delete_all_sessions_job(job_id: str, user_id: str = Depends(get_current_user_uid)):
+  job = await session_deleter.get_job(job_id, user_id)
+  if job is None:
+    raise HTTPException(
+      status_code=status.HTTP_404_NOT_FOUND,
+      detail="Deletion job not found or expired."
+    )
+  return DeleteAllSessionsJob(**job.to_dict())
+
 @session_router.delete("/sessions/{session_id}", response_model=DeleteSessionResponse)
 async def delete_session(session_id: str, user_id: str = Depends(get_current_user_uid)):
   try:
-    session_ref = db.collection(u'chats').document(user_id).collection(u'sessions').document(session_id)
-    deleted_messages_count = await run_in_threadpool(delete_collection_and_document, session_ref)
+    session_ref = session_deleter.sessions_ref(user_id).document(session_id)
+    deleted_messages_count = await session_deleter.delete_session(session_ref)
+    session_list_cache.remove_session(user_id, session_id)
     
     return {
       "message": f"Session '{session_id}' and {deleted_messages_count} messages deleted successfully."
@@ -66,23 +171,3 @@ async def delete_session(session_id: str, user_id: str = Depends(get_current_use
       status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
       detail=f"Failed to delete session: {type(e).__name__}"
     )
-    
-def delete_collection_and_document(session_ref):
-  messages_ref = session_ref.collection(u'messages').stream()
-  batch = db.batch()
-  deleted_count = 0
-  
-  for message_doc in messages_ref:
-    batch.delete(message_doc.reference)
-    deleted_count += 1
-    
-    if deleted_count % 500 == 0:
-      batch.commit()
-      batch = db.batch()
-          
-  if deleted_count > 0:
-    batch.commit()
-    
-  session_ref.delete()
-  
-  return deleted_count
\ No newline at end of file
@@ -0,0 +1,9 @@
+from fastapi import APIRouter, Depends
+from utils.metricsToken import require_metrics_token
+from utils.stats import collect_stats
+
+stats_router = APIRouter(dependencies=[Depends(require_metrics_token)])
+
+@stats_router.get("/stats")
+def get_stats():
+  return collect_stats()
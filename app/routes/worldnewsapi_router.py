@@ -1,20 +1,20 @@
 from fastapi import APIRouter, Depends
-from services import worldnewsapi_client
+from services import worldnewsapi_async
 
 router_worldnewsapi = APIRouter()
 
 router_worldnewsapi.prefix = '/worldnewsapi'
 @router_worldnewsapi.get('/search_news_sources')
-def search_news_sources(name: str):
-    return worldnewsapi_client.search_news_sources(name)
+async def search_news_sources(name: str):
+    return await worldnewsapi_async.search_news_sources(name)
 
 @router_worldnewsapi.get('/extract_news_links')
-def extract_news_links(url: str):
-    return worldnewsapi_client.extract_news_links(url)
+async def extract_news_links(url: str):
+    return await worldnewsapi_async.extract_news_links(url)
 
 @router_worldnewsapi.get('/extract_news')
-def extract_news(url: str):
-    return worldnewsapi_client.extract_news(url)
+async def extract_news(url: str):
+    return await worldnewsapi_async.extract_news(url)
 
 # @router_worldnewsapi.get('/search_news')
 # def search_news(params:):
@@ -0,0 +1,313 @@
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Iterable, List, Optional
+
+from services.news_cache import parse_publish_date, is_cacheable_article
+from utils.canonicalUrl import canonicalize_url
+from utils.stats import register_stats
+from utils.structuredLog import get_logger
+
+log = get_logger("article_index")
+
+# search_news params the local index can answer; anything else goes to the API.
+SUPPORTED_PARAMS = {
+    "text", "language", "source_country", "earliest_publish_date", "latest_publish_date",
+    "min_sentiment", "max_sentiment", "text_match_indexes", "sort", "sort_direction",
+    "offset", "number",
+}
+# Number of results the API returns when 'number' is not given.
+DEFAULT_NUMBER = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    canonical_url TEXT UNIQUE NOT NULL,
+    url TEXT NOT NULL,
+    title TEXT,
+    text TEXT,
+    language TEXT,
+    source_country TEXT,
+    publish_date TEXT,
+    publish_ts REAL,
+    sentiment REAL,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_publish_ts ON articles (publish_ts);
+CREATE INDEX IF NOT EXISTS articles_indexed_at ON articles (indexed_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(title, text, content='articles', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts(rowid, title, text) VALUES (new.id, new.title, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, text) VALUES ('delete', old.id, old.title, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, text) VALUES ('delete', old.id, old.title, old.text);
+    INSERT INTO articles_fts(rowid, title, text) VALUES (new.id, new.title, new.text);
+END;
+"""
+
+TERM_PATTERN = re.compile(r'-?"[^"]+"|\S+')
+
+
+def to_fts_query(text: str, columns: Optional[List[str]] = None) -> Optional[str]:
+    """
+    Translates the search_news text syntax (implicit AND, uppercase OR,
+    -exclusions, "exact phrases") into an FTS5 MATCH expression. Returns
+    None when the query has no positive term.
+    """
+    positive, negative = [], []
+    for term in TERM_PATTERN.findall(text or ""):
+        if term == "OR":
+            if positive and positive[-1] != "OR":
+                positive.append("OR")
+            continue
+
+        excluded = term.startswith("-") and len(term) > 1
+        phrase = term[1:] if excluded else term
+        phrase = phrase.strip('"').replace('"', '""')
+        if not phrase:
+            continue
+        (negative if excluded else positive).append(f'"{phrase}"')
+
+    while positive and positive[-1] == "OR":
+        positive.pop()
+    if not positive:
+        return None
+
+    expression = " ".join(positive)
+    if negative:
+        expression = f"({expression}) NOT ({' OR '.join(negative)})"
+    if columns:
+        expression = f"{{{' '.join(columns)}}} : ({expression})"
+    return expression
+
+
+class ArticleIndex:
+    """
+    Persistent SQLite FTS5 index of every article the WorldNewsAPI returned.
+
+    search_news consults it before the API and only goes remote when local
+    recall is too low: fewer hits than the requested number, filters the
+    index cannot evaluate, or an open-ended date window whose matches were
+    not indexed recently enough to be trusted as up to date.
+
+    Args:
+        path: SQLite file location.
+        retention_days: Articles indexed longer ago than this are deleted.
+        max_articles: Hard cap on stored articles; the oldest indexed go first.
+        freshness: Seconds an indexed hit counts as current for open-ended windows.
+    """
+
+    def __init__(self, path: str, retention_days: float, max_articles: int, freshness: float):
+        self.path = path
+        self.retention_days = retention_days
+        self.max_articles = max_articles
+        self.freshness = freshness
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self._compaction_task: Optional[asyncio.Task] = None
+
+        self.local_hits = 0
+        self.remote_fallbacks = 0
+        self.indexed = 0
+        self.deleted = 0
+
+    def add_articles(self, articles: Iterable[Dict[str, Any]]):
+        rows = []
+        now = time.time()
+        for article in articles:
+            if not article or not article.get("url") or not is_cacheable_article(article):
+                continue
+            publish_date = article.get("publish_date")
+            parsed = parse_publish_date(publish_date) if publish_date else None
+            rows.append((
+                canonicalize_url(article["url"]), article["url"], article.get("title"), article.get("text"),
+                article.get("language"), article.get("source_country"), publish_date,
+                parsed.timestamp() if parsed else None, article.get("sentiment"), now
+            ))
+
+        if not rows:
+            return
+
+        with self._lock:
+            self._conn.executemany(
+                """INSERT INTO articles (canonical_url, url, title, text, language, source_country, publish_date, publish_ts, sentiment, indexed_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(canonical_url) DO UPDATE SET
+                     title=excluded.title, text=excluded.text, language=COALESCE(excluded.language, language),
+                     source_country=COALESCE(excluded.source_country, source_country),
+                     publish_date=COALESCE(excluded.publish_date, publish_date),
+                     publish_ts=COALESCE(excluded.publish_ts, publish_ts),
+                     sentiment=COALESCE(excluded.sentiment, sentiment), indexed_at=excluded.indexed_at""",
+                rows
+            )
+            self._conn.commit()
+        self.indexed += len(rows)
+
+    def search(self, final_kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Answers a search_news call from the index, as a compact response.
+        Returns None when the remote API has to be asked instead.
+        """
+        if not set(final_kwargs) <= SUPPORTED_PARAMS or not final_kwargs.get("text"):
+            self.remote_fallbacks += 1
+            return None
+
+        columns = [column.strip() for column in str(final_kwargs.get("text_match_indexes", "")).split(",") if column.strip()]
+        columns = [("text" if column == "content" else column) for column in columns if column in ("title", "content")]
+        match = to_fts_query(str(final_kwargs["text"]), columns or None)
+        if match is None:
+            self.remote_fallbacks += 1
+            return None
+
+        where, params = ["articles_fts MATCH ?"], [match]
+        for name, column in (("language", "language"), ("source_country", "source_country")):
+            if final_kwargs.get(name):
+                where.append(f"lower(a.{column}) = ?")
+                params.append(str(final_kwargs[name]).lower())
+        try:
+            for name, operator in (("min_sentiment", ">="), ("max_sentiment", "<=")):
+                if final_kwargs.get(name) is not None:
+                    where.append(f"a.sentiment {operator} ?")
+                    params.append(float(final_kwargs[name]))
+            number = int(final_kwargs.get("number") or DEFAULT_NUMBER)
+            offset = int(final_kwargs.get("offset") or 0)
+        except (TypeError, ValueError):
+            self.remote_fallbacks += 1
+            return None
+        for name, operator in (("earliest_publish_date", ">="), ("latest_publish_date", "<=")):
+            if final_kwargs.get(name):
+                parsed = parse_publish_date(str(final_kwargs[name]))
+                if parsed is None:
+                    self.remote_fallbacks += 1
+                    return None
+                where.append(f"a.publish_ts {operator} ?")
+                params.append(parsed.timestamp())
+
+        # Open-ended windows may have newer articles upstream; only recently indexed hits count.
+        if not final_kwargs.get("latest_publish_date"):
+            where.append("a.indexed_at >= ?")
+            params.append(time.time() - self.freshness)
+
+        if final_kwargs.get("sort"):
+            direction = "ASC" if str(final_kwargs.get("sort_direction", "")).upper() == "ASC" else "DESC"
+            order = f"publish_ts {direction}"
+        else:
+            order = "score"
+
+        # bm25() cannot be used next to a window function, so it is computed in a subquery.
+        sql = f"""SELECT url, title, text, publish_date, sentiment, COUNT(*) OVER () AS available
+                  FROM (
+                    SELECT a.url, a.title, a.text, a.publish_date, a.sentiment, a.publish_ts, bm25(articles_fts) AS score
+                    FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid
+                    WHERE {' AND '.join(where)}
+                  )
+                  ORDER BY {order} LIMIT ? OFFSET ?"""
+
+        try:
+            with self._lock:
+                rows = self._conn.execute(sql, params + [number, offset]).fetchall()
+        except sqlite3.OperationalError as e:
+            log.warning("article_index_query_failed", match=match, error=str(e))
+            self.remote_fallbacks += 1
+            return None
+
+        if len(rows) < number:
+            self.remote_fallbacks += 1
+            return None
+
+        self.local_hits += 1
+        return {
+            "available": rows[0][5],
+            "offset": offset,
+            "number": number,
+            "news": [
+                {"url": url, "title": title, "text": text, "publish_date": publish_date, "sentiment": sentiment}
+                for url, title, text, publish_date, sentiment, _ in rows
+            ]
+        }
+
+    def compact(self) -> int:
+        """Applies the retention policy and the size cap, then merges the FTS segments."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM articles WHERE indexed_at < ?", (time.time() - self.retention_days * 86400,)
+            )
+            deleted = cursor.rowcount
+            cursor = self._conn.execute(
+                "DELETE FROM articles WHERE id IN (SELECT id FROM articles ORDER BY indexed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_articles,)
+            )
+            deleted += cursor.rowcount
+            self._conn.execute("INSERT INTO articles_fts(articles_fts) VALUES ('optimize')")
+            self._conn.commit()
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        self.deleted += deleted
+        return deleted
+
+    async def _compaction_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                deleted = await asyncio.to_thread(self.compact)
+                log.info("article_index_compacted", deleted=deleted)
+            except Exception as e:
+                log.error("article_index_compaction_failed", exc_info=e, error=str(e))
+
+    def start_compaction(self, interval: float):
+        if self._compaction_task is None:
+            self._compaction_task = asyncio.create_task(self._compaction_loop(interval))
+
+    async def stop_compaction(self):
+        task, self._compaction_task = self._compaction_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            articles = self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+        return {
+            "articles": articles,
+            "max_articles": self.max_articles,
+            "retention_days": self.retention_days,
+            "local_hits": self.local_hits,
+            "remote_fallbacks": self.remote_fallbacks,
+            "indexed": self.indexed,
+            "deleted": self.deleted,
+        }
+
+
+# The index is off unless ARTICLE_INDEX_PATH is set. It stores full article
+# text plus its FTS index, about 10 KB per typical article, so the default cap
+# is ~200 MB. Point it at persistent disk: on Cloud Run /tmp is in memory and
+# is lost on every cold start.
+ARTICLE_INDEX_PATH = os.getenv("ARTICLE_INDEX_PATH", "")
+ARTICLE_INDEX_COMPACTION_INTERVAL = float(os.getenv("ARTICLE_INDEX_COMPACTION_INTERVAL", "3600"))
+
+article_index = ArticleIndex(
+    ARTICLE_INDEX_PATH,
+    retention_days=float(os.getenv("ARTICLE_INDEX_RETENTION_DAYS", "30")),
+    max_articles=int(os.getenv("ARTICLE_INDEX_MAX_ARTICLES", "20000")),
+    freshness=float(os.getenv("ARTICLE_INDEX_FRESHNESS", "3600"))
+) if ARTICLE_INDEX_PATH else None
+
+if article_index is not None:
+    register_stats("article_index", article_index.stats)
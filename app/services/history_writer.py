@@ -0,0 +1,251 @@
+import asyncio
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config.db import db
+from utils.metrics import stage
+from utils.stats import register_stats
+from utils.structuredLog import get_logger
+
+log = get_logger("history_writer")
+
+# Firestore rejects batches with more than 500 writes.
+FIRESTORE_BATCH_LIMIT = 500
+
+# (document reference, data) pairs that are set together in one batch.
+Write = Tuple[Any, Dict[str, Any]]
+
+
+def session_ids(writes: Iterable[Write]) -> List[str]:
+    """The chat sessions the writes touch, read from their chats/{uid}/sessions/{session_id}/... paths."""
+    ids = []
+    for reference, _ in writes:
+        # google-cloud-firestore gives the path as a "/"-joined string.
+        parts = reference.path.split("/") if isinstance(reference.path, str) else list(reference.path)
+        if "sessions" in parts[:-1]:
+            ids.append(parts[parts.index("sessions") + 1])
+    return list(dict.fromkeys(ids))
+
+
+class HistoryWriter:
+    """
+    Bounded async write-behind queue for Firestore history writes.
+
+    Callers submit the writes of one turn and get a future back instead of
+    waiting for Firestore. A background task groups queued turns into a
+    single batched commit, flushed when flush_size writes are pending or
+    flush_interval seconds after the first one arrived. A failed commit is
+    retried with exponential backoff. If it still fails after max_retries,
+    the batch is split in halves, and those are committed once each and split
+    again when they fail. That way one bad document (too large, an invalid
+    field) only drops its own turn, and every other user's turn in the batch
+    is still written. Dropped turns have their futures failed and their
+    session ids logged. When the queue is full, submit waits, so a stalled
+    Firestore slows requests down instead of growing memory.
+
+    Args:
+        client: Firestore client used to create batches.
+        max_queue: Maximum number of turns waiting to be written.
+        flush_size: Pending writes that trigger an immediate flush.
+        flush_interval: Seconds a turn may wait for more turns to join its batch.
+        max_retries: Commit attempts after the first one failed.
+        backoff: Initial retry delay in seconds, doubled on each attempt.
+    """
+
+    def __init__(self, client, max_queue: int, flush_size: int, flush_interval: float, max_retries: int, backoff: float):
+        self.client = client
+        self.max_queue = max_queue
+        self.flush_size = min(flush_size, FIRESTORE_BATCH_LIMIT)
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        self.submitted = 0
+        self.committed_turns = 0
+        self.committed_writes = 0
+        self.batches = 0
+        self.retries = 0
+        self.splits = 0
+        self.dropped_turns = 0
+        self.max_depth = 0
+        self.last_commit_seconds = 0.0
+
+    def start(self):
+        if self._worker is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._worker = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Stops accepting turns and waits until everything queued is written."""
+        worker, self._worker = self._worker, None
+        if worker is None:
+            return
+        await self._queue.put(None)
+        await worker
+
+    async def submit(self, writes: List[Write]) -> asyncio.Future:
+        """
+        Queues the writes of one turn; they are always committed together.
+        The returned future resolves once they are in Firestore, so callers
+        that must know (e.g. to confirm the save) can await it.
+        """
+        future = asyncio.get_running_loop().create_future()
+        if self._worker is None:
+            # Without the background task (e.g. scripts), write synchronously.
+            try:
+                with stage("firestore_write"):
+                    await asyncio.to_thread(self._commit, writes)
+                future.set_result(None)
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        await self._queue.put((writes, future))
+        self.submitted += 1
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+        return future
+
+    async def _run(self):
+        closing = False
+        while not closing:
+            item = await self._queue.get()
+            if item is None:
+                break
+
+            pending = [item]
+            size = len(item[0])
+            deadline = time.monotonic() + self.flush_interval
+
+            while size < self.flush_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                if size + len(item[0]) > FIRESTORE_BATCH_LIMIT:
+                    await self._flush(pending)
+                    pending, size = [], 0
+                pending.append(item)
+                size += len(item[0])
+
+            await self._flush(pending)
+
+        # Drain whatever is still queued after the shutdown marker.
+        pending, size = [], 0
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is None:
+                continue
+            if size + len(item[0]) > FIRESTORE_BATCH_LIMIT:
+                await self._flush(pending)
+                pending, size = [], 0
+            pending.append(item)
+            size += len(item[0])
+        if pending:
+            await self._flush(pending)
+
+    async def _flush(self, pending: List[Tuple[List[Write], asyncio.Future]]):
+        if not pending:
+            return
+
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.retries += 1
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+            error = await self._try_commit(pending)
+            if error is None:
+                break
+            log.warning("history_commit_failed", attempt=attempt + 1, attempts=self.max_retries + 1, turns=len(pending), error=str(error))
+
+        if error is None or len(pending) == 1:
+            self._settle(pending, error)
+        else:
+            await self._split(pending)
+
+    async def _split(self, pending: List[Tuple[List[Write], asyncio.Future]]):
+        """Commits the halves of a batch that kept failing, splitting further until the failing turns are alone."""
+        self.splits += 1
+        middle = len(pending) // 2
+        for half in (pending[:middle], pending[middle:]):
+            error = await self._try_commit(half)
+            if error is None or len(half) == 1:
+                self._settle(half, error)
+            else:
+                await self._split(half)
+
+    async def _try_commit(self, pending: List[Tuple[List[Write], asyncio.Future]]) -> Optional[Exception]:
+        writes = [write for turn_writes, _ in pending for write in turn_writes]
+        try:
+            started = time.perf_counter()
+            with stage("firestore_write"):
+                await asyncio.to_thread(self._commit, writes)
+            self.last_commit_seconds = time.perf_counter() - started
+            return None
+        except Exception as e:
+            return e
+
+    def _settle(self, pending: List[Tuple[List[Write], asyncio.Future]], error: Optional[Exception]):
+        if error is None:
+            self.batches += 1
+            self.committed_turns += len(pending)
+            self.committed_writes += sum(len(turn_writes) for turn_writes, _ in pending)
+        else:
+            self.dropped_turns += len(pending)
+            log.error(
+                "history_turns_dropped",
+                turns=len(pending),
+                session_ids=session_ids(write for turn_writes, _ in pending for write in turn_writes),
+                error=str(error)
+            )
+
+        for _, future in pending:
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+                # Nobody may be awaiting it; mark the exception as retrieved.
+                future.exception()
+
+    def _commit(self, writes: List[Write]):
+        batch = self.client.batch()
+        for reference, data in writes:
+            batch.set(reference, data)
+        batch.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_depth": self.max_depth,
+            "max_queue": self.max_queue,
+            "submitted_turns": self.submitted,
+            "committed_turns": self.committed_turns,
+            "committed_writes": self.committed_writes,
+            "batches": self.batches,
+            "retries": self.retries,
+            "splits": self.splits,
+            "dropped_turns": self.dropped_turns,
+            "last_commit_seconds": round(self.last_commit_seconds, 6),
+        }
+
+
+history_writer = HistoryWriter(
+    db,
+    max_queue=int(os.getenv("HISTORY_QUEUE_MAX", "1000")),
+    flush_size=int(os.getenv("HISTORY_FLUSH_SIZE", "100")),
+    flush_interval=float(os.getenv("HISTORY_FLUSH_INTERVAL", "0.5")),
+    max_retries=int(os.getenv("HISTORY_MAX_RETRIES", "5")),
+    backoff=float(os.getenv("HISTORY_RETRY_BACKOFF", "0.5"))
+)
+register_stats("history_writer", history_writer.stats)
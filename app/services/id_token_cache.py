@@ -0,0 +1,177 @@
+import asyncio
+import hashlib
+import os
+import re
+import time
+from typing import Any, Dict, Optional
+
+import cachecontrol
+import firebase_admin
+import google.oauth2.id_token
+import requests
+from firebase_admin import auth
+from google.auth.transport.requests import Request
+from utils.singleFlight import SingleFlight
+from utils.stats import register_stats
+from utils.structuredLog import get_logger
+from utils.ttlCache import TTLCache
+
+MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+# Public endpoint with the certificates Firebase ID tokens are signed with.
+ID_TOKEN_CERT_URI = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+ID_TOKEN_ISSUER_PREFIX = "https://securetoken.google.com/"
+MAX_UID_LENGTH = 128
+
+log = get_logger("id_token_cache")
+
+
+class IdTokenCache:
+    """
+    Caches verified Firebase ID tokens so the signature is checked once per
+    token rather than once per request.
+
+    Entries are keyed by a SHA-256 of the token (the token itself is never
+    stored) and live until the token's 'exp'. Misses are verified in a worker
+    thread, and concurrent misses for the same token share one verification.
+
+    Tokens are checked the way firebase_admin's verify_id_token does it,
+    through google-auth's public verify_firebase_token plus the issuer and
+    subject checks. The signing certificates are read through request, a
+    google-auth Request on a Cache-Control aware session; they are fetched
+    ahead of time and refreshed in the background when their max-age runs
+    out, so a verification never has to download them on the request path.
+    With FIREBASE_AUTH_EMULATOR_HOST set, tokens are unsigned and go to
+    auth.verify_id_token instead.
+
+    Args:
+        request: google.auth.transport.Request the certificates are fetched with.
+        project_id: Firebase project the tokens must be issued for; defaults to the default app's.
+        max_entries: Maximum number of cached tokens.
+        key_refresh_margin: Seconds before the certificates expire at which they are refetched.
+        key_retry_interval: Seconds to wait before retrying a failed certificate fetch.
+    """
+
+    def __init__(self, request: Request, project_id: Optional[str], max_entries: int, key_refresh_margin: float, key_retry_interval: float):
+        self.request = request
+        self._project_id = project_id
+        # Entries always get an explicit ttl from the token's exp; this default is never used.
+        self.cache = TTLCache(ttl=3600, max_entries=max_entries)
+        self.key_refresh_margin = key_refresh_margin
+        self.key_retry_interval = key_retry_interval
+
+        self._verifications = SingleFlight()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+        self.verified = 0
+        self.rejected = 0
+        self.key_refreshes = 0
+        self.key_refresh_failures = 0
+        self.keys_expire_at: Optional[float] = None
+
+    @property
+    def project_id(self) -> str:
+        if not self._project_id:
+            self._project_id = firebase_admin.get_app().project_id
+        return self._project_id
+
+    async def verify(self, token: str) -> str:
+        """
+        Returns the uid of a valid ID token. Raises ValueError (or, against
+        the Auth emulator, the firebase_admin auth errors) for invalid or
+        expired tokens.
+        """
+        key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        uid = self.cache.get(key)
+        if uid is not None:
+            return uid
+
+        return await self._verifications.do(key, lambda: self._verify_and_cache(key, token))
+
+    async def _verify_and_cache(self, key: str, token: str) -> str:
+        try:
+            decoded_token = await asyncio.to_thread(self._verify_token, token)
+        except Exception:
+            self.rejected += 1
+            raise
+
+        self.verified += 1
+        uid = decoded_token["uid"]
+        ttl = decoded_token.get("exp", 0) - time.time()
+        if ttl > 0:
+            self.cache.set(key, uid, ttl=ttl)
+        return uid
+
+    def _verify_token(self, token: str) -> Dict[str, Any]:
+        if os.getenv("FIREBASE_AUTH_EMULATOR_HOST"):
+            return auth.verify_id_token(token)
+
+        project_id = self.project_id
+        claims = google.oauth2.id_token.verify_firebase_token(token, self.request, audience=project_id)
+        if claims.get("iss") != ID_TOKEN_ISSUER_PREFIX + project_id:
+            raise ValueError(f"ID token has incorrect \"iss\" (issuer) claim: {claims.get('iss')}")
+        subject = claims.get("sub")
+        if not isinstance(subject, str) or not subject or len(subject) > MAX_UID_LENGTH:
+            raise ValueError("ID token has a missing, empty or too long \"sub\" (subject) claim.")
+        return {**claims, "uid": subject}
+
+    def _fetch_keys(self) -> float:
+        """
+        Fetches the certificates through the same cache-control session the
+        verification reads them from, and returns their lifetime in seconds.
+        """
+        # no-cache makes the session refetch now and store the new response for the verifier.
+        response = self.request(url=ID_TOKEN_CERT_URI, method="GET", headers={"Cache-Control": "no-cache"})
+        if response.status != 200:
+            raise RuntimeError(f"certificate fetch returned HTTP {response.status}")
+
+        match = MAX_AGE_PATTERN.search(response.headers.get("cache-control", ""))
+        return float(match.group(1)) if match else 0.0
+
+    async def _refresh_keys_loop(self):
+        while True:
+            try:
+                max_age = await asyncio.to_thread(self._fetch_keys)
+                self.key_refreshes += 1
+                self.keys_expire_at = time.time() + max_age
+                delay = max(max_age - self.key_refresh_margin, self.key_retry_interval)
+            except Exception as e:
+                self.key_refresh_failures += 1
+                log.warning("firebase_cert_prefetch_failed", error=str(e))
+                delay = self.key_retry_interval
+            await asyncio.sleep(delay)
+
+    def start_key_refresh(self):
+        # The Auth emulator issues unsigned tokens, so there is nothing to prefetch.
+        if self._refresh_task is None and not os.getenv("FIREBASE_AUTH_EMULATOR_HOST"):
+            self._refresh_task = asyncio.create_task(self._refresh_keys_loop())
+
+    async def stop_key_refresh(self):
+        task, self._refresh_task = self._refresh_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.cache.stats(),
+            "verified": self.verified,
+            "rejected": self.rejected,
+            "coalesced": self._verifications.coalesced,
+            "key_refreshes": self.key_refreshes,
+            "key_refresh_failures": self.key_refresh_failures,
+            "keys_expire_in_seconds": round(self.keys_expire_at - time.time(), 1) if self.keys_expire_at else None,
+        }
+
+
+id_token_cache = IdTokenCache(
+    request=Request(session=cachecontrol.CacheControl(requests.Session())),
+    project_id=os.getenv("FIREBASE_PROJECT_ID"),
+    max_entries=int(os.getenv("ID_TOKEN_CACHE_MAX_ENTRIES", "10000")),
+    key_refresh_margin=float(os.getenv("ID_TOKEN_KEY_REFRESH_MARGIN", "300")),
+    key_retry_interval=float(os.getenv("ID_TOKEN_KEY_RETRY_INTERVAL", "30"))
+)
+register_stats("id_token_cache", id_token_cache.stats)
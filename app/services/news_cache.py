@@ -0,0 +1,317 @@
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+from utils.canonicalUrl import canonicalize_url
+from utils.stats import register_stats
+from utils.ttlCache import TTLCache
+
+# Title the WorldNewsAPI returns when it could not extract an article.
+EXTRACTION_FAILED_SENTINEL = "try searching for it instead"
+
+
+class SqliteCacheTier:
+    """
+    Persistent key/value tier backed by a SQLite file, so cached entries
+    survive restarts. Values are stored as JSON with an absolute expiry.
+    """
+
+    def __init__(self, path: str, table: str):
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[tuple]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, stored_at, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        value, stored_at, expires_at = row
+        if expires_at <= time.time():
+            self.delete(key)
+            return None
+
+        return json.loads(value), stored_at, expires_at
+
+    def set(self, key: str, value: Any, ttl: float):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, stored_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, default=str), now, now + ttl)
+            )
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+def is_cacheable_article(article: Optional[Dict[str, Any]]) -> bool:
+    """
+    Only real extractions are cached: error responses, empty articles and the
+    "try searching for it instead" sentinel must always hit the API again.
+    """
+    if not article or article.get("status") == "error":
+        return False
+
+    title = article.get("title") or ""
+    if not title or not article.get("text"):
+        return False
+
+    lowered = title.lower()
+    return EXTRACTION_FAILED_SENTINEL not in lowered and not lowered.startswith("error")
+
+
+class ExtractionCache:
+    """
+    Cache of extract_news results keyed by canonical URL, with an in-memory
+    TTL/LRU tier and an optional SQLite tier. Code on the event loop uses
+    get_async/set_async, which keep the SQLite reads and commits in a worker
+    thread.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, max_bytes: int, db_path: Optional[str] = None):
+        self.ttl = ttl
+        self.memory = TTLCache(ttl=ttl, max_entries=max_entries, max_bytes=max_bytes)
+        self.disk = SqliteCacheTier(db_path, "extracted_articles") if db_path else None
+        self.disk_hits = 0
+
+        if self.disk is not None:
+            self.disk.purge_expired()
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        key = canonicalize_url(url)
+        article = self.memory.get(key)
+        if article is not None or self.disk is None:
+            return article
+        return self._get_disk(key)
+
+    async def get_async(self, url: str) -> Optional[Dict[str, Any]]:
+        key = canonicalize_url(url)
+        article = self.memory.get(key)
+        if article is not None or self.disk is None:
+            return article
+        return await asyncio.to_thread(self._get_disk, key)
+
+    def _get_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.disk.get(key)
+        if entry is None:
+            return None
+
+        article, _, expires_at = entry
+        self.disk_hits += 1
+        # Promote to memory for the rest of its original lifetime.
+        self.memory.set(key, article, ttl=expires_at - time.time())
+        return article
+
+    def set(self, url: str, article: Dict[str, Any]):
+        if not is_cacheable_article(article):
+            return
+
+        key = canonicalize_url(url)
+        self.memory.set(key, article)
+        if self.disk is not None:
+            self.disk.set(key, article, self.ttl)
+
+    async def set_async(self, url: str, article: Dict[str, Any]):
+        if not is_cacheable_article(article):
+            return
+
+        key = canonicalize_url(url)
+        self.memory.set(key, article)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, article, self.ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.memory.stats()
+        stats["disk_enabled"] = self.disk is not None
+        stats["disk_hits"] = self.disk_hits
+        if self.disk is not None:
+            stats["disk_entries"] = self.disk.count()
+        return stats
+
+
+# search_news params whose values are comma-separated lists, compared as sets.
+LIST_PARAMS = ("news_sources", "categories", "authors", "entities", "text_match_indexes")
+# search_news params compared case-insensitively.
+CASE_FOLDED_PARAMS = ("language", "source_country", "sort", "sort_direction")
+DATE_PARAMS = ("earliest_publish_date", "latest_publish_date")
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# (max age of latest_publish_date in seconds, TTL in seconds), checked in order.
+SEARCH_TTL_TIERS = (
+    (3600, 60),
+    (86400, 600),
+    (7 * 86400, 3600),
+)
+SEARCH_TTL_HISTORICAL = 86400
+SEARCH_TTL_OPEN_ENDED = 300
+
+
+def parse_publish_date(value: str) -> Optional[datetime]:
+    try:
+        return datetime.strptime(value.strip(), DATE_FORMAT)
+    except ValueError:
+        try:
+            return datetime.fromisoformat(value.strip())
+        except ValueError:
+            return None
+
+
+def normalize_search_text(text: str) -> str:
+    """Case- and whitespace-folds a query, sorting its uppercase OR alternatives."""
+    terms = [" ".join(term.lower().split()) for term in re.split(r"\s+OR\s+", text.strip())]
+    return " OR ".join(sorted(term for term in terms if term))
+
+
+def normalize_search_kwargs(final_kwargs: Dict[str, Any], date_bucket: int) -> Tuple:
+    """
+    Builds a cache key from the non-None kwargs of a search_news call. Two
+    calls that would return the same articles should produce the same key.
+    """
+    normalized = {}
+    for name, value in final_kwargs.items():
+        if name == "text":
+            value = normalize_search_text(str(value))
+        elif name in LIST_PARAMS:
+            value = ",".join(sorted(item.strip().lower() for item in str(value).split(",") if item.strip()))
+        elif name in CASE_FOLDED_PARAMS:
+            value = str(value).strip().lower()
+        elif name in DATE_PARAMS:
+            parsed = parse_publish_date(str(value))
+            value = int(parsed.timestamp()) // date_bucket if parsed else str(value).strip()
+        normalized[name] = value
+
+    return tuple(sorted(normalized.items()))
+
+
+def search_ttl(final_kwargs: Dict[str, Any]) -> float:
+    """
+    Fresh windows expire fast, historical ones stay cached: the TTL grows
+    with the age of latest_publish_date. Open-ended searches (no
+    latest_publish_date) can gain new articles at any time.
+    """
+    latest = final_kwargs.get("latest_publish_date")
+    parsed = parse_publish_date(str(latest)) if latest else None
+    if parsed is None:
+        return SEARCH_TTL_OPEN_ENDED
+
+    age = (datetime.now() - parsed).total_seconds()
+    for max_age, ttl in SEARCH_TTL_TIERS:
+        if age <= max_age:
+            return ttl
+    return SEARCH_TTL_HISTORICAL
+
+
+class SearchCache:
+    """
+    Cache of compact search_news responses keyed by normalized kwargs, with
+    a TTL that depends on how fresh the requested date window is.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, date_bucket: int):
+        self.date_bucket = date_bucket
+        self.memory = TTLCache(ttl=SEARCH_TTL_OPEN_ENDED, max_entries=max_entries, max_bytes=max_bytes)
+
+    def key(self, final_kwargs: Dict[str, Any]) -> Tuple:
+        return normalize_search_kwargs(final_kwargs, self.date_bucket)
+
+    def get(self, final_kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return self.memory.get(self.key(final_kwargs))
+
+    def set(self, final_kwargs: Dict[str, Any], compact_response: Dict[str, Any]):
+        if "news" not in compact_response:
+            return
+        self.memory.set(self.key(final_kwargs), compact_response, ttl=search_ttl(final_kwargs))
+
+    def stats(self) -> Dict[str, Any]:
+        return self.memory.stats()
+
+
+class VerdictCache:
+    """
+    Cache of fact-checker verdicts keyed on the normalized query plus the
+    sorted set of article URLs sent to the fact-checker. When a query comes
+    back with a different article set, the verdict for the old set is dropped.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, max_bytes: int):
+        self.memory = TTLCache(ttl=ttl, max_entries=max_entries, max_bytes=max_bytes)
+        self._url_sets = TTLCache(ttl=ttl, max_entries=max_entries)
+        self.invalidations = 0
+
+    def get(self, normalized_query: str, urls) -> Optional[Tuple[str, float]]:
+        """Returns (verdict, age in seconds) or None."""
+        url_set = tuple(sorted(set(urls)))
+        previous = self._url_sets.get(normalized_query)
+        if previous is not None and previous != url_set:
+            self.memory.delete((normalized_query, previous))
+            self._url_sets.delete(normalized_query)
+            self.invalidations += 1
+
+        entry = self.memory.get_entry((normalized_query, url_set))
+        if entry is None:
+            return None
+
+        verdict, stored_at = entry
+        return verdict, time.time() - stored_at
+
+    def set(self, normalized_query: str, urls, verdict: str):
+        url_set = tuple(sorted(set(urls)))
+        self.memory.set((normalized_query, url_set), verdict)
+        self._url_sets.set(normalized_query, url_set)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.memory.stats()
+        stats["invalidations"] = self.invalidations
+        return stats
+
+extraction_cache = ExtractionCache(
+    ttl=float(os.getenv("EXTRACT_CACHE_TTL", "21600")),
+    max_entries=int(os.getenv("EXTRACT_CACHE_MAX_ENTRIES", "1000")),
+    max_bytes=int(os.getenv("EXTRACT_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+    db_path=os.getenv("EXTRACT_CACHE_DB_PATH")
+)
+register_stats("extraction_cache", extraction_cache.stats)
+
+search_cache = SearchCache(
+    max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "2000")),
+    max_bytes=int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+    date_bucket=int(os.getenv("SEARCH_CACHE_DATE_BUCKET", "900"))
+)
+register_stats("search_cache", search_cache.stats)
+
+verdict_cache = VerdictCache(
+    ttl=float(os.getenv("VERDICT_CACHE_TTL", "1800")),
+    max_entries=int(os.getenv("VERDICT_CACHE_MAX_ENTRIES", "5000")),
+    max_bytes=int(os.getenv("VERDICT_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+)
+register_stats("verdict_cache", verdict_cache.stats)
@@ -0,0 +1,279 @@
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from config.db import db
+from google.cloud import firestore
+from services.history_writer import FIRESTORE_BATCH_LIMIT
+from services.session_list_cache import session_list_cache
+from utils.stats import register_stats
+from utils.structuredLog import get_logger
+
+log = get_logger("session_deletion")
+
+
+# Job fields stored in the job document, besides the timestamps.
+JOB_FIELDS = ("status", "sessions_total", "sessions_deleted", "sessions_failed", "messages_deleted", "error")
+
+
+class DeletionJob:
+    """
+    Progress of one background delete-all-sessions run, stored in
+    chats/{user_id}/deletion_jobs/{job_id} so any instance can report it.
+
+    status is running, completed, partial (some sessions could not be
+    deleted), failed, or interrupted (the instance running it stopped
+    reporting progress).
+    """
+
+    def __init__(self, user_id: str, job_id: Optional[str] = None, **fields: Any):
+        self.job_id = job_id or str(uuid.uuid4())
+        self.user_id = user_id
+        self.status = fields.get("status") or "running"
+        self.sessions_total: Optional[int] = fields.get("sessions_total")
+        self.sessions_deleted = fields.get("sessions_deleted") or 0
+        self.sessions_failed = fields.get("sessions_failed") or 0
+        self.messages_deleted = fields.get("messages_deleted") or 0
+        self.started_at: datetime = fields.get("started_at") or datetime.now(timezone.utc)
+        self.updated_at: datetime = fields.get("updated_at") or self.started_at
+        self.finished_at: Optional[datetime] = fields.get("finished_at")
+        self.expires_at: Optional[datetime] = fields.get("expires_at")
+        self.error: Optional[str] = fields.get("error")
+
+    @classmethod
+    def from_snapshot(cls, user_id: str, snapshot) -> "DeletionJob":
+        return cls(user_id, snapshot.id, **snapshot.to_dict())
+
+    def to_document(self) -> Dict[str, Any]:
+        document = {field: getattr(self, field) for field in JOB_FIELDS}
+        document.update(started_at=self.started_at, updated_at=self.updated_at, finished_at=self.finished_at, expires_at=self.expires_at)
+        return document
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "sessions_total": self.sessions_total,
+            "sessions_deleted": self.sessions_deleted,
+            "sessions_failed": self.sessions_failed,
+            "messages_deleted": self.messages_deleted,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+class SessionDeleter:
+    """
+    Deletes chat sessions and their messages with concurrent batch commits.
+
+    Message references are listed with an empty field mask, split into
+    batches of FIRESTORE_BATCH_LIMIT deletes and committed in parallel, with
+    at most max_in_flight commits running at once across all deletions.
+    Deleting all of a user's sessions runs as a background DeletionJob that
+    processes up to max_sessions_in_flight sessions at a time.
+
+    Job progress is written to Firestore at most every progress_interval
+    seconds, so GET /sessions/deletions/{job_id} works on every instance.
+    A running job whose document was not updated for stale_after seconds
+    is reported as interrupted, and a new delete-all may start. Finished
+    jobs carry an expires_at (usable as a Firestore TTL policy field) and
+    are no longer returned after it.
+
+    Args:
+        client: Firestore client.
+        max_in_flight: Maximum concurrent batch commits.
+        max_sessions_in_flight: Maximum sessions a delete-all job works on at once.
+        job_ttl: Seconds a finished job stays queryable.
+        progress_interval: Minimum seconds between progress writes of a job.
+        stale_after: Seconds without a progress write after which a running job counts as interrupted.
+    """
+
+    def __init__(
+        self,
+        client,
+        max_in_flight: int,
+        max_sessions_in_flight: int,
+        job_ttl: float,
+        progress_interval: float,
+        stale_after: float
+    ):
+        self.client = client
+        self.max_in_flight = max_in_flight
+        self.max_sessions_in_flight = max_sessions_in_flight
+        self.job_ttl = job_ttl
+        self.progress_interval = progress_interval
+        self.stale_after = stale_after
+
+        self._commits = asyncio.Semaphore(max_in_flight)
+        # Only keeps this instance's job tasks alive; their state lives in Firestore.
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.batches = 0
+        self.documents_deleted = 0
+        self.failed_sessions = 0
+
+    def sessions_ref(self, user_id: str):
+        return self.client.collection(u'chats').document(user_id).collection(u'sessions')
+
+    def jobs_ref(self, user_id: str):
+        return self.client.collection(u'chats').document(user_id).collection(u'deletion_jobs')
+
+    async def delete_references(self, references: List[Any], on_deleted: Optional[Callable[[int], None]] = None) -> int:
+        chunks = [references[i:i + FIRESTORE_BATCH_LIMIT] for i in range(0, len(references), FIRESTORE_BATCH_LIMIT)]
+
+        async def commit(chunk):
+            async with self._commits:
+                await asyncio.to_thread(self._commit_deletes, chunk)
+            self.batches += 1
+            self.documents_deleted += len(chunk)
+            if on_deleted:
+                on_deleted(len(chunk))
+
+        # Every commit finishes before a failure is raised, so none is left running unobserved.
+        results = await asyncio.gather(*(commit(chunk) for chunk in chunks), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            raise errors[0]
+        return len(references)
+
+    def _commit_deletes(self, references: List[Any]):
+        batch = self.client.batch()
+        for reference in references:
+            batch.delete(reference)
+        batch.commit()
+
+    async def delete_session(self, session_ref, on_deleted: Optional[Callable[[int], None]] = None) -> int:
+        """
+        Deletes every message of a session, then the session document. Returns
+        the message count. When a batch fails the session document is kept,
+        so the session still shows up and the delete can be retried.
+        """
+        references = await asyncio.to_thread(
+            lambda: [doc.reference for doc in session_ref.collection(u'messages').select([]).stream()]
+        )
+        deleted = await self.delete_references(references, on_deleted)
+        await asyncio.to_thread(session_ref.delete)
+        return deleted
+
+    async def start_delete_all(self, user_id: str) -> DeletionJob:
+        """Starts deleting all of a user's sessions, or returns the job already doing it."""
+        latest = await asyncio.to_thread(self._latest_job, user_id)
+        if latest is not None and latest.status == "running" and not self._is_stale(latest):
+            return latest
+
+        job = DeletionJob(user_id)
+        await asyncio.to_thread(self._save_job, job)
+        task = asyncio.create_task(self._delete_all(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def get_job(self, job_id: str, user_id: str) -> Optional[DeletionJob]:
+        snapshot = await asyncio.to_thread(self.jobs_ref(user_id).document(job_id).get)
+        if not snapshot.exists:
+            return None
+
+        job = DeletionJob.from_snapshot(user_id, snapshot)
+        if job.expires_at is not None and job.expires_at <= datetime.now(timezone.utc):
+            return None
+        if job.status == "running" and self._is_stale(job):
+            job.status = "interrupted"
+            job.error = "The deletion stopped reporting progress; start it again to delete the remaining sessions."
+        return job
+
+    def _latest_job(self, user_id: str) -> Optional[DeletionJob]:
+        query = self.jobs_ref(user_id).order_by(u'started_at', direction=firestore.Query.DESCENDING).limit(1)
+        for snapshot in query.stream():
+            return DeletionJob.from_snapshot(user_id, snapshot)
+        return None
+
+    def _is_stale(self, job: DeletionJob) -> bool:
+        return (datetime.now(timezone.utc) - job.updated_at).total_seconds() > self.stale_after
+
+    def _save_job(self, job: DeletionJob):
+        job.updated_at = datetime.now(timezone.utc)
+        self.jobs_ref(job.user_id).document(job.job_id).set(job.to_document())
+
+    async def _delete_all(self, job: DeletionJob):
+        sessions = asyncio.Semaphore(self.max_sessions_in_flight)
+        saving = asyncio.Lock()
+        saved_at = time.monotonic()
+
+        async def save_progress():
+            nonlocal saved_at
+            if time.monotonic() - saved_at < self.progress_interval or saving.locked():
+                return
+            async with saving:
+                saved_at = time.monotonic()
+                await asyncio.to_thread(self._save_job, job)
+
+        def count_messages(deleted: int):
+            job.messages_deleted += deleted
+
+        async def delete_one(session_ref):
+            async with sessions:
+                await self.delete_session(session_ref, count_messages)
+            job.sessions_deleted += 1
+            await save_progress()
+
+        session_list_cache.invalidate(job.user_id)
+        try:
+            session_refs = await asyncio.to_thread(
+                lambda: [doc.reference for doc in self.sessions_ref(job.user_id).select([]).stream()]
+            )
+            job.sessions_total = len(session_refs)
+            results = await asyncio.gather(*(delete_one(session_ref) for session_ref in session_refs), return_exceptions=True)
+
+            errors = [result for result in results if isinstance(result, Exception)]
+            job.sessions_failed = len(errors)
+            self.failed_sessions += len(errors)
+            if errors:
+                log.warning(
+                    "delete_all_job_partial",
+                    job_id=job.job_id,
+                    sessions_failed=len(errors),
+                    sessions_total=job.sessions_total,
+                    error_type=type(errors[0]).__name__,
+                    error=str(errors[0])
+                )
+                job.status = "partial"
+                job.error = f"{len(errors)} of {job.sessions_total} sessions could not be deleted ({type(errors[0]).__name__})."
+            else:
+                job.status = "completed"
+        except Exception as e:
+            log.error("delete_all_job_failed", exc_info=e, job_id=job.job_id, error_type=type(e).__name__, error=str(e))
+            job.status = "failed"
+            job.error = type(e).__name__
+        finally:
+            session_list_cache.invalidate(job.user_id)
+            job.finished_at = datetime.now(timezone.utc)
+            job.expires_at = job.finished_at + timedelta(seconds=self.job_ttl)
+            async with saving:
+                try:
+                    await asyncio.to_thread(self._save_job, job)
+                except Exception as e:
+                    log.error("delete_all_job_save_failed", exc_info=e, job_id=job.job_id, status=job.status, error=str(e))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "batches": self.batches,
+            "documents_deleted": self.documents_deleted,
+            "failed_sessions": self.failed_sessions,
+            "running_jobs": len(self._tasks),
+        }
+
+
+session_deleter = SessionDeleter(
+    db,
+    max_in_flight=int(os.getenv("DELETE_MAX_IN_FLIGHT", "8")),
+    max_sessions_in_flight=int(os.getenv("DELETE_MAX_SESSIONS_IN_FLIGHT", "4")),
+    job_ttl=float(os.getenv("DELETE_JOB_TTL", "3600")),
+    progress_interval=float(os.getenv("DELETE_JOB_PROGRESS_INTERVAL", "2")),
+    stale_after=float(os.getenv("DELETE_JOB_STALE_AFTER", "300"))
+)
+register_stats("session_deleter", session_deleter.stats)
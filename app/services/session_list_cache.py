@@ -0,0 +1,171 @@
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.stats import register_stats
+from utils.ttlCache import TTLCache
+
+# A session row as listed by GET /sessions: session_id, title, created_at.
+SessionRow = Dict[str, Any]
+
+# Write-through creates remembered per user until Firestore has surely seen them.
+MAX_RECENT_CREATES = 20
+
+
+def paginate(rows: List[SessionRow], complete: bool, cursor: Optional[Dict[str, Any]], limit: Optional[int]) -> Optional[Tuple[List[SessionRow], bool]]:
+    """
+    Returns (page, has_more) for a page of rows ordered newest first (every
+    row after the cursor when limit is None), or None when the rows are only
+    a prefix of the list and the page runs past their end (or the cursor
+    points outside them).
+    """
+    start = 0
+    if cursor:
+        index = next((i for i, row in enumerate(rows) if row["session_id"] == cursor["id"]), None)
+        if index is None:
+            return None
+        start = index + 1
+
+    page = rows[start:None if limit is None else start + limit]
+    if limit is not None and len(page) == limit:
+        return page, len(rows) > start + limit or not complete
+    if complete:
+        return page, False
+    return None
+
+
+class SessionListCache:
+    """
+    Per-user cache of the newest sessions ("head") that GET /sessions pages
+    through before asking Firestore.
+
+    The head holds up to depth rows and is refreshed from Firestore at most
+    every ttl seconds. Creating and deleting sessions update it write-through.
+    Because session documents are written behind, a fill from Firestore may
+    not see a session created moments ago yet, so recent write-through
+    creates are merged into every fill. A fill that raced with a write is
+    returned but not stored.
+
+    Args:
+        enabled: When false every listing goes to Firestore (read counters still run).
+        ttl: Seconds a head is trusted without write-through updates going wrong.
+        max_users: Maximum number of users with a cached head.
+        depth: Number of newest sessions read into the head on a fill.
+    """
+
+    def __init__(self, enabled: bool, ttl: float, max_users: int, depth: int):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.max_users = max_users
+        self.depth = depth
+
+        self._heads = TTLCache(ttl=ttl, max_entries=max_users)
+        self._recent_creates = TTLCache(ttl=ttl, max_entries=max_users)
+        self._generations = TTLCache(ttl=ttl, max_entries=max_users)
+        self._lock = threading.Lock()
+
+        self.fills = 0
+        self.skipped_fills = 0
+        self.firestore_queries = 0
+        self.firestore_documents_read = 0
+
+    def get_page(self, user_id: str, cursor: Optional[Dict[str, Any]], limit: Optional[int]) -> Optional[Tuple[List[SessionRow], bool]]:
+        if not self.enabled:
+            return None
+        head = self._heads.get(user_id)
+        if head is None:
+            return None
+        return paginate(head["rows"], head["complete"], cursor, limit)
+
+    def generation(self, user_id: str) -> int:
+        return self._generations.get(user_id) or 0
+
+    def fill(self, user_id: str, generation: int, rows: List[SessionRow], complete: bool) -> List[SessionRow]:
+        """Stores a head read from Firestore and returns it with recent creates merged in."""
+        known = {row["session_id"] for row in rows}
+        missing = [row for row in self._recent_creates.get(user_id) or [] if row["session_id"] not in known]
+        if missing:
+            rows = sorted(missing + rows, key=lambda row: row["created_at"], reverse=True)
+
+        if not self.enabled:
+            return rows
+
+        with self._lock:
+            if self.generation(user_id) != generation:
+                self.skipped_fills += 1
+                return rows
+            if len(rows) > self.depth:
+                self._heads.set(user_id, {"rows": rows[:self.depth], "complete": False})
+            else:
+                self._heads.set(user_id, {"rows": rows, "complete": complete})
+        self.fills += 1
+        return rows
+
+    def record_firestore_read(self, documents: int):
+        self.firestore_queries += 1
+        self.firestore_documents_read += documents
+
+    def add_session(self, user_id: str, row: SessionRow):
+        """Write-through for a newly created session."""
+        with self._lock:
+            self._bump(user_id)
+            recent = [row] + (self._recent_creates.get(user_id) or [])[:MAX_RECENT_CREATES - 1]
+            self._recent_creates.set(user_id, recent)
+
+            head = self._heads.get(user_id)
+            if head is None:
+                return
+            rows = [row] + [r for r in head["rows"] if r["session_id"] != row["session_id"]]
+            complete = head["complete"]
+            if len(rows) > self.depth:
+                rows, complete = rows[:self.depth], False
+            self._heads.set(user_id, {"rows": rows, "complete": complete})
+
+    def remove_session(self, user_id: str, session_id: str):
+        """Write-through for a deleted session."""
+        with self._lock:
+            self._bump(user_id)
+            recent = self._recent_creates.get(user_id)
+            if recent:
+                self._recent_creates.set(user_id, [r for r in recent if r["session_id"] != session_id])
+
+            head = self._heads.get(user_id)
+            if head is None:
+                return
+            rows = [r for r in head["rows"] if r["session_id"] != session_id]
+            self._heads.set(user_id, {"rows": rows, "complete": head["complete"]})
+
+    def invalidate(self, user_id: str):
+        with self._lock:
+            self._bump(user_id)
+            self._heads.delete(user_id)
+            self._recent_creates.delete(user_id)
+
+    def _bump(self, user_id: str):
+        self._generations.set(user_id, self.generation(user_id) + 1)
+
+    def stats(self) -> Dict[str, Any]:
+        heads = self._heads.stats()
+        return {
+            "enabled": self.enabled,
+            "users": heads["entries"],
+            "max_users": self.max_users,
+            "depth": self.depth,
+            "ttl_seconds": self.ttl,
+            "hits": heads["hits"],
+            "misses": heads["misses"],
+            "hit_ratio": heads["hit_ratio"],
+            "fills": self.fills,
+            "skipped_fills": self.skipped_fills,
+            "firestore_queries": self.firestore_queries,
+            "firestore_documents_read": self.firestore_documents_read,
+        }
+
+
+session_list_cache = SessionListCache(
+    enabled=os.getenv("SESSION_LIST_CACHE_ENABLED", "true").lower() in ("1", "true", "yes"),
+    ttl=float(os.getenv("SESSION_LIST_CACHE_TTL", "60")),
+    max_users=int(os.getenv("SESSION_LIST_CACHE_MAX_USERS", "10000")),
+    depth=int(os.getenv("SESSION_LIST_CACHE_DEPTH", "50"))
+)
+register_stats("session_list_cache", session_list_cache.stats)
@@ -0,0 +1,642 @@
+import asyncio
+import os
+import time
+from typing import Dict, Any, List, Optional
+
+import httpx
+from google.adk.tools import FunctionTool
+from services.worldnewsapi_scheduler import RateLimitError, WorldNewsApiScheduler
+from services.news_cache import extraction_cache, is_cacheable_article, search_cache
+from services.article_index import article_index
+from utils.canonicalUrl import canonicalize_url, url_host
+from utils.circuitBreaker import CircuitBreaker
+from utils.metrics import STAGE_IN_FLIGHT, observe_stage, record_cache, record_error
+from utils.singleFlight import SingleFlight
+from utils.stats import LatencyWindow, register_stats
+from utils.structuredLog import get_logger
+
+log = get_logger("worldnewsapi")
+
+# WORLDNEWSAPI_HOST points the client at another server, e.g. the benchmark's fake API.
+WORLDNEWSAPI_HOST = os.getenv("WORLDNEWSAPI_HOST", "https://api.worldnewsapi.com")
+
+# Rate limit and quota handling shared by every WorldNewsAPI call.
+api_scheduler = WorldNewsApiScheduler(
+    rate=float(os.getenv("WORLDNEWSAPI_RATE", "10")),
+    burst=int(os.getenv("WORLDNEWSAPI_BURST", "20")),
+    max_queue=int(os.getenv("WORLDNEWSAPI_QUEUE_MAX", "200")),
+    queue_timeout=float(os.getenv("WORLDNEWSAPI_QUEUE_TIMEOUT", "10")),
+    quota_reserve=float(os.getenv("WORLDNEWSAPI_QUOTA_RESERVE", "50")),
+    max_retries=int(os.getenv("WORLDNEWSAPI_MAX_RETRIES", "3")),
+    retry_deadline=float(os.getenv("WORLDNEWSAPI_RETRY_DEADLINE", "15")),
+    backoff=float(os.getenv("WORLDNEWSAPI_RETRY_BACKOFF", "0.5"))
+)
+register_stats("worldnewsapi_scheduler", api_scheduler.stats)
+
+# Maximum characters of article text kept by the compact projection of search_news.
+# Long enough for the snippet selector to find passages past the lede.
+COMPACT_TEXT_CHARS = int(os.getenv("WORLDNEWSAPI_COMPACT_TEXT_CHARS", "4000"))
+COMPACT_FIELDS = ("url", "title", "text", "publish_date", "sentiment")
+
+
+class AsyncWorldNewsApi:
+    """
+    Native asyncio WorldNewsAPI client.
+
+    Every coroutine in this module goes through the same httpx.AsyncClient, so
+    calls made from the event loop share one keep-alive connection pool and
+    never occupy a threadpool worker. The time each request waits for a free
+    connection is recorded, and stats report the pool's open and idle
+    connections. Sync callers go through the wrappers
+    in services/worldnewsapi_client.py, which run these coroutines on the
+    loop the client was started on.
+
+    Args:
+        host: Base URL of the WorldNewsAPI.
+        api_key: Key sent in the 'x-api-key' header.
+        max_connections: Maximum number of open connections.
+        max_keepalive: Maximum number of idle connections kept alive.
+        timeout: Per-request timeout in seconds.
+        pool_timeout: Seconds a request waits for a free connection once max_connections are busy.
+    """
+
+    def __init__(self, host: str, api_key: Optional[str], max_connections: int, max_keepalive: int, timeout: float, pool_timeout: float):
+        self.host = host
+        self.api_key = api_key
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.timeout = timeout
+        self.pool_timeout = pool_timeout
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._transport: Optional[httpx.AsyncHTTPTransport] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._in_flight = 0
+        self._requests = 0
+        self._errors = 0
+        self._pool_timeouts = 0
+        self._pool_wait_total = 0.0
+        self._pool_wait_max = 0.0
+        self._pool_waits = 0
+        self._seconds_total = 0.0
+
+    async def start(self) -> None:
+        if self._client is not None:
+            return
+
+        self._transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_keepalive)
+        )
+        self._client = httpx.AsyncClient(
+            base_url=self.host,
+            headers={"x-api-key": self.api_key or "", "Accept": "application/json"},
+            transport=self._transport,
+            timeout=httpx.Timeout(self.timeout, pool=self.pool_timeout)
+        )
+        self.loop = asyncio.get_running_loop()
+        log.info("worldnewsapi_session_started", max_connections=self.max_connections)
+
+    async def close(self) -> None:
+        client, self._client = self._client, None
+        self._transport = None
+        self.loop = None
+        if client is not None:
+            await client.aclose()
+            log.info("worldnewsapi_session_closed")
+
+    async def get(
+        self,
+        path: str,
+        params: Dict[str, Any],
+        deadline: Optional[float] = None,
+        attempt_timeout: Optional[float] = None,
+        latency: Optional[LatencyWindow] = None
+    ) -> Dict[str, Any]:
+        """
+        Sends a GET request once the shared scheduler allows it and returns
+        the decoded JSON body; 429/5xx answers are retried as long as the
+        retry starts before deadline (a time.monotonic() value, by default
+        the scheduler's retry_deadline from now). A connection is only held
+        while a request is on the wire, never during the scheduler wait or a
+        retry's backoff.
+
+        Callers that time the API themselves pass attempt_timeout: each
+        request on the wire is limited to it (asyncio.TimeoutError), its time
+        is recorded in latency, and local queueing (no scheduler token, no
+        free connection) raises RateLimitError instead of looking like a slow
+        or failing API. Other failures are returned as
+        {"status": "error", "error_message": ...}, the shape every tool
+        returns for a failed call.
+        """
+        if self._client is None:
+            await self.start()
+
+        query = {
+            key.replace("_", "-"): str(value).lower() if isinstance(value, bool) else value
+            for key, value in params.items()
+        }
+
+        # e.g. "/search-news" is reported as the search_news_http stage.
+        stage_name = path.strip("/").replace("-", "_") + "_http"
+        STAGE_IN_FLIGHT.labels(stage_name).inc()
+        self._in_flight += 1
+        self._requests += 1
+        started = time.perf_counter()
+        try:
+            if deadline is None:
+                deadline = time.monotonic() + api_scheduler.retry_deadline
+            attempt = 0
+            while True:
+                await api_scheduler.acquire_async()
+                sent = time.perf_counter()
+                response = await asyncio.wait_for(self._send(path, query), attempt_timeout)
+                if latency is not None:
+                    latency.record(time.perf_counter() - sent)
+                api_scheduler.observe_response(response.status_code, response.headers)
+                delay = api_scheduler.retry_delay(response.status_code, response.headers, attempt, deadline) if response.is_error else None
+                if delay is None:
+                    break
+                attempt += 1
+                await asyncio.sleep(delay)
+
+            if response.is_error:
+                self._errors += 1
+                record_error(stage_name)
+                return {
+                    "status": "error",
+                    "error_message": f"({response.status_code})\nReason: {response.reason_phrase}\nHTTP response body: {response.text}"
+                }
+            return response.json()
+
+        except asyncio.TimeoutError:
+            self._errors += 1
+            record_error(stage_name)
+            raise
+
+        except (httpx.HTTPError, ValueError, RateLimitError) as e:
+            self._errors += 1
+            record_error(stage_name)
+            if isinstance(e, httpx.PoolTimeout):
+                self._pool_timeouts += 1
+                if attempt_timeout is not None:
+                    raise RateLimitError(f"No WorldNewsAPI connection free within {self.pool_timeout}s.") from e
+            elif isinstance(e, RateLimitError) and attempt_timeout is not None:
+                raise
+            log.warning("worldnewsapi_request_failed", path=path, error_type=type(e).__name__, error=str(e))
+            return {"status": "error", "error_message": str(e)}
+
+        finally:
+            elapsed = time.perf_counter() - started
+            self._in_flight -= 1
+            self._seconds_total += elapsed
+            observe_stage(stage_name, elapsed)
+            STAGE_IN_FLIGHT.labels(stage_name).dec()
+
+    async def _send(self, path: str, query: Dict[str, Any]) -> httpx.Response:
+        """One request on the wire; the time until it got a connection is recorded as pool wait."""
+        started = time.perf_counter()
+        connected = None
+
+        async def trace(event: str, info: Dict[str, Any]):
+            # The first connection-level event (connect or send headers) happens once the pool handed one out.
+            nonlocal connected
+            if connected is None:
+                connected = time.perf_counter()
+
+        try:
+            return await self._client.get(path, params=query, extensions={"trace": trace})
+        finally:
+            waited = (connected or time.perf_counter()) - started
+            self._pool_waits += 1
+            self._pool_wait_total += waited
+            self._pool_wait_max = max(self._pool_wait_max, waited)
+
+    def _connections(self) -> List[Any]:
+        # httpx has no public view of its pool; the httpcore pool's 'connections' list is public.
+        pool = getattr(self._transport, "_pool", None)
+        return list(getattr(pool, "connections", None) or [])
+
+    def stats(self) -> Dict[str, Any]:
+        connections = self._connections()
+        return {
+            "started": self._client is not None,
+            "max_connections": self.max_connections,
+            "max_keepalive": self.max_keepalive,
+            "open_connections": len(connections),
+            "idle_connections": sum(1 for connection in connections if connection.is_idle()),
+            "in_flight": self._in_flight,
+            "requests": self._requests,
+            "errors": self._errors,
+            "pool_timeouts": self._pool_timeouts,
+            "pool_wait_seconds_avg": round(self._pool_wait_total / self._pool_waits, 6) if self._pool_waits else 0.0,
+            "pool_wait_seconds_max": round(self._pool_wait_max, 6),
+            "latency_seconds_avg": round(self._seconds_total / self._requests, 6) if self._requests else 0.0,
+        }
+
+
+# One long-lived client per process; started and closed by the FastAPI lifespan in main.py.
+async_api = AsyncWorldNewsApi(
+    host=WORLDNEWSAPI_HOST,
+    api_key=os.getenv("WORLDNEWSAPI_API_KEY"),
+    max_connections=int(os.getenv("WORLDNEWSAPI_POOL_SIZE", "20")),
+    max_keepalive=int(os.getenv("WORLDNEWSAPI_POOL_KEEPALIVE", "10")),
+    timeout=float(os.getenv("WORLDNEWSAPI_TIMEOUT", "30")),
+    pool_timeout=float(os.getenv("WORLDNEWSAPI_POOL_ACQUIRE_TIMEOUT", "5"))
+)
+register_stats("worldnewsapi_async", async_api.stats)
+
+# Concurrent cache misses for the same article or search (e.g. the items of
+# one batch, or users checking the same story) share one API call.
+api_flight = SingleFlight()
+register_stats("worldnewsapi_single_flight", api_flight.stats)
+
+# Slow publisher sites make extract_news the tail of the whole pipeline. Each
+# extract request gets EXTRACT_TIMEOUT seconds of HTTP time (waiting for a
+# scheduler token is not counted); if the first has not answered by the recent
+# p95 latency a second, hedged request is sent and the first good answer wins.
+# 429/5xx answers are retried like any other call, but only while the retry
+# starts within EXTRACT_TIMEOUT of the first request.
+# Timeouts and failed extractions count against the publisher's host, and a
+# host that keeps failing is skipped for EXTRACT_BREAKER_RESET seconds.
+# WorldNewsAPI's own errors (quota, 5xx) say nothing about the publisher and
+# are not counted.
+EXTRACT_TIMEOUT = float(os.getenv("EXTRACT_TIMEOUT", "10"))
+EXTRACT_HEDGE_ENABLED = os.getenv("EXTRACT_HEDGE_ENABLED", "true").lower() in ("1", "true", "yes")
+EXTRACT_HEDGE_PERCENTILE = float(os.getenv("EXTRACT_HEDGE_PERCENTILE", "95"))
+EXTRACT_HEDGE_MIN_DELAY = float(os.getenv("EXTRACT_HEDGE_MIN_DELAY", "0.5"))
+# Below this many recorded latencies the percentile is too noisy to hedge on.
+EXTRACT_HEDGE_MIN_SAMPLES = 20
+
+extract_latency = LatencyWindow(size=int(os.getenv("EXTRACT_LATENCY_WINDOW", "200")))
+extract_breaker = CircuitBreaker(
+    failure_threshold=int(os.getenv("EXTRACT_BREAKER_FAILURES", "3")),
+    reset_timeout=float(os.getenv("EXTRACT_BREAKER_RESET", "60")),
+    max_keys=int(os.getenv("EXTRACT_BREAKER_MAX_HOSTS", "1000"))
+)
+extract_counters = {"hedged": 0, "hedge_won": 0, "timeouts": 0, "short_circuited": 0}
+
+
+def extract_stats() -> Dict[str, Any]:
+    delay = hedge_delay()
+    return {
+        **extract_counters,
+        "hedge_delay_seconds": round(delay, 6) if delay is not None else None,
+        "breaker": extract_breaker.stats(),
+    }
+
+register_stats("extract_news", extract_stats)
+
+
+class ExtractionUnavailable(Exception):
+    """extract_news was not attempted (the host's circuit is open) or did not answer within EXTRACT_TIMEOUT."""
+
+SEARCH_NEWS_PARAMS = (
+    "text", "language", "news_sources", "earliest_publish_date", "latest_publish_date", "categories",
+    "authors", "entities", "source_country", "min_sentiment", "max_sentiment", "location_filter",
+    "sort", "sort_direction", "offset", "number", "text_match_indexes"
+)
+
+async def search_news_sources(name: str) -> Dict[str, Any]:
+    """
+    Searches for news sources (media outlets) that match a given name.
+    Use this tool to find a source's ID before using it in another search.
+
+    Args:
+        name: The name of the news source to search for (e.g., "BBC", "CNN").
+
+    Returns:
+        A dictionary with the API response, which has two main structures:
+
+        1. On a successful API call (even if no results are found):
+           A dictionary containing an 'available' (int) key and a 'sources' (list) key.
+           The LLM *must* check the 'available' key.
+           - If 'available' is 0, it means no sources were found.
+             (e.g., {"available": 0, "sources": []})
+           - If 'available' > 0, the 'sources' list will contain the found outlets.
+             (e.g., {"available": 2, "sources": [...]})
+
+        2. On an API exception or connection error:
+           A dictionary with an error status.
+           (e.g., {"status": "error", "error_message": "Exception details..."})
+    """
+    return await async_api.get("/search-news-sources", {"name": name})
+
+async def extract_news_links(url: str) -> Dict[str, Any]:
+    """
+    Extracts all news article links found *on* a single given URL.
+    
+    Use this if the user provides *any* URL (it could be a homepage like "cnn.com"
+    or a specific article URL like "cnn.com/article/123") and wants to see 
+    all the other links present on that page.
+
+    Args:
+        url: The URL of the page to extract links from.
+
+    Returns:
+        A dictionary with the API response, which has two main structures:
+
+        1. On a successful API call:
+           A dictionary containing a 'news_links' (list) key.
+           The LLM *must* check if this list is empty.
+           - If 'news_links' is an empty list, it means no links were found.
+             (e.g., {"news_links": []})
+           - If 'news_links' is not empty, it contains the list of found URLs.
+             (e.g., {"news_links": ["https://...", "https://...", ...]})
+
+        2. On an API exception or connection error:
+           A dictionary with an error status.
+           (e.g., {"status": "error", "error_message": "Exception details..."})
+    """
+    return await async_api.get("/extract-news-links", {"url": url, "analyze": True})
+
+async def extract_news(url: str) -> Dict[str, Any]:
+    """
+    Extracts the full content (text, title, author) of a *single* news article
+    from its specific URL. Use this when the user provides a direct link
+    to an article and wants a summary, author, or the full text.
+
+    Args:
+        url: The exact URL of the article to analyze.
+
+    Returns:
+        A dictionary with the API response, which has three main structures:
+
+        1. On a successful extraction:
+           A dictionary containing the article's content, with populated 'title',
+           'text', 'url', and other fields.
+           (e.g., {"title": "What happens if Roe v Wade...", "text": "...", ...})
+
+        2. On a successful API call BUT an API-level error (e.g., malformed URL):
+           A dictionary where the 'title' and 'text' fields contain an error message.
+           The LLM *must* check if the 'title' or 'text' contains "Error," or
+           "malformed request".
+           (e.g., {"title": "Error, malformed request...", "text": "...", "url": ""})
+
+        3. On an API exception or connection error:
+           A dictionary with a 'status' key indicating a system-level error.
+           (e.g., {"status": "error", "error_message": "Exception details..."})
+    """
+    try:
+        return await extract_article(url)
+    except ExtractionUnavailable as e:
+        return {"status": "error", "error_message": str(e)}
+
+async def extract_article(url: str) -> Dict[str, Any]:
+    """extract_news for pipeline code: raises ExtractionUnavailable instead of returning an error dict for it."""
+    cached_article = await extraction_cache.get_async(url)
+    record_cache("extraction", cached_article is not None)
+    if cached_article is not None:
+        return cached_article
+
+    return await api_flight.do(f"extract:{canonicalize_url(url)}", lambda: fetch_article(url))
+
+def hedge_delay() -> Optional[float]:
+    if not EXTRACT_HEDGE_ENABLED or len(extract_latency) < EXTRACT_HEDGE_MIN_SAMPLES:
+        return None
+    return max(EXTRACT_HEDGE_MIN_DELAY, extract_latency.percentile(EXTRACT_HEDGE_PERCENTILE))
+
+async def timed_extract(url: str, deadline: float) -> Dict[str, Any]:
+    """
+    One extract request, retried on 429/5xx while retries start before
+    deadline. Local queueing (RateLimitError) is never mistaken for a slow
+    publisher: only the time on the wire is limited to EXTRACT_TIMEOUT
+    (asyncio.TimeoutError) and recorded in extract_latency.
+    """
+    return await async_api.get(
+        "/extract-news",
+        {"url": url, "analyze": True},
+        deadline=deadline,
+        attempt_timeout=EXTRACT_TIMEOUT,
+        latency=extract_latency
+    )
+
+async def hedged_extract(url: str) -> Dict[str, Any]:
+    """
+    Sends one extract request, plus a second one when the first is slower
+    than hedge_delay(); both stop retrying EXTRACT_TIMEOUT after the first
+    was sent. Returns the first good extraction, otherwise the last answer
+    received; when no request answered at all, raises the error of the last
+    one (e.g. asyncio.TimeoutError).
+    """
+    deadline = time.monotonic() + EXTRACT_TIMEOUT
+    first = asyncio.ensure_future(timed_extract(url, deadline))
+    tasks = [first]
+    try:
+        delay = hedge_delay()
+        if delay is not None:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                extract_counters["hedged"] += 1
+                tasks.append(asyncio.ensure_future(timed_extract(url, deadline)))
+
+        article, error = None, None
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    error = task.exception()
+                    continue
+                article = task.result()
+                if is_cacheable_article(article):
+                    if task is not first:
+                        extract_counters["hedge_won"] += 1
+                    return article
+        if article is None:
+            raise error
+        return article
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def fetch_article(url: str) -> Dict[str, Any]:
+    host = url_host(url)
+    if not extract_breaker.allow(host):
+        extract_counters["short_circuited"] += 1
+        raise ExtractionUnavailable(f"Skipping extract_news for {host}: it kept failing recently.")
+
+    healthy = None
+    try:
+        try:
+            article = await hedged_extract(url)
+        except asyncio.TimeoutError:
+            healthy = False
+            extract_counters["timeouts"] += 1
+            raise ExtractionUnavailable(f"extract_news for {host} did not answer within {EXTRACT_TIMEOUT}s.") from None
+        except RateLimitError as e:
+            raise ExtractionUnavailable(str(e)) from None
+        # An error dict is WorldNewsAPI failing (429, 402, 5xx, connection), not the publisher.
+        if article.get("status") != "error":
+            healthy = is_cacheable_article(article)
+    finally:
+        if healthy is True:
+            extract_breaker.record_success(host)
+        elif healthy is False:
+            extract_breaker.record_failure(host)
+        else:
+            # Local and API-side outcomes (rate limiter, API errors, cancellation) say nothing
+            # about the publisher, but must still end a trial call or the host stays blocked.
+            extract_breaker.release(host)
+
+    await extraction_cache.set_async(url, article)
+    if article_index is not None:
+        await asyncio.to_thread(article_index.add_articles, [article])
+    return article
+
+async def search_news(
+    text: Optional[str],
+    language: Optional[str],
+    news_sources: Optional[str],
+    earliest_publish_date: Optional[str],
+    latest_publish_date: Optional[str],
+    categories: Optional[str],
+    authors: Optional[str],
+    entities: Optional[str],
+    source_country: Optional[str],
+    min_sentiment: Optional[str],
+    max_sentiment: Optional[str],
+    location_filter: Optional[str],
+    sort: Optional[str],
+    sort_direction: Optional[str],
+    offset: Optional[int],
+    number: Optional[int],
+    text_match_indexes: Optional[str],
+    compact: bool = False
+) -> Dict[str, Any]:
+    """
+    Searches for news articles matching query text and various filters.
+    This is the main tool for finding news about specific topics,
+    sources, or date ranges.
+
+    Args:
+        text: The text to match (e.g., "tesla OR ford", "tesla -ford", "\"elon musk\"").
+        language: The ISO 6391 language code of the news (e.g., "es", "en").
+        news_sources: A comma-separated list of news source URLs (e.g., "https://www.bbc.co.uk").
+        earliest_publish_date: The news must be published *after* this date
+                              (format "YYYY-MM-DD HH:MM:SS").
+        latest_publish_date: The news must be published *before* this date
+                             (format "YYYY-MM-DD HH:MM:SS").
+        categories: A comma-separated list of categories (e.g., "politics,sports").
+        authors: A comma-separated list of author names (e.g., "John Doe").
+        entities: Filter by semantic entities (e.g., "ORG:Tesla,PER:Elon Musk").
+        source_country: The ISO 3166 country code (e.g., "mx", "us").
+        min_sentiment: The minimal sentiment in range [-1,1] (e.g., "-0.8").
+        max_sentiment: The maximal sentiment in range [-1,1] (e.g., "0.8").
+        location_filter: Filter by radius: "latitude,longitude,radius_km"
+                         (e.g., "51.05,13.73,20").
+        sort: The sorting criteria (default is 'publish-time').
+        sort_direction: Sort ascending or descending ("ASC" or "DESC").
+        offset: The number of news to skip (e.g., 0, 10).
+        number: The number of news to return, 1-100 (e.g., 10).
+        text_match_indexes: Where to search for text: "title", "content", or "title,content".
+                            Defaults to "title,content".
+        compact: If true, each article only keeps 'url', 'title', 'publish_date',
+                 'sentiment' and a trimmed 'text'. Defaults to false.
+
+    Returns:
+        A dictionary with the API response, which has three main structures:
+
+        1. On a successful search with results:
+           A dictionary where 'available' (int) > 0 and the 'news' (list)
+           contains the found article objects.
+           (e.g., {"available": 80, "news": [...]})
+
+        2. On a successful search with *no* results:
+           A dictionary where 'available' == 0 and the 'news' list is empty.
+           (e.g., {"available": 0, "news": []})
+
+        3. On an API exception or connection error:
+           A dictionary with a 'status' key indicating a system-level error.
+           (e.g., {"status": "error", "error_message": "Exception details..."})
+    """
+    kwargs = {
+        "text": text,
+        "language": language,
+        "news_sources": news_sources,
+        "earliest_publish_date": earliest_publish_date,
+        "latest_publish_date": latest_publish_date,
+        "categories": categories,
+        "authors": authors,
+        "entities": entities,
+        "source_country": source_country,
+        "min_sentiment": min_sentiment,
+        "max_sentiment": max_sentiment,
+        "location_filter": location_filter,
+        "sort": sort,
+        "sort_direction": sort_direction,
+        "offset": offset,
+        "number": number,
+        "text_match_indexes": text_match_indexes
+    }
+
+    final_kwargs = {k: v for k, v in kwargs.items() if v is not None}
+
+    # Only compact projections are cached, so full responses always come from the API.
+    if compact:
+        cached_response = search_cache.get(final_kwargs)
+        record_cache("search", cached_response is not None)
+        if cached_response is not None:
+            return cached_response
+
+        # The local index answers when it has enough recent matches; otherwise the API is asked.
+        if article_index is not None:
+            local_response = await asyncio.to_thread(article_index.search, final_kwargs)
+            record_cache("article_index", local_response is not None)
+            if local_response is not None:
+                compact_response = compact_search_response(local_response)
+                search_cache.set(final_kwargs, compact_response)
+                return compact_response
+
+        return await api_flight.do(f"search:{search_cache.key(final_kwargs)!r}", lambda: fetch_search(final_kwargs, compact))
+
+    return await fetch_search(final_kwargs, compact)
+
+async def fetch_search(final_kwargs: Dict[str, Any], compact: bool) -> Dict[str, Any]:
+    response = await async_api.get("/search-news", final_kwargs)
+    if article_index is not None:
+        await asyncio.to_thread(article_index.add_articles, response.get("news") or [])
+    if not compact:
+        return response
+
+    compact_response = compact_search_response(response)
+    search_cache.set(final_kwargs, compact_response)
+    return compact_response
+
+async def search_news_by_text(text: str, number: int, offset: Optional[int] = None, **filters: Any) -> Dict[str, Any]:
+    """
+    Compact search_news call for pipeline code, which only needs the text,
+    the page and a few filters (e.g. language=, entities=).
+    """
+    params = dict.fromkeys(SEARCH_NEWS_PARAMS)
+    params.update(filters)
+    params.update(text=text, number=number, offset=offset)
+    return await search_news(**params, compact=True)
+
+def compact_article(article: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Projects a single article onto the fields the verification pipeline uses,
+    trimming its text to COMPACT_TEXT_CHARS characters.
+    """
+    compact = {field: article.get(field) for field in COMPACT_FIELDS}
+    compact["text"] = (compact["text"] or "")[:COMPACT_TEXT_CHARS]
+    return compact
+
+def compact_search_response(response: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Returns a copy of a search_news response where every article has been
+    reduced with compact_article. Error responses are returned unchanged.
+    """
+    if "news" not in response:
+        return response
+
+    return {
+        "available": response.get("available", 0),
+        "offset": response.get("offset"),
+        "number": response.get("number"),
+        "news": [compact_article(article) for article in response.get("news") or []]
+    }
+
+search_news_sources_tool = FunctionTool(func=search_news_sources)
+extract_news_links_tool = FunctionTool(func=extract_news_links)
+extract_news_tool = FunctionTool(func=extract_news)
+search_news_tool = FunctionTool(func=search_news)
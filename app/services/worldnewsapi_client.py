@@ -1,20 +1,16 @@
-import worldnewsapi
-from worldnewsapi.rest import ApiException
-from worldnewsapi.models.search_news200_response import SearchNews200Response
-from pydantic import BaseModel
+import asyncio
+import functools
+import threading
 from google.adk.tools import FunctionTool
-from typing import Dict, Any, Optional
+from typing import Dict, Any
+from services import worldnewsapi_async
+from services.worldnewsapi_async import async_api
 
-import os
-# from pprint import pprint
+# Sync entry points to the WorldNewsAPI tools for code that does not run on
+# the event loop (scripts, threadpool workers). The implementation, caching
+# and rate limiting all live in services/worldnewsapi_async.py.
 
-configuration = worldnewsapi.Configuration(
-    host = "https://api.worldnewsapi.com"
-)
-
-configuration.api_key['apiKey'] = os.getenv("WORLDNEWSAPI_API_KEY")
-configuration.api_key['headerApiKey'] = os.getenv("WORLDNEWSAPI_API_KEY")
-print("WorldNewsAPI Client initialized.", configuration.api_key)
+_standalone_lock = threading.Lock()
 
 # class Search_News(BaseModel):
 #     text: str | None = None # str | The text to match in the news content (at least 3 characters, maximum 100 characters). By default all query terms are expected, you can use an uppercase OR to search for any terms, e.g. tesla OR ford. You can also exclude terms by putting a minus sign (-) in front of the term, e.g. tesla -ford. For exact matches just put your term in quotes, e.g. \"elon musk\". (optional)
@@ -37,217 +33,47 @@ print("WorldNewsAPI Client initialized.", configuration.api_key)
 #     class Config:
 #         arbitrary_types_allowed = True
 
-def search_news_sources(name: str) -> Dict[str, Any]:
-
-    """
-    Searches for news sources (media outlets) that match a given name.
-    Use this tool to find a source's ID before using it in another search.
-
-    Args:
-        name: The name of the news source to search for (e.g., "BBC", "CNN").
-
-    Returns:
-        A dictionary with the API response, which has two main structures:
-
-        1. On a successful API call (even if no results are found):
-           A dictionary containing an 'available' (int) key and a 'sources' (list) key.
-           The LLM *must* check the 'available' key.
-           - If 'available' is 0, it means no sources were found.
-             (e.g., {"available": 0, "sources": []})
-           - If 'available' > 0, the 'sources' list will contain the found outlets.
-             (e.g., {"available": 2, "sources": [...]})
-
-        2. On an API exception or connection error:
-           A dictionary with an error status.
-           (e.g., {"status": "error", "error_message": "Exception details..."})
-    """
-
-    with worldnewsapi.ApiClient(configuration) as api_client:
-
-        api_instance = worldnewsapi.NewsApi(api_client)
-
-        try:
-            api_response = api_instance.search_news_sources(name)
-
-            return api_response.to_dict()
-        except ApiException as e:
-            print(f"Exception in search_news_sources: {e}\n")
-            return {"status": "error", "error_message": str(e)}
-
-def extract_news_links(url: str) -> Dict[str, Any]:
+def run_sync(coroutine) -> Dict[str, Any]:
     """
-    Extracts all news article links found *on* a single given URL.
-    
-    Use this if the user provides *any* URL (it could be a homepage like "cnn.com"
-    or a specific article URL like "cnn.com/article/123") and wants to see 
-    all the other links present on that page.
-
-    Args:
-        url: The URL of the page to extract links from.
-
-    Returns:
-        A dictionary with the API response, which has two main structures:
-
-        1. On a successful API call:
-           A dictionary containing a 'news_links' (list) key.
-           The LLM *must* check if this list is empty.
-           - If 'news_links' is an empty list, it means no links were found.
-             (e.g., {"news_links": []})
-           - If 'news_links' is not empty, it contains the list of found URLs.
-             (e.g., {"news_links": ["https://...", "https://...", ...]})
-
-        2. On an API exception or connection error:
-           A dictionary with an error status.
-           (e.g., {"status": "error", "error_message": "Exception details..."})
+    Runs a worldnewsapi_async coroutine from sync code. While the app is up
+    it runs on the app's event loop, so the shared connection pool, caches
+    and single-flight keep working; without a running app a private loop
+    is used and the client is closed again afterwards. Calling this from
+    the event loop itself would deadlock and raises RuntimeError instead.
     """
-    with worldnewsapi.ApiClient(configuration) as api_client:
-        api_instance = worldnewsapi.NewsApi(api_client)
-        analyze = True
-
-        try:
-            api_response = api_instance.extract_news_links(url, analyze=analyze)
-            
-            return api_response.to_dict()
-        
-        except ApiException as e:
-            print(f"Exception in extract_news_links: {e}\n")
-            return {"status": "error", "error_message": str(e)}
-
-def extract_news(url: str) -> Dict[str, Any]:
-    """
-    Extracts the full content (text, title, author) of a *single* news article
-    from its specific URL. Use this when the user provides a direct link
-    to an article and wants a summary, author, or the full text.
-
-    Args:
-        url: The exact URL of the article to analyze.
-
-    Returns:
-        A dictionary with the API response, which has three main structures:
-
-        1. On a successful extraction:
-           A dictionary containing the article's content, with populated 'title',
-           'text', 'url', and other fields.
-           (e.g., {"title": "What happens if Roe v Wade...", "text": "...", ...})
-
-        2. On a successful API call BUT an API-level error (e.g., malformed URL):
-           A dictionary where the 'title' and 'text' fields contain an error message.
-           The LLM *must* check if the 'title' or 'text' contains "Error," or
-           "malformed request".
-           (e.g., {"title": "Error, malformed request...", "text": "...", "url": ""})
-
-        3. On an API exception or connection error:
-           A dictionary with a 'status' key indicating a system-level error.
-           (e.g., {"status": "error", "error_message": "Exception details..."})
-    """
-    with worldnewsapi.ApiClient(configuration) as api_client:
-        api_instance = worldnewsapi.NewsApi(api_client)
-        analyze = True
-
-        try:
-            api_response = api_instance.extract_news(url, analyze=analyze)
-            
-            return api_response.to_dict()
-        
-        except ApiException as e:
-            print(f"Exception in extract_news: {e}\n")
-            return {"status": "error", "error_message": str(e)}
-
-def search_news(
-    text: Optional[str],
-    language: Optional[str],
-    news_sources: Optional[str],
-    earliest_publish_date: Optional[str],
-    latest_publish_date: Optional[str],
-    categories: Optional[str],
-    authors: Optional[str],
-    entities: Optional[str],
-    source_country: Optional[str],
-    min_sentiment: Optional[str],
-    max_sentiment: Optional[str],
-    location_filter: Optional[str],
-    sort: Optional[str],
-    sort_direction: Optional[str],
-    offset: Optional[int],
-    number: Optional[int],
-    text_match_indexes: Optional[str]
-) -> Dict[str, Any]:
-    """
-    Searches for news articles matching query text and various filters.
-    This is the main tool for finding news about specific topics,
-    sources, or date ranges.
-
-    Args:
-        text: The text to match (e.g., "tesla OR ford", "tesla -ford", "\"elon musk\"").
-        language: The ISO 6391 language code of the news (e.g., "es", "en").
-        news_sources: A comma-separated list of news source URLs (e.g., "https://www.bbc.co.uk").
-        earliest_publish_date: The news must be published *after* this date
-                              (format "YYYY-MM-DD HH:MM:SS").
-        latest_publish_date: The news must be published *before* this date
-                             (format "YYYY-MM-DD HH:MM:SS").
-        categories: A comma-separated list of categories (e.g., "politics,sports").
-        authors: A comma-separated list of author names (e.g., "John Doe").
-        entities: Filter by semantic entities (e.g., "ORG:Tesla,PER:Elon Musk").
-        source_country: The ISO 3166 country code (e.g., "mx", "us").
-        min_sentiment: The minimal sentiment in range [-1,1] (e.g., "-0.8").
-        max_sentiment: The maximal sentiment in range [-1,1] (e.g., "0.8").
-        location_filter: Filter by radius: "latitude,longitude,radius_km"
-                         (e.g., "51.05,13.73,20").
-        sort: The sorting criteria (default is 'publish-time').
-        sort_direction: Sort ascending or descending ("ASC" or "DESC").
-        offset: The number of news to skip (e.g., 0, 10).
-        number: The number of news to return, 1-100 (e.g., 10).
-        text_match_indexes: Where to search for text: "title", "content", or "title,content".
-                            Defaults to "title,content".
-
-    Returns:
-        A dictionary with the API response, which has three main structures:
-
-        1. On a successful search with results:
-           A dictionary where 'available' (int) > 0 and the 'news' (list)
-           contains the found article objects.
-           (e.g., {"available": 80, "news": [...]})
-
-        2. On a successful search with *no* results:
-           A dictionary where 'available' == 0 and the 'news' list is empty.
-           (e.g., {"available": 0, "news": []})
-
-        3. On an API exception or connection error:
-           A dictionary with a 'status' key indicating a system-level error.
-           (e.g., {"status": "error", "error_message": "Exception details..."})
-    """
-    kwargs = {
-        "text": text,
-        "language": language,
-        "news_sources": news_sources,
-        "earliest_publish_date": earliest_publish_date,
-        "latest_publish_date": latest_publish_date,
-        "categories": categories,
-        "authors": authors,
-        "entities": entities,
-        "source_country": source_country,
-        "min_sentiment": min_sentiment,
-        "max_sentiment": max_sentiment,
-        "location_filter": location_filter,
-        "sort": sort,
-        "sort_direction": sort_direction,
-        "offset": offset,
-        "number": number,
-        "text_match_indexes": text_match_indexes
-    }
-    
-    final_kwargs = {k: v for k, v in kwargs.items() if v is not None}
-
-    with worldnewsapi.ApiClient(configuration) as api_client:
-        api_instance = worldnewsapi.NewsApi(api_client)
+    loop = async_api.loop
+    if loop is not None and loop.is_running():
         try:
-            api_response = api_instance.search_news(**final_kwargs)
-            return api_response.to_dict()
-        except ApiException as e:
-            print(f"Exception in search_news: {e}\n")
-            return {"status": "error", "error_message": str(e)}
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            coroutine.close()
+            raise RuntimeError("Sync WorldNewsAPI call on the event loop; await services.worldnewsapi_async instead.")
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+    with _standalone_lock:
+        return asyncio.run(_run_standalone(coroutine))
+
+async def _run_standalone(coroutine) -> Dict[str, Any]:
+    try:
+        return await coroutine
+    finally:
+        await async_api.close()
+
+def sync_tool(coroutine_function):
+    """Wraps a worldnewsapi_async tool as a blocking function with the same signature and docs."""
+    @functools.wraps(coroutine_function)
+    def call(*args, **kwargs):
+        return run_sync(coroutine_function(*args, **kwargs))
+    return call
+
+search_news_sources = sync_tool(worldnewsapi_async.search_news_sources)
+extract_news_links = sync_tool(worldnewsapi_async.extract_news_links)
+extract_news = sync_tool(worldnewsapi_async.extract_news)
+search_news = sync_tool(worldnewsapi_async.search_news)
 
 search_news_sources_tool = FunctionTool(func=search_news_sources)
 extract_news_links_tool = FunctionTool(func=extract_news_links)
 extract_news_tool = FunctionTool(func=extract_news)
-search_news_tool = FunctionTool(func=search_news)
\ No newline at end of file
+search_news_tool = FunctionTool(func=search_news)
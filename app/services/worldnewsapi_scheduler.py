@@ -0,0 +1,329 @@
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional
+
+from utils.metrics import API_QUEUE_DEPTH, API_QUOTA_LEFT
+
+# Lower values are served first.
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+# Statuses worth retrying: throttling and transient server errors.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_priority: ContextVar[int] = ContextVar("worldnewsapi_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def api_priority(priority: int) -> Iterator[None]:
+    """WorldNewsAPI calls made inside the block (and in tasks started from it) queue with this priority."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class RateLimitError(Exception):
+    """Raised when a call cannot get a request slot: the queue is full, the wait timed out or the quota is spent."""
+
+
+class _Waiter:
+    __slots__ = ("priority", "grant", "granted", "cancelled")
+
+    def __init__(self, priority: int, grant: Callable[[], None]):
+        self.priority = priority
+        self.grant = grant
+        self.granted = False
+        self.cancelled = False
+
+
+class WorldNewsApiScheduler:
+    """
+    Token-bucket scheduler shared by every WorldNewsAPI call, whether it
+    comes from the event loop or a sync caller's thread.
+
+    The bucket refills at 'rate' requests per second up to 'burst'. Callers
+    that find it empty queue by priority (interactive before batch, FIFO
+    within one) and a dispatcher thread hands out tokens as they refill.
+    Waits are bounded: a full queue rejects at once and a caller
+    that waited queue_timeout seconds gives up with RateLimitError.
+
+    The quota headers of every response (X-API-Quota-Left etc.) are recorded;
+    once the points left fall to quota_reserve, only interactive calls are
+    let through. A 429 pauses the whole bucket for its Retry-After.
+
+    Args:
+        rate: Requests per second.
+        burst: Maximum number of tokens saved up while idle.
+        max_queue: Maximum number of waiting calls.
+        queue_timeout: Seconds a call may wait for a token.
+        quota_reserve: Quota points kept for interactive calls.
+        max_retries: Retries of a 429/5xx answer.
+        retry_deadline: Seconds after the first attempt in which retries may still start.
+        backoff: Initial retry delay in seconds, doubled on each attempt and jittered.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        max_queue: int,
+        queue_timeout: float,
+        quota_reserve: float,
+        max_retries: int,
+        retry_deadline: float,
+        backoff: float
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.quota_reserve = quota_reserve
+        self.max_retries = max_retries
+        self.retry_deadline = retry_deadline
+        self.backoff = backoff
+
+        self._cond = threading.Condition()
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._queue: List[tuple] = []
+        # Waiters in the heap that are neither granted nor given up; cancelled ones stay in the heap until purged.
+        self._waiting = 0
+        self._sequence = itertools.count()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._closing = False
+
+        self.quota_left: Optional[float] = None
+        self.quota_used: Optional[float] = None
+        self.last_request_points: Optional[float] = None
+
+        self._queued = {name: 0 for name in PRIORITY_NAMES.values()}
+        self._granted = 0
+        self._rejected = 0
+        self._timeouts = 0
+        self._throttled = 0
+        self._retries = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    # --- acquiring ---
+
+    def acquire(self, priority: Optional[int] = None):
+        """Blocks until the call may be sent; raises RateLimitError when it may not."""
+        event = threading.Event()
+        waiter = self._enqueue(priority, event.set)
+        if waiter is None:
+            return
+        started = time.monotonic()
+        event.wait(self.queue_timeout)
+        self._finish_wait(waiter, started)
+
+    async def acquire_async(self, priority: Optional[int] = None):
+        """Awaitable acquire for the event loop; the dispatcher thread resolves the future."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def grant():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        waiter = self._enqueue(priority, grant)
+        if waiter is None:
+            return
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            self._finish_wait(waiter, started, cancelled=True)
+            raise
+        self._finish_wait(waiter, started)
+
+    def _enqueue(self, priority: Optional[int], grant: Callable[[], None]) -> Optional[_Waiter]:
+        """Takes a token right away when nobody is queued (returns None), otherwise queues a waiter."""
+        priority = _priority.get() if priority is None else priority
+        with self._cond:
+            if priority > INTERACTIVE and self.quota_left is not None and self.quota_left <= self.quota_reserve:
+                self._rejected += 1
+                raise RateLimitError(f"WorldNewsAPI quota nearly spent ({self.quota_left:g} points left); only interactive calls are sent.")
+
+            self._refill()
+            if not self._waiting and self._tokens >= 1 and time.monotonic() >= self._paused_until:
+                self._tokens -= 1
+                self._granted += 1
+                return None
+
+            if self._waiting >= self.max_queue:
+                self._rejected += 1
+                raise RateLimitError(f"WorldNewsAPI request queue is full ({self.max_queue} waiting).")
+
+            waiter = _Waiter(priority, grant)
+            heapq.heappush(self._queue, (priority, next(self._sequence), waiter))
+            self._waiting += 1
+            self._set_depth(priority, 1)
+            self._start_dispatcher()
+            self._cond.notify()
+            return waiter
+
+    def _finish_wait(self, waiter: _Waiter, started: float, cancelled: bool = False):
+        waited = time.monotonic() - started
+        with self._cond:
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            if waiter.granted:
+                # Granted just as the wait ended: the caller keeps the token (a cancelled one wastes it).
+                return
+            # Skipped by the dispatcher; purged once they make up most of the heap.
+            waiter.cancelled = True
+            self._waiting -= 1
+            self._set_depth(waiter.priority, -1)
+            if len(self._queue) > 2 * self._waiting:
+                self._queue = [entry for entry in self._queue if not entry[2].cancelled]
+                heapq.heapify(self._queue)
+            if cancelled:
+                return
+            self._timeouts += 1
+        raise RateLimitError(f"No WorldNewsAPI request slot within {self.queue_timeout}s.")
+
+    # --- dispatching ---
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _set_depth(self, priority: int, delta: int):
+        name = PRIORITY_NAMES.get(priority, str(priority))
+        self._queued[name] = self._queued.get(name, 0) + delta
+        API_QUEUE_DEPTH.labels(name).inc(delta)
+
+    def _start_dispatcher(self):
+        if self._dispatcher is None or not self._dispatcher.is_alive():
+            self._closing = False
+            self._dispatcher = threading.Thread(target=self._dispatch, name="worldnewsapi-scheduler", daemon=True)
+            self._dispatcher.start()
+
+    def _dispatch(self):
+        with self._cond:
+            while not self._closing:
+                while self._queue and self._queue[0][2].cancelled:
+                    heapq.heappop(self._queue)
+                if not self._queue:
+                    self._cond.wait()
+                    continue
+
+                now = time.monotonic()
+                if now < self._paused_until:
+                    self._cond.wait(self._paused_until - now)
+                    continue
+
+                self._refill()
+                if self._tokens < 1:
+                    self._cond.wait((1 - self._tokens) / self.rate)
+                    continue
+
+                _, _, waiter = heapq.heappop(self._queue)
+                self._tokens -= 1
+                self._granted += 1
+                waiter.granted = True
+                self._waiting -= 1
+                self._set_depth(waiter.priority, -1)
+                try:
+                    waiter.grant()
+                except RuntimeError:
+                    # The caller's event loop is already closed.
+                    pass
+
+    def close(self):
+        """Stops the dispatcher thread; it starts again on the next queued call."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        if self._dispatcher is not None:
+            self._dispatcher.join(timeout=5)
+            self._dispatcher = None
+
+    # --- responses ---
+
+    def observe_response(self, status: Optional[int], headers: Optional[Mapping[str, str]]):
+        """Records the quota headers of a response and pauses the bucket on 429."""
+        headers = headers or {}
+        left = parse_number(headers.get("X-API-Quota-Left"))
+        used = parse_number(headers.get("X-API-Quota-Used"))
+        points = parse_number(headers.get("X-API-Quota-Request"))
+
+        with self._cond:
+            if left is not None:
+                self.quota_left = left
+                API_QUOTA_LEFT.set(left)
+            if used is not None:
+                self.quota_used = used
+            if points is not None:
+                self.last_request_points = points
+
+            if status == 429:
+                self._throttled += 1
+                pause = parse_number(headers.get("Retry-After"))
+                if pause is None:
+                    pause = self.backoff
+                self._paused_until = max(self._paused_until, time.monotonic() + pause)
+                self._cond.notify()
+
+    def retry_delay(self, status: Optional[int], headers: Optional[Mapping[str, str]], attempt: int, deadline: float) -> Optional[float]:
+        """
+        Seconds to wait before retrying a response with this status, or None
+        when it should not be retried (not a 429/5xx, out of retries, or the
+        retry would start after the deadline, a time.monotonic() value).
+        """
+        if status not in RETRY_STATUSES or attempt >= self.max_retries:
+            return None
+
+        retry_after = parse_number((headers or {}).get("Retry-After"))
+        delay = self.backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if time.monotonic() + delay > deadline:
+            return None
+
+        with self._cond:
+            self._retries += 1
+        return delay
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            self._refill()
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "tokens": round(self._tokens, 3),
+                "paused_seconds": round(max(0.0, self._paused_until - time.monotonic()), 3),
+                "queue_depth": dict(self._queued),
+                "waiting": self._waiting,
+                "max_queue": self.max_queue,
+                "granted": self._granted,
+                "rejected": self._rejected,
+                "queue_timeouts": self._timeouts,
+                "throttled": self._throttled,
+                "retries": self._retries,
+                "wait_seconds_total": round(self._wait_total, 6),
+                "wait_seconds_max": round(self._wait_max, 6),
+                "quota_left": self.quota_left,
+                "quota_used": self.quota_used,
+                "last_request_points": self.last_request_points,
+            }
+
+
+def parse_number(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,43 @@
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+TRACKING_PARAMS = {
+  "fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid", "_ga", "_gl",
+  "ref", "ref_src", "ref_url", "referrer", "cmpid", "ocid", "spm", "smid", "utm", "si",
+}
+TRACKING_PREFIXES = ("utm_", "at_", "pk_", "mtm_", "hsa_")
+
+def is_tracking_param(name: str) -> bool:
+  name = name.lower()
+  return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+def canonicalize_url(url: str) -> str:
+  """
+  Normalizes a URL so the same article pasted from different places maps to
+  one key: http/https are unified, the host is lowercased without 'www.'
+  and default ports, tracking params and fragments are dropped, the
+  remaining params are sorted and trailing slashes are removed.
+  """
+  url = (url or "").strip()
+  if "://" not in url:
+    url = "https://" + url
+
+  parts = urlsplit(url)
+  host = (parts.hostname or "").lower()
+  if host.startswith("www."):
+    host = host[4:]
+
+  port = parts.port
+  if port and port not in (80, 443):
+    host = f"{host}:{port}"
+
+  query = sorted(
+    (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+    if not is_tracking_param(name)
+  )
+  path = parts.path.rstrip("/")
+
+  return urlunsplit(("https", host, path, urlencode(query), ""))
+
+def url_host(url: str) -> str:
+  """Returns the canonical host of a URL (lowercase, without 'www.')."""
+  return urlsplit(canonicalize_url(url)).netloc
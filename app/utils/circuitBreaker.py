@@ -0,0 +1,70 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict
+
+class CircuitBreaker:
+  """
+  Circuit breaker per key (e.g. publisher host). After failure_threshold
+  consecutive failures the key's circuit opens and allow() refuses calls
+  for reset_timeout seconds. Then a single trial call is let through: a
+  success closes the circuit, a failure opens it again. Only the max_keys
+  most recently used keys are tracked.
+  """
+
+  def __init__(self, failure_threshold: int, reset_timeout: float, max_keys: int):
+    self.failure_threshold = failure_threshold
+    self.reset_timeout = reset_timeout
+    self.max_keys = max_keys
+    # key -> {"failures": consecutive failures, "opened_at": monotonic time or None, "trial": trial call in flight}
+    self._circuits: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    self.opened = 0
+    self.rejected = 0
+
+  def _circuit(self, key: str) -> Dict[str, Any]:
+    circuit = self._circuits.get(key)
+    if circuit is None:
+      circuit = {"failures": 0, "opened_at": None, "trial": False}
+      self._circuits[key] = circuit
+      while len(self._circuits) > self.max_keys:
+        self._circuits.popitem(last=False)
+    self._circuits.move_to_end(key)
+    return circuit
+
+  def allow(self, key: str) -> bool:
+    circuit = self._circuit(key)
+    if circuit["opened_at"] is None:
+      return True
+    if not circuit["trial"] and time.monotonic() - circuit["opened_at"] >= self.reset_timeout:
+      circuit["trial"] = True
+      return True
+    self.rejected += 1
+    return False
+
+  def record_success(self, key: str):
+    circuit = self._circuit(key)
+    circuit.update(failures=0, opened_at=None, trial=False)
+
+  def record_failure(self, key: str):
+    circuit = self._circuit(key)
+    circuit["failures"] += 1
+    if circuit["trial"] or (circuit["opened_at"] is None and circuit["failures"] >= self.failure_threshold):
+      self.opened += 1
+      circuit.update(opened_at=time.monotonic(), trial=False)
+
+  def release(self, key: str):
+    """Ends a call that says nothing about the key's health; an open circuit may send a new trial."""
+    circuit = self._circuits.get(key)
+    if circuit is not None:
+      circuit["trial"] = False
+
+  def is_open(self, key: str) -> bool:
+    circuit = self._circuits.get(key)
+    return circuit is not None and circuit["opened_at"] is not None
+
+  def stats(self) -> Dict[str, Any]:
+    return {
+      "tracked": len(self._circuits),
+      "open": sum(1 for circuit in self._circuits.values() if circuit["opened_at"] is not None),
+      "opened": self.opened,
+      "rejected": self.rejected,
+    }
@@ -1,8 +1,8 @@
 from typing import Optional
 from fastapi import HTTPException, HTTPException, Header, status
-from firebase_admin import auth
+from services.id_token_cache import id_token_cache
 
-def get_current_user_uid(authorization: Optional[str] = Header(None)) -> str:
+async def get_current_user_uid(authorization: Optional[str] = Header(None)) -> str:
 
   if not authorization:
     raise HTTPException(
@@ -16,8 +16,7 @@ def get_current_user_uid(authorization: Optional[str] = Header(None)) -> str:
     if scheme.lower() != 'bearer':
       raise ValueError("Invalid token format.")
         
-    decoded_token = auth.verify_id_token(token)
-    uid = decoded_token['uid']
+    uid = await id_token_cache.verify(token)
     return uid
       
   except Exception as e:
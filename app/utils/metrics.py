@@ -0,0 +1,88 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import GaugeMetricFamily, REGISTRY
+from utils.stats import collect_stats
+
+# Pipeline stages: url_extraction, agent1, search_news_http, agent2, firestore_write...
+STAGE_SECONDS = Histogram(
+  "news_agent_stage_seconds",
+  "Duration of each pipeline stage.",
+  ["stage"],
+  buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 80)
+)
+STAGE_ERRORS = Counter("news_agent_stage_errors_total", "Pipeline stages that failed.", ["stage"])
+STAGE_IN_FLIGHT = Gauge("news_agent_stage_in_flight", "Pipeline stages currently running.", ["stage"])
+CACHE_LOOKUPS = Counter("news_agent_cache_lookups_total", "Cache lookups on the request path.", ["cache", "result"])
+REQUESTS_IN_FLIGHT = Gauge("news_agent_requests_in_flight", "HTTP requests currently being served.")
+API_QUEUE_DEPTH = Gauge("news_agent_worldnewsapi_queue_depth", "WorldNewsAPI calls waiting for a rate-limit token.", ["priority"])
+API_QUOTA_LEFT = Gauge("news_agent_worldnewsapi_quota_left", "WorldNewsAPI quota points left, from the last response headers.")
+
+# Stage durations of the current request, read back into its Server-Timing header.
+_request_timings: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar("request_timings", default=None)
+
+def start_request_timing() -> Dict[str, List[float]]:
+  timings: Dict[str, List[float]] = {}
+  _request_timings.set(timings)
+  return timings
+
+def observe_stage(name: str, seconds: float):
+  STAGE_SECONDS.labels(name).observe(seconds)
+  timings = _request_timings.get()
+  if timings is not None:
+    timings.setdefault(name, []).append(seconds)
+
+def record_error(name: str):
+  STAGE_ERRORS.labels(name).inc()
+
+def record_cache(cache: str, hit: bool):
+  CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+  """Times a block as a pipeline stage; exceptions count as errors of that stage."""
+  STAGE_IN_FLIGHT.labels(name).inc()
+  started = time.perf_counter()
+  try:
+    yield
+  except BaseException:
+    record_error(name)
+    raise
+  finally:
+    observe_stage(name, time.perf_counter() - started)
+    STAGE_IN_FLIGHT.labels(name).dec()
+
+def format_server_timing(timings: Dict[str, List[float]], total: float) -> str:
+  """Server-Timing header value; repeated stages (e.g. backfill searches) are summed."""
+  entries = []
+  for name, durations in timings.items():
+    entry = f"{name};dur={sum(durations) * 1000:.1f}"
+    if len(durations) > 1:
+      entry += f';desc="{len(durations)} calls"'
+    entries.append(entry)
+  entries.append(f"total;dur={total * 1000:.1f}")
+  return ", ".join(entries)
+
+
+def flatten_stats(value, prefix: Tuple[str, ...] = ()) -> Iterator[Tuple[str, float]]:
+  # bool is an int, so flags such as 'enabled' are exported as 0/1.
+  if isinstance(value, (int, float)):
+    yield ".".join(prefix), float(value)
+  elif isinstance(value, dict):
+    for key, item in value.items():
+      yield from flatten_stats(item, prefix + (str(key),))
+
+class StatsCollector:
+  """Exposes every numeric value of /stats as news_agent_stats{provider, key}."""
+
+  def collect(self):
+    family = GaugeMetricFamily("news_agent_stats", "Numeric values reported by /stats.", labels=["provider", "key"])
+    for provider, stats in collect_stats().items():
+      for key, value in flatten_stats(stats):
+        family.add_metric([provider, key], value)
+    yield family
+
+REGISTRY.register(StatsCollector())
@@ -0,0 +1,24 @@
+import hmac
+import os
+from typing import Optional
+from fastapi import HTTPException, Header, status
+
+# Bearer token for /metrics and /stats, kept apart from user auth so a Prometheus scraper can use it.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+async def require_metrics_token(authorization: Optional[str] = Header(None)):
+  """
+  Guards the operational endpoints with 'Authorization: Bearer <METRICS_TOKEN>'.
+  Without METRICS_TOKEN set they are turned off, since the service may be
+  deployed with unauthenticated access.
+  """
+  if not METRICS_TOKEN:
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+  scheme, _, token = (authorization or "").partition(" ")
+  if scheme.lower() != "bearer" or not hmac.compare_digest(token.strip().encode(), METRICS_TOKEN.encode()):
+    raise HTTPException(
+      status_code=status.HTTP_401_UNAUTHORIZED,
+      detail="A valid metrics token (Bearer) is required.",
+      headers={"WWW-Authenticate": "Bearer"},
+    )
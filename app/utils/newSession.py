@@ -1,11 +1,22 @@
+from datetime import datetime, timezone
 from config.db import db
-from google.cloud import firestore
+from services.history_writer import history_writer
+from services.session_list_cache import session_list_cache
 
-def create_new_session_in_firestore(user_id: str, session_id: str, initial_prompt: str):
+def new_session_writes(user_id: str, session_id: str, initial_prompt: str):
   
   title = initial_prompt[:50] + ("..." if len(initial_prompt) > 50 else "")
-  db.collection(u'chats').document(user_id).collection(u'sessions').document(session_id).set({
-    u'title': title,
-    u'created_at': firestore.SERVER_TIMESTAMP,
-    u'user_id': user_id
-  })
\ No newline at end of file
+  return [
+    (db.collection(u'chats').document(user_id).collection(u'sessions').document(session_id), {
+      u'title': title,
+      u'created_at': datetime.now(timezone.utc),
+      u'user_id': user_id
+    })
+  ]
+
+async def create_new_session_in_firestore(user_id: str, session_id: str, initial_prompt: str):
+  """Queues the session document for the write-behind writer and returns its future."""
+  writes = new_session_writes(user_id, session_id, initial_prompt)
+  _, data = writes[0]
+  session_list_cache.add_session(user_id, {"session_id": session_id, "title": data[u'title'], "created_at": data[u'created_at']})
+  return await history_writer.submit(writes)
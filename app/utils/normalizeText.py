@@ -0,0 +1,11 @@
+import re
+import unicodedata
+
+def normalize_query(text: str) -> str:
+  """
+  Folds a user query for comparison: Unicode-normalized, lowercased,
+  punctuation removed and whitespace collapsed.
+  """
+  text = unicodedata.normalize("NFKC", text or "").lower()
+  text = re.sub(r"[^\w\s]", " ", text)
+  return " ".join(text.split())
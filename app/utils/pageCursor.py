@@ -0,0 +1,18 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict
+
+def encode_cursor(doc_id: str, position: datetime) -> str:
+  """Opaque page token pointing after the document with this id and ordering timestamp."""
+  payload = json.dumps({"id": doc_id, "at": position.isoformat()}, separators=(",", ":"))
+  return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(token: str) -> Dict[str, Any]:
+  """Inverse of encode_cursor. Raises ValueError when the token was not produced by it."""
+  try:
+    padded = token + "=" * (-len(token) % 4)
+    payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    return {"id": str(payload["id"]), "at": datetime.fromisoformat(payload["at"])}
+  except (KeyError, TypeError, ValueError, UnicodeError) as e:
+    raise ValueError(f"Invalid page token: {e}")
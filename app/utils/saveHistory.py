@@ -1,21 +1,53 @@
+from datetime import datetime, timedelta, timezone
 from config.db import db
-from google.cloud import firestore
+from services.history_writer import history_writer
+from services.session_list_cache import session_list_cache
+from utils.newSession import new_session_writes
+from utils.structuredLog import get_logger
 
-def save_chat_history_to_firestore(user_id, session_id, user_message, agent_response):
-  doc_ref = db.collection(u'chats').document(user_id).collection(u'sessions').document(session_id)
+log = get_logger("history")
+
+def chat_history_writes(user_id, session_id, user_message, agent_response):
+  messages_ref = db.collection(u'chats').document(user_id).collection(u'sessions').document(session_id).collection(u'messages')
+  
+  # Both messages are committed in one batch, so a server timestamp would be identical for the two;
+  # client timestamps keep the user message first and record when the turn happened, not when it was flushed.
+  now = datetime.now(timezone.utc)
   
-  doc_ref.collection(u'messages').add({
-    u'author': u'user',
-    u'text': user_message,
-    u'timestamp': firestore.SERVER_TIMESTAMP,
-  })
+  return [
+    (messages_ref.document(), {
+      u'author': u'user',
+      u'text': user_message,
+      u'timestamp': now,
+    }),
+    (messages_ref.document(), {
+      u'author': u'agent',
+      u'text': agent_response,
+      u'timestamp': now + timedelta(milliseconds=1),
+    }),
+  ]
+
+async def save_chat_history_to_firestore(user_id, session_id, user_message, agent_response):
+  """Queues the turn for the write-behind writer; await the returned future to know it was saved."""
+  saved = await history_writer.submit(chat_history_writes(user_id, session_id, user_message, agent_response))
   
-  doc_ref.collection(u'messages').add({
-    u'author': u'agent',
-    u'text': agent_response,
-    u'timestamp': firestore.SERVER_TIMESTAMP,
-  })
+  log.debug("history_queued", session_id=session_id)
+  return saved
+
+async def save_batch_history_to_firestore(user_id, turns):
+  """
+  Queues new sessions, each with its first turn, as a single write so a
+  whole batch is committed together. turns are (session_id, user_message,
+  agent_response); await the returned future to know they were saved.
+  """
+  writes = []
+  for session_id, user_message, agent_response in turns:
+    session_writes = new_session_writes(user_id, session_id, user_message)
+    _, data = session_writes[0]
+    session_list_cache.add_session(user_id, {"session_id": session_id, "title": data[u'title'], "created_at": data[u'created_at']})
+    writes += session_writes + chat_history_writes(user_id, session_id, user_message, agent_response)
   
-  print(len(session_id), "Saving chat history to Firestore...")
+  saved = await history_writer.submit(writes)
   
-  print(f"History saved: {user_id}, Session: {session_id}")
+  log.debug("batch_history_queued", sessions=len(turns))
+  return saved
@@ -0,0 +1,42 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+class SingleFlight:
+  """
+  Coalesces concurrent calls that share a key: the first caller starts the
+  work and every caller that arrives while it is in flight awaits the same
+  result (or exception) instead of starting its own run.
+  """
+
+  def __init__(self):
+    self._calls: Dict[str, asyncio.Future] = {}
+    self.leaders = 0
+    self.coalesced = 0
+
+  async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+    future = self._calls.get(key)
+    if future is not None:
+      self.coalesced += 1
+      return await asyncio.shield(future)
+
+    self.leaders += 1
+    task = asyncio.ensure_future(fn())
+    self._calls[key] = task
+    task.add_done_callback(lambda _: self._forget(key, task))
+
+    # Shielded so a disconnecting leader does not cancel the run for its followers.
+    return await asyncio.shield(task)
+
+  def is_in_flight(self, key: str) -> bool:
+    return key in self._calls
+
+  def _forget(self, key: str, task: asyncio.Future):
+    if self._calls.get(key) is task:
+      del self._calls[key]
+
+  def stats(self) -> Dict[str, Any]:
+    return {
+      "in_flight": len(self._calls),
+      "leaders": self.leaders,
+      "coalesced": self.coalesced,
+    }
@@ -0,0 +1,6 @@
+import json
+from typing import Any, Dict
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+  """Serializes one server-sent event."""
+  return f"event: {event}\ndata: {json.dumps(data, default=str, ensure_ascii=False)}\n\n"
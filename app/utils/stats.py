@@ -0,0 +1,65 @@
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+def register_stats(name: str, provider: Callable[[], Dict[str, Any]]):
+  _providers[name] = provider
+
+def collect_stats() -> Dict[str, Dict[str, Any]]:
+  stats = {}
+  for name, provider in _providers.items():
+    try:
+      stats[name] = provider()
+    except Exception as e:
+      stats[name] = {"error": str(e)}
+  return stats
+
+
+class LatencyStats:
+  """Call count and latency totals per named path (e.g. 'local' vs 'agent')."""
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self._paths: Dict[str, Dict[str, float]] = {}
+
+  def record(self, path: str, seconds: float):
+    with self._lock:
+      entry = self._paths.setdefault(path, {"count": 0, "seconds_total": 0.0, "seconds_max": 0.0})
+      entry["count"] += 1
+      entry["seconds_total"] += seconds
+      entry["seconds_max"] = max(entry["seconds_max"], seconds)
+
+  def stats(self) -> Dict[str, Any]:
+    with self._lock:
+      return {
+        path: {
+          "count": int(entry["count"]),
+          "seconds_avg": round(entry["seconds_total"] / entry["count"], 6),
+          "seconds_max": round(entry["seconds_max"], 6),
+        }
+        for path, entry in self._paths.items()
+      }
+
+
+class LatencyWindow:
+  """The last 'size' latencies of one call, for percentiles over recent traffic."""
+
+  def __init__(self, size: int):
+    self._lock = threading.Lock()
+    self._samples = deque(maxlen=size)
+
+  def __len__(self) -> int:
+    return len(self._samples)
+
+  def record(self, seconds: float):
+    with self._lock:
+      self._samples.append(seconds)
+
+  def percentile(self, q: float) -> Optional[float]:
+    with self._lock:
+      samples = sorted(self._samples)
+    if not samples:
+      return None
+    return samples[min(len(samples) - 1, int(q / 100 * len(samples)))]
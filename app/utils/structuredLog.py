@@ -0,0 +1,73 @@
+import json
+import logging
+import os
+import random
+import sys
+from typing import Any
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Fraction of DEBUG/INFO records that are written; warnings and errors are always kept.
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+
+class JsonFormatter(logging.Formatter):
+  def format(self, record: logging.LogRecord) -> str:
+    entry = {
+      "ts": round(record.created, 3),
+      "level": record.levelname.lower(),
+      "logger": record.name,
+      "event": record.getMessage(),
+      **getattr(record, "fields", {}),
+    }
+    if record.exc_info:
+      entry["exception"] = self.formatException(record.exc_info)
+    return json.dumps(entry, default=str, ensure_ascii=False)
+
+class SamplingFilter(logging.Filter):
+  def __init__(self, rate: float):
+    super().__init__()
+    self.rate = rate
+
+  def filter(self, record: logging.LogRecord) -> bool:
+    return record.levelno >= logging.WARNING or self.rate >= 1 or random.random() < self.rate
+
+_root = logging.getLogger("news_agent")
+if not _root.handlers:
+  _handler = logging.StreamHandler(sys.stdout)
+  _handler.setFormatter(JsonFormatter())
+  _handler.addFilter(SamplingFilter(LOG_SAMPLE_RATE))
+  _root.addHandler(_handler)
+  _root.setLevel(LOG_LEVEL)
+  _root.propagate = False
+
+class StructuredLogger:
+  """
+  JSON-lines logger: log.info("agent_run_completed", agent="fact_checker", seconds=1.2).
+
+  Disabled levels return before any record or field dict is built, so
+  debug calls on the hot path cost one level check.
+  """
+
+  def __init__(self, name: str):
+    self._logger = _root.getChild(name)
+
+  def _log(self, level: int, event: str, fields: dict, exc_info: Any = None):
+    self._logger.log(level, event, extra={"fields": fields}, exc_info=exc_info)
+
+  def debug(self, event: str, **fields: Any):
+    if self._logger.isEnabledFor(logging.DEBUG):
+      self._log(logging.DEBUG, event, fields)
+
+  def info(self, event: str, **fields: Any):
+    if self._logger.isEnabledFor(logging.INFO):
+      self._log(logging.INFO, event, fields)
+
+  def warning(self, event: str, **fields: Any):
+    if self._logger.isEnabledFor(logging.WARNING):
+      self._log(logging.WARNING, event, fields)
+
+  def error(self, event: str, exc_info: Any = None, **fields: Any):
+    if self._logger.isEnabledFor(logging.ERROR):
+      self._log(logging.ERROR, event, fields, exc_info)
+
+def get_logger(name: str) -> StructuredLogger:
+  return StructuredLogger(name)
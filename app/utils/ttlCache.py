@@ -0,0 +1,122 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+def estimate_size(value: Any) -> int:
+  try:
+    return len(json.dumps(value, default=str))
+  except (TypeError, ValueError):
+    return len(repr(value))
+
+class TTLCache:
+  """
+  Thread-safe LRU cache whose entries expire after a TTL.
+
+  Memory is bounded both by entry count and by an approximate byte size
+  (the JSON length of each value). The least recently used entries are
+  evicted first when either bound is exceeded.
+
+  Args:
+    ttl: Default lifetime of an entry in seconds.
+    max_entries: Maximum number of entries kept.
+    max_bytes: Maximum approximate size of all values. 0 disables the bound.
+    sizeof: Function used to estimate the size of a value.
+  """
+
+  def __init__(self, ttl: float, max_entries: int, max_bytes: int = 0, sizeof: Callable[[Any], int] = estimate_size):
+    self.ttl = ttl
+    self.max_entries = max_entries
+    self.max_bytes = max_bytes
+    self.sizeof = sizeof
+
+    self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+    self._lock = threading.Lock()
+    self._bytes = 0
+
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.expirations = 0
+
+  def get(self, key: Hashable) -> Optional[Any]:
+    entry = self.get_entry(key)
+    return entry[0] if entry else None
+
+  def get_entry(self, key: Hashable) -> Optional[tuple]:
+    """Returns (value, stored_at) for a live entry, or None."""
+    now = time.time()
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is None:
+        self.misses += 1
+        return None
+
+      value, stored_at, expires_at, size = entry
+      if expires_at <= now:
+        self._remove(key)
+        self.expirations += 1
+        self.misses += 1
+        return None
+
+      self._entries.move_to_end(key)
+      self.hits += 1
+      return value, stored_at
+
+  def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+    ttl = self.ttl if ttl is None else ttl
+    if ttl <= 0 or self.max_entries <= 0:
+      return
+
+    size = self.sizeof(value)
+    if self.max_bytes and size > self.max_bytes:
+      return
+
+    now = time.time()
+    with self._lock:
+      if key in self._entries:
+        self._remove(key)
+
+      self._entries[key] = (value, now, now + ttl, size)
+      self._bytes += size
+
+      while self._entries and (
+        len(self._entries) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes)
+      ):
+        oldest = next(iter(self._entries))
+        self._remove(oldest)
+        self.evictions += 1
+
+  def delete(self, key: Hashable):
+    with self._lock:
+      if key in self._entries:
+        self._remove(key)
+
+  def clear(self):
+    with self._lock:
+      self._entries.clear()
+      self._bytes = 0
+
+  def _remove(self, key: Hashable):
+    _, _, _, size = self._entries.pop(key)
+    self._bytes -= size
+
+  def __len__(self) -> int:
+    return len(self._entries)
+
+  def stats(self) -> Dict[str, Any]:
+    with self._lock:
+      lookups = self.hits + self.misses
+      return {
+        "entries": len(self._entries),
+        "bytes": self._bytes,
+        "max_entries": self.max_entries,
+        "max_bytes": self.max_bytes,
+        "ttl_seconds": self.ttl,
+        "hits": self.hits,
+        "misses": self.misses,
+        "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        "evictions": self.evictions,
+        "expirations": self.expirations,
+      }
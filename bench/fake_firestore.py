@@ -0,0 +1,184 @@
+import threading
+import uuid
+from functools import cmp_to_key
+from typing import Any, Dict, List, Optional, Tuple
+
+Path = Tuple[str, ...]
+
+DOCUMENT_ID = "__name__"
+
+
+class FakeDocumentSnapshot:
+    def __init__(self, reference: "FakeDocumentReference", data: Optional[Dict[str, Any]]):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return dict(self._data) if self._data is not None else None
+
+    def get(self, field: str) -> Any:
+        return (self._data or {}).get(field)
+
+
+class FakeDocumentReference:
+    def __init__(self, store: "FakeFirestore", path: Path):
+        self._store = store
+        self.path = path
+        self.id = path[-1]
+
+    def collection(self, name: str) -> "FakeCollectionReference":
+        return FakeCollectionReference(self._store, self.path + (name,))
+
+    def set(self, data: Dict[str, Any], merge: bool = False):
+        self._store._set(self.path, data, merge)
+
+    def delete(self):
+        self._store._delete(self.path)
+
+    def get(self) -> FakeDocumentSnapshot:
+        return FakeDocumentSnapshot(self, self._store._get(self.path))
+
+
+class FakeQuery:
+    def __init__(self, store: "FakeFirestore", path: Path, orders=(), cursor=None, limit=None):
+        self._store = store
+        self._path = path
+        self._orders: Tuple[Tuple[str, str], ...] = tuple(orders)
+        self._cursor: Optional[Dict[str, Any]] = cursor
+        self._limit: Optional[int] = limit
+
+    def _copy(self, **changes) -> "FakeQuery":
+        values = {"orders": self._orders, "cursor": self._cursor, "limit": self._limit}
+        values.update(changes)
+        return FakeQuery(self._store, self._path, **values)
+
+    def select(self, field_paths: List[str]) -> "FakeQuery":
+        # Projections only save bandwidth; the fake returns whole documents.
+        return self._copy()
+
+    def order_by(self, field: str, direction: str = "ASCENDING") -> "FakeQuery":
+        return self._copy(orders=self._orders + ((field, direction),))
+
+    def start_after(self, values: Dict[str, Any]) -> "FakeQuery":
+        return self._copy(cursor=values)
+
+    def limit(self, count: int) -> "FakeQuery":
+        return self._copy(limit=count)
+
+    def _value(self, doc_id: str, data: Dict[str, Any], field: str) -> Any:
+        return doc_id if field == DOCUMENT_ID else data.get(field)
+
+    def _compare(self, a: Tuple[str, Dict[str, Any]], b: Tuple[str, Dict[str, Any]]) -> int:
+        for field, direction in self._orders:
+            left, right = self._value(a[0], a[1], field), self._value(b[0], b[1], field)
+            if left == right:
+                continue
+            result = -1 if left < right else 1
+            return -result if direction == "DESCENDING" else result
+        return 0
+
+    def stream(self):
+        documents = self._store._children(self._path)
+        documents.sort(key=cmp_to_key(self._compare))
+
+        if self._cursor is not None:
+            cursor_id = self._cursor.get(DOCUMENT_ID, "")
+            cursor = (cursor_id.split("/")[-1] if isinstance(cursor_id, str) else cursor_id.id, self._cursor)
+            documents = [doc for doc in documents if self._compare(doc, cursor) > 0]
+
+        if self._limit is not None:
+            documents = documents[:self._limit]
+
+        for doc_id, data in documents:
+            yield FakeDocumentSnapshot(FakeDocumentReference(self._store, self._path + (doc_id,)), data)
+
+
+class FakeCollectionReference(FakeQuery):
+    def __init__(self, store: "FakeFirestore", path: Path):
+        super().__init__(store, path)
+
+    def document(self, document_id: Optional[str] = None) -> FakeDocumentReference:
+        return FakeDocumentReference(self._store, self._path + (document_id or uuid.uuid4().hex[:20],))
+
+    def add(self, data: Dict[str, Any]):
+        reference = self.document()
+        reference.set(data)
+        return None, reference
+
+
+class FakeWriteBatch:
+    def __init__(self, store: "FakeFirestore"):
+        self._store = store
+        self._operations: List[Tuple[str, Path, Optional[Dict[str, Any]]]] = []
+
+    def set(self, reference: FakeDocumentReference, data: Dict[str, Any], merge: bool = False):
+        self._operations.append(("merge" if merge else "set", reference.path, data))
+
+    def delete(self, reference: FakeDocumentReference):
+        self._operations.append(("delete", reference.path, None))
+
+    def commit(self):
+        self._store._commit(self._operations)
+
+
+class FakeFirestore:
+    """
+    In-memory stand-in for the subset of the Firestore client the app uses:
+    nested collections, set/delete, batches, order_by, start_after, limit
+    and stream. Reads and writes are counted so runs can be compared.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._collections: Dict[Path, Dict[str, Dict[str, Any]]] = {}
+        self.reads = 0
+        self.writes = 0
+        self.commits = 0
+
+    def collection(self, name: str) -> FakeCollectionReference:
+        return FakeCollectionReference(self, (name,))
+
+    def batch(self) -> FakeWriteBatch:
+        return FakeWriteBatch(self)
+
+    def _children(self, path: Path) -> List[Tuple[str, Dict[str, Any]]]:
+        with self._lock:
+            documents = [(doc_id, dict(data)) for doc_id, data in self._collections.get(path, {}).items()]
+            self.reads += len(documents)
+            return documents
+
+    def _get(self, path: Path) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self.reads += 1
+            data = self._collections.get(path[:-1], {}).get(path[-1])
+            return dict(data) if data is not None else None
+
+    def _apply(self, operation: str, path: Path, data: Optional[Dict[str, Any]]):
+        collection = self._collections.setdefault(path[:-1], {})
+        if operation == "delete":
+            collection.pop(path[-1], None)
+        elif operation == "merge":
+            collection[path[-1]] = {**collection.get(path[-1], {}), **data}
+        else:
+            collection[path[-1]] = dict(data)
+        self.writes += 1
+
+    def _set(self, path: Path, data: Dict[str, Any], merge: bool):
+        self._commit([("merge" if merge else "set", path, data)])
+
+    def _delete(self, path: Path):
+        self._commit([("delete", path, None)])
+
+    def _commit(self, operations):
+        with self._lock:
+            for operation, path, data in operations:
+                self._apply(operation, path, data)
+            self.commits += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {"reads": self.reads, "writes": self.writes, "commits": self.commits}
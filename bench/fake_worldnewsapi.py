@@ -0,0 +1,97 @@
+import asyncio
+import hashlib
+import random
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FakeWorldNewsApi:
+    """
+    Local stand-in for api.worldnewsapi.com serving recorded fixture articles.
+
+    /search-news returns 'number' fixture articles starting at a position
+    derived from the query text, so different queries see different (but
+    stable) result sets. /extract-news returns the fixture with that URL, or
+    a synthesized article for unknown URLs. Every response waits latency
+    seconds plus up to jitter seconds.
+
+    Args:
+        articles: Fixture articles in WorldNewsAPI format.
+        latency: Base delay per request in seconds.
+        jitter: Maximum extra random delay per request in seconds.
+    """
+
+    def __init__(self, articles: List[Dict[str, Any]], latency: float, jitter: float):
+        self.articles = articles
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = {"search-news": 0, "extract-news": 0}
+
+        self.app = FastAPI()
+        self.app.get("/search-news")(self.search_news)
+        self.app.get("/extract-news")(self.extract_news)
+
+        self.port: Optional[int] = None
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def host(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    async def _delay(self):
+        await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+
+    async def search_news(self, request: Request) -> Dict[str, Any]:
+        self.requests["search-news"] += 1
+        await self._delay()
+
+        params = request.query_params
+        number = int(params.get("number") or 10)
+        offset = int(params.get("offset") or 0)
+        text = params.get("text") or ""
+        start = int(hashlib.sha1(text.encode("utf-8")).hexdigest(), 16) % len(self.articles)
+
+        available = len(self.articles)
+        news = [self.articles[(start + offset + i) % available] for i in range(min(number, max(available - offset, 0)))]
+        return {"available": available, "offset": offset, "number": number, "news": news}
+
+    async def extract_news(self, request: Request) -> Dict[str, Any]:
+        self.requests["extract-news"] += 1
+        await self._delay()
+
+        url = request.query_params.get("url", "")
+        for article in self.articles:
+            if article["url"] == url:
+                return article
+        template = self.articles[int(hashlib.sha1(url.encode("utf-8")).hexdigest(), 16) % len(self.articles)]
+        return {**template, "url": url}
+
+    def start(self):
+        self.port = free_port()
+        config = uvicorn.Config(self.app, host="127.0.0.1", port=self.port, log_level="warning", access_log=False)
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+
+        deadline = time.time() + 10
+        while not self._server.started:
+            if time.time() > deadline:
+                raise RuntimeError("Fake WorldNewsAPI did not start.")
+            time.sleep(0.01)
+
+    def stop(self):
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join(timeout=5)
@@ -0,0 +1,256 @@
+"""
+Offline load test for the News-Agents API.
+
+Runs the real FastAPI app in-process against local stand-ins: a fake
+WorldNewsAPI HTTP server serving fixtures/worldnewsapi.json, a scripted
+ADK model instead of Gemini and an in-memory Firestore. Firebase auth is
+replaced by a dependency override that takes the bearer token as the uid.
+
+For each concurrency level it drives POST /start, GET /sessions and
+GET /sessions/{id}/history and prints a JSON report with p50/p95/p99
+latency, requests per second and peak RSS, tagged with the git commit.
+
+    python bench/run_benchmark.py --concurrency 1,8,32 --requests 100 --output bench.json
+
+Any app setting can be changed through the environment as usual, e.g.
+ARTICLE_INDEX_PATH=/tmp/idx.db to benchmark with the article index on.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+import types
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+APP_DIR = BENCH_DIR.parent / "app"
+sys.path.insert(0, str(BENCH_DIR))
+
+from fake_firestore import FakeFirestore
+from fake_worldnewsapi import FakeWorldNewsApi
+from scripted_llm import ScriptedLlm
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels.")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per endpoint and concurrency level.")
+    parser.add_argument("--users", type=int, default=10, help="Distinct users the requests are spread over.")
+    parser.add_argument("--api-latency", type=float, default=0.05, help="Fake WorldNewsAPI base latency in seconds.")
+    parser.add_argument("--api-jitter", type=float, default=0.02, help="Fake WorldNewsAPI random extra latency in seconds.")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Scripted model latency per call in seconds.")
+    parser.add_argument("--url-ratio", type=float, default=0.3, help="Fraction of /start prompts that are article URLs.")
+    parser.add_argument("--repeat-claims", action="store_true", help="Reuse identical prompts so verdict caches can hit.")
+    parser.add_argument("--fixtures", default=str(BENCH_DIR / "fixtures" / "worldnewsapi.json"))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    return parser.parse_args()
+
+
+def install_fakes(args: argparse.Namespace, fixtures: Dict[str, Any]):
+    fake_api = FakeWorldNewsApi(fixtures["articles"], latency=args.api_latency, jitter=args.api_jitter)
+    fake_api.start()
+
+    os.environ["WORLDNEWSAPI_HOST"] = fake_api.host
+    os.environ.setdefault("WORLDNEWSAPI_API_KEY", "bench")
+    os.environ.setdefault("ARTICLE_INDEX_PATH", "")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    # Skips the Firebase certificate prefetch; tokens never reach Firebase in the benchmark.
+    os.environ.setdefault("FIREBASE_AUTH_EMULATOR_HOST", "localhost:9099")
+
+    fake_db = FakeFirestore()
+    db_module = types.ModuleType("config.db")
+    db_module.db = fake_db
+    sys.modules["config.db"] = db_module
+    sys.path.insert(0, str(APP_DIR))
+    return fake_api, fake_db
+
+
+def build_app(args: argparse.Namespace):
+    from fastapi import Header
+    import main
+    from news_agent import agent
+    from utils.getUser import get_current_user_uid
+
+    llm = ScriptedLlm(latency=args.llm_latency)
+    agent.root_agent.model = llm
+    agent.fact_checker_agent.model = llm
+
+    async def bench_user(authorization: Optional[str] = Header(None)) -> str:
+        return (authorization or "Bearer anonymous").split()[-1]
+
+    main.app.dependency_overrides[get_current_user_uid] = bench_user
+    return main.app
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+async def run_phase(endpoint: str, concurrency: int, total: int, send: Callable[[int], Awaitable[bool]]) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < total:
+            index = next_index
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                ok = await send(index)
+            except Exception as e:
+                print(f"{endpoint} request failed: {type(e).__name__}: {e}", file=sys.stderr)
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        "requests_per_second": round(total / wall, 2) if wall else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+async def wait_for_history_writes(timeout: float = 30.0):
+    from services.history_writer import history_writer
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        stats = history_writer.stats()
+        if stats["queue_depth"] == 0 and stats["committed_turns"] + stats["dropped_turns"] >= stats["submitted_turns"]:
+            return
+        await asyncio.sleep(0.05)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=BENCH_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace, fixtures: Dict[str, Any], app) -> List[Dict[str, Any]]:
+    import httpx
+
+    rng = random.Random(args.seed)
+    claims = fixtures["claims"]
+    urls = [article["url"] for article in fixtures["articles"]]
+    users = [f"bench-user-{i}" for i in range(args.users)]
+    sessions: Dict[str, List[str]] = {user: [] for user in users}
+    results = []
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            for concurrency in [int(level) for level in args.concurrency.split(",") if level.strip()]:
+                level_sessions: List[tuple] = []
+
+                async def start(index: int) -> bool:
+                    user = users[index % len(users)]
+                    if rng.random() < args.url_ratio:
+                        prompt = rng.choice(urls)
+                    else:
+                        prompt = rng.choice(claims)
+                        if not args.repeat_claims:
+                            prompt = f"{prompt} ({concurrency}-{index})"
+                    # Every third turn continues the user's latest session.
+                    session_id = sessions[user][-1] if sessions[user] and index % 3 else None
+                    response = await client.post(
+                        "/start", json={"prompt": prompt, "session_id": session_id},
+                        headers={"Authorization": f"Bearer {user}"}
+                    )
+                    if response.status_code != 200:
+                        return False
+                    new_session = response.json()["session_id"]
+                    if new_session not in sessions[user]:
+                        sessions[user].append(new_session)
+                    level_sessions.append((user, new_session))
+                    return True
+
+                results.append(await run_phase("POST /start", concurrency, args.requests, start))
+                await wait_for_history_writes()
+
+                async def list_sessions(index: int) -> bool:
+                    user = users[index % len(users)]
+                    response = await client.get("/sessions", headers={"Authorization": f"Bearer {user}"})
+                    return response.status_code == 200
+
+                results.append(await run_phase("GET /sessions", concurrency, args.requests, list_sessions))
+
+                async def history(index: int) -> bool:
+                    user, session_id = level_sessions[index % len(level_sessions)]
+                    response = await client.get(f"/sessions/{session_id}/history", headers={"Authorization": f"Bearer {user}"})
+                    return response.status_code == 200
+
+                if level_sessions:
+                    results.append(await run_phase("GET /sessions/{id}/history", concurrency, args.requests, history))
+
+    return results
+
+
+def main():
+    args = parse_args()
+    with open(args.fixtures, encoding="utf-8") as f:
+        fixtures = json.load(f)
+
+    fake_api, fake_db = install_fakes(args, fixtures)
+    # The app's own output goes to stderr so stdout carries only the report.
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            app = build_app(args)
+            results = asyncio.run(run(args, fixtures, app))
+    finally:
+        fake_api.stop()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "config": vars(args),
+        "results": results,
+        "peak_rss_mb": peak_rss_mb(),
+        "fake_worldnewsapi_requests": dict(fake_api.requests),
+        "fake_firestore": fake_db.stats(),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
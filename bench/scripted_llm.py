@@ -0,0 +1,68 @@
+import asyncio
+import re
+from typing import AsyncGenerator
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+SEARCH_NEWS_PARAMS = (
+    "text", "language", "news_sources", "earliest_publish_date", "latest_publish_date", "categories",
+    "authors", "entities", "source_country", "min_sentiment", "max_sentiment", "location_filter",
+    "sort", "sort_direction", "offset", "number", "text_match_indexes",
+)
+URL_LINE = re.compile(r"^URL: (\S+)", re.MULTILINE)
+WORD = re.compile(r"\w{4,}", re.UNICODE)
+
+
+class ScriptedLlm(BaseLlm):
+    """
+    Stand-in for Gemini that answers without any network call.
+
+    When the agent offers search_news and has not called it yet, it returns
+    one scripted search_news call built from the user's words; otherwise it
+    returns a verdict in the fact-checker's output format that cites every
+    URL found in the prompt. Each call waits 'latency' seconds, and streamed
+    calls emit the verdict in 'chunks' partial responses first.
+
+    The model name stays a Gemini name because ADK's google_search tool
+    refuses other models.
+    """
+
+    model: str = "gemini-2.5-flash"
+    latency: float = 0.0
+    chunks: int = 4
+    grounded: bool = True
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        await asyncio.sleep(self.latency)
+
+        last_parts = (llm_request.contents[-1].parts or []) if llm_request.contents else []
+        prompt = " ".join(part.text for part in last_parts if part.text)
+        answered_tool = any(part.function_response for part in last_parts)
+
+        if "search_news" in llm_request.tools_dict and not answered_tool:
+            args = dict.fromkeys(SEARCH_NEWS_PARAMS)
+            args.update(text=" ".join(WORD.findall(prompt)[:4]) or prompt[:50], number=3, compact=True)
+            yield LlmResponse(content=types.Content(
+                role="model", parts=[types.Part(function_call=types.FunctionCall(name="search_news", args=args))]
+            ))
+            return
+
+        urls = URL_LINE.findall(prompt)
+        verdict = "The news is TRUE because the provided articles consistently report the same event.\n\nThe news that support this veredict are:\n"
+        for url in urls:
+            verdict += f"\n- {url}\n- This article reports the main fact of the claim.\n"
+
+        if stream:
+            size = max(1, len(verdict) // self.chunks + 1)
+            for start in range(0, len(verdict), size):
+                yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=verdict[start:start + size])]), partial=True)
+
+        grounding = types.GroundingMetadata(web_search_queries=urls[:1]) if self.grounded and urls else None
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=verdict)]),
+            grounding_metadata=grounding,
+            turn_complete=True
+        )
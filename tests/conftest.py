@@ -0,0 +1,25 @@
+"""
+Unit tests run against the app/ modules directly. Firestore is replaced by
+an empty stand-in module and the article index is disabled, so no Google
+credentials or network access are needed.
+"""
+import os
+import sys
+import types
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+# The benchmark's in-memory Firestore (bench/fake_firestore.py) doubles as the test fake.
+BENCH_DIR = APP_DIR.parent / "bench"
+
+os.environ.setdefault("WORLDNEWSAPI_API_KEY", "test")
+os.environ.setdefault("ARTICLE_INDEX_PATH", "")
+os.environ.setdefault("EXTRACT_CACHE_DB_PATH", "")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("FIREBASE_AUTH_EMULATOR_HOST", "localhost:9099")
+
+db_module = types.ModuleType("config.db")
+db_module.db = None
+sys.modules.setdefault("config.db", db_module)
+sys.path.insert(0, str(APP_DIR))
+sys.path.insert(0, str(BENCH_DIR))
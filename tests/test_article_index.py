@@ -0,0 +1,99 @@
+import time
+
+import pytest
+
+from services.article_index import ArticleIndex, to_fts_query
+
+
+def article(n: int, title: str = "Central bank raises rates", **fields):
+    return {
+        "url": f"https://news.example/{n}",
+        "title": title,
+        "text": f"Story {n} about interest rates and inflation.",
+        "publish_date": "2026-10-01 12:00:00",
+        "language": "en",
+        **fields,
+    }
+
+
+@pytest.fixture
+def index(tmp_path):
+    return ArticleIndex(str(tmp_path / "index.db"), retention_days=30, max_articles=100, freshness=3600)
+
+
+def set_indexed_at(index: ArticleIndex, url: str, seconds_ago: float):
+    index._conn.execute("UPDATE articles SET indexed_at = ? WHERE url = ?", (time.time() - seconds_ago, url))
+    index._conn.commit()
+
+
+@pytest.mark.parametrize("text, columns, expected", [
+    ("tesla ford", None, '"tesla" "ford"'),
+    ("tesla OR ford", None, '"tesla" OR "ford"'),
+    ("tesla -ford", None, '("tesla") NOT ("ford")'),
+    ('"elon musk" -"twitter deal"', None, '("elon musk") NOT ("twitter deal")'),
+    ("tesla OR", None, '"tesla"'),
+    ("tesla", ["title"], '{title} : ("tesla")'),
+    ("tesla -ford", ["title", "text"], '{title text} : (("tesla") NOT ("ford"))'),
+])
+def test_to_fts_query(text, columns, expected):
+    assert to_fts_query(text, columns) == expected
+
+
+@pytest.mark.parametrize("text", ["", "-ford", "OR", '""'])
+def test_to_fts_query_without_positive_terms(text):
+    assert to_fts_query(text) is None
+
+
+def test_search_answers_from_the_index_when_recall_is_enough(index):
+    index.add_articles([article(n) for n in range(3)] + [article(9, title="Football results", text="The derby ended in a draw.")])
+
+    response = index.search({"text": "rates", "number": 3, "language": "en"})
+
+    assert response["available"] == 3
+    assert sorted(item["url"] for item in response["news"]) == [f"https://news.example/{n}" for n in range(3)]
+    assert index.local_hits == 1
+
+
+def test_search_falls_back_when_recall_is_short(index):
+    index.add_articles([article(n) for n in range(2)])
+    assert index.search({"text": "rates", "number": 3}) is None
+    assert index.remote_fallbacks == 1
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"text": "rates", "number": 1, "news_sources": "https://bbc.co.uk"},
+    {"number": 1},
+    {"text": "-rates", "number": 1},
+    {"text": "rates", "number": 1, "earliest_publish_date": "not a date"},
+])
+def test_search_falls_back_on_queries_it_cannot_answer(index, kwargs):
+    index.add_articles([article(0)])
+    assert index.search(kwargs) is None
+
+
+def test_open_ended_window_ignores_stale_hits(index):
+    index.add_articles([article(0)])
+    set_indexed_at(index, "https://news.example/0", seconds_ago=7200)
+
+    # Newer articles may exist upstream, so a stale hit is not trusted...
+    assert index.search({"text": "rates", "number": 1}) is None
+    # ...but a closed window cannot have gained any.
+    closed = index.search({"text": "rates", "number": 1, "latest_publish_date": "2026-10-02 00:00:00"})
+    assert closed["news"][0]["url"] == "https://news.example/0"
+
+
+def test_compact_applies_retention_and_cap(tmp_path):
+    index = ArticleIndex(str(tmp_path / "index.db"), retention_days=1, max_articles=2, freshness=3600)
+    index.add_articles([article(n) for n in range(4)])
+    set_indexed_at(index, "https://news.example/0", seconds_ago=2 * 86400)
+    set_indexed_at(index, "https://news.example/1", seconds_ago=3600)
+    set_indexed_at(index, "https://news.example/2", seconds_ago=60)
+
+    assert index.compact() == 2
+
+    remaining = [row[0] for row in index._conn.execute("SELECT url FROM articles ORDER BY url")]
+    assert remaining == ["https://news.example/2", "https://news.example/3"]
+    assert index.stats()["articles"] == 2
+    # Deleted rows leave the full-text index too.
+    assert index.search({"text": "rates", "number": 3, "latest_publish_date": "2026-10-02 00:00:00"}) is None
+    assert index.search({"text": "rates", "number": 2, "latest_publish_date": "2026-10-02 00:00:00"})["available"] == 2
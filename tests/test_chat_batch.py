@@ -0,0 +1,84 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+import routes.chat_router as chat_router
+from interfaces.IChat import RequestBatchChat
+from services import worldnewsapi_scheduler
+from services.worldnewsapi_scheduler import BATCH
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Stands in for the verification pipeline and Firestore; prompts listed in 'failing' raise."""
+    state = SimpleNamespace(failing=set(), priorities={}, saved=[])
+
+    async def verify(user_id, prompt, session_id, emit=None):
+        state.priorities[prompt] = worldnewsapi_scheduler._priority.get()
+        await asyncio.sleep(0)
+        if prompt in state.failing:
+            raise RuntimeError("pipeline failed")
+        return SimpleNamespace(text=f"verdict for {prompt}", cached=False, cache_age_seconds=None, persist=True)
+
+    async def save_batch_history(user_id, turns):
+        state.saved.append((user_id, turns))
+        return asyncio.sleep(0)
+
+    monkeypatch.setattr(chat_router, "verify", verify)
+    monkeypatch.setattr(chat_router, "save_batch_history_to_firestore", save_batch_history)
+    return state
+
+
+def run_batch(prompts):
+    async def run():
+        response = await chat_router.start_chat_batch(RequestBatchChat(prompts=prompts), user_id="user-1")
+        return [event async for event in response.body_iterator]
+
+    events = []
+    for event in asyncio.run(run()):
+        name, data = event.strip().split("\n", 1)
+        events.append((name.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+def test_batch_over_the_limit_is_rejected(pipeline, monkeypatch):
+    monkeypatch.setattr(chat_router, "BATCH_MAX_ITEMS", 2)
+
+    with pytest.raises(HTTPException) as error:
+        run_batch(["claim one", "claim two", "claim three"])
+
+    assert error.value.status_code == 422
+    assert pipeline.priorities == {}
+
+
+def test_duplicates_count_once_against_the_limit(pipeline, monkeypatch):
+    monkeypatch.setattr(chat_router, "BATCH_MAX_ITEMS", 2)
+
+    events = run_batch(["claim one", "Claim one?", "claim two"])
+
+    assert events[0][1]["duplicates"] == 1
+    assert sorted(data["input_indexes"] for name, data in events if name == "item") == [[0, 1], [2]]
+
+
+def test_failed_item_does_not_stop_the_others(pipeline):
+    pipeline.failing = {"claim two"}
+
+    events = run_batch(["claim one", "claim two", "claim three"])
+
+    names = [name for name, _ in events]
+    assert names[0] == "batch" and names[-1] == "saved"
+    assert sorted(data["item"] for name, data in events if name == "item") == [0, 2]
+    assert [data["input_indexes"] for name, data in events if name == "item_error"] == [[1]]
+    # Only the items that produced a verdict are saved, in input order.
+    (user_id, turns), = pipeline.saved
+    assert [prompt for _, prompt, _ in turns] == ["claim one", "claim three"]
+    assert events[-1][1]["session_ids"] == [session_id for session_id, _, _ in turns]
+
+
+def test_items_run_at_batch_priority(pipeline):
+    run_batch(["claim one", "claim two"])
+
+    assert pipeline.priorities == {"claim one": BATCH, "claim two": BATCH}
@@ -0,0 +1,68 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import routes.chat_router as chat_router
+from interfaces.IChat import RequestChat
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Stands in for the verification pipeline and Firestore; the verdict is held until 'release' is set."""
+    state = SimpleNamespace(release=None, saved=[])
+
+    async def verify(user_id, prompt, session_id, emit):
+        await emit("sources_found", {"sources": []})
+        await state.release.wait()
+        return SimpleNamespace(text="verdict", cached=False, cache_age_seconds=None, persist=True)
+
+    async def create_session(user_id, session_id, prompt):
+        return asyncio.sleep(0)
+
+    async def save_history(user_id, session_id, prompt, text):
+        state.saved.append((user_id, prompt, text))
+        return asyncio.sleep(0)
+
+    monkeypatch.setattr(chat_router, "verify", verify)
+    monkeypatch.setattr(chat_router, "create_new_session_in_firestore", create_session)
+    monkeypatch.setattr(chat_router, "save_chat_history_to_firestore", save_history)
+    return state
+
+
+def event_name(event: str) -> str:
+    return event.split("\n", 1)[0].removeprefix("event: ")
+
+
+def test_stream_sends_verdict_and_saves_the_turn(pipeline):
+    async def run():
+        pipeline.release = asyncio.Event()
+        pipeline.release.set()
+        response = await chat_router.start_chat_stream(RequestChat(prompt="claim"), user_id="user-1")
+        return [event async for event in response.body_iterator]
+
+    events = asyncio.run(run())
+
+    assert [event_name(event) for event in events] == ["session", "sources_found", "verdict", "saved"]
+    assert pipeline.saved == [("user-1", "claim", "verdict")]
+    assert not chat_router._detached_streams
+
+
+def test_disconnected_stream_finishes_and_saves_in_background(pipeline):
+    async def run():
+        pipeline.release = asyncio.Event()
+        response = await chat_router.start_chat_stream(RequestChat(prompt="claim"), user_id="user-1")
+        stream = response.body_iterator
+        assert event_name(await stream.__anext__()) == "session"
+        assert event_name(await stream.__anext__()) == "sources_found"
+        # The client goes away while the pipeline is still running.
+        await stream.aclose()
+        assert pipeline.saved == []
+
+        pipeline.release.set()
+        await asyncio.gather(*chat_router._detached_streams)
+
+    asyncio.run(run())
+
+    assert pipeline.saved == [("user-1", "claim", "verdict")]
+    assert not chat_router._detached_streams
@@ -0,0 +1,179 @@
+import asyncio
+
+import httpx
+import pytest
+
+from services import worldnewsapi_async
+from services.worldnewsapi_scheduler import RateLimitError, WorldNewsApiScheduler
+from utils.circuitBreaker import CircuitBreaker
+
+ARTICLE = {"title": "ECB raises rates", "text": "The European Central Bank raised rates.", "url": "https://slow.example/a"}
+
+
+def test_opens_after_threshold_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60, max_keys=10)
+    breaker.record_failure("a")
+    assert breaker.allow("a")
+    breaker.record_failure("a")
+    assert breaker.is_open("a")
+    assert not breaker.allow("a")
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_single_trial_after_reset_timeout():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0, max_keys=10)
+    breaker.record_failure("a")
+    assert breaker.allow("a")
+    # Only one trial call at a time.
+    assert not breaker.allow("a")
+    breaker.record_success("a")
+    assert not breaker.is_open("a")
+    assert breaker.allow("a") and breaker.allow("a")
+
+
+def test_failed_trial_reopens():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0, max_keys=10)
+    for _ in range(3):
+        breaker.record_failure("a")
+    assert breaker.allow("a")
+    breaker.record_failure("a")
+    assert breaker.is_open("a")
+    assert breaker.stats()["opened"] == 2
+
+
+def test_release_ends_trial_without_verdict():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0, max_keys=10)
+    breaker.record_failure("a")
+    assert breaker.allow("a")
+    breaker.release("a")
+    assert breaker.is_open("a")
+    assert breaker.allow("a")
+
+
+def test_tracks_most_recent_keys_only():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60, max_keys=2)
+    breaker.record_failure("a")
+    breaker.record_failure("b")
+    breaker.record_failure("c")
+    assert not breaker.is_open("a")
+    assert breaker.is_open("b") and breaker.is_open("c")
+
+
+@pytest.fixture
+def extract(monkeypatch):
+    """
+    Runs fetch_article with a fresh breaker and scheduler against scripted
+    WorldNewsAPI answers: a JSON body, an HTTP status, or a float (seconds
+    before the article is returned).
+    """
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0, max_keys=10)
+    scheduler = WorldNewsApiScheduler(
+        rate=1000, burst=1000, max_queue=10, queue_timeout=1, quota_reserve=0, max_retries=1, retry_deadline=1, backoff=0
+    )
+    answers = []
+
+    async def respond(request):
+        answer = answers.pop(0)
+        if isinstance(answer, float):
+            await asyncio.sleep(answer)
+            answer = ARTICLE
+        if isinstance(answer, int):
+            return httpx.Response(answer)
+        return httpx.Response(200, json=answer)
+
+    api = worldnewsapi_async.AsyncWorldNewsApi("https://api.test", "test", max_connections=4, max_keepalive=4, timeout=5, pool_timeout=1)
+    api._client = httpx.AsyncClient(base_url=api.host, transport=httpx.MockTransport(respond))
+
+    monkeypatch.setattr(worldnewsapi_async, "extract_breaker", breaker)
+    monkeypatch.setattr(worldnewsapi_async, "EXTRACT_TIMEOUT", 0.05)
+    monkeypatch.setattr(worldnewsapi_async, "hedge_delay", lambda: None)
+    monkeypatch.setattr(worldnewsapi_async, "article_index", None)
+    monkeypatch.setattr(worldnewsapi_async, "api_scheduler", scheduler)
+    monkeypatch.setattr(worldnewsapi_async, "async_api", api)
+
+    def run(*scripted):
+        answers.extend(scripted)
+        return asyncio.run(worldnewsapi_async.fetch_article(ARTICLE["url"]))
+
+    return breaker, run
+
+
+@pytest.mark.parametrize("answer", [
+    {"title": "Error, malformed request", "text": "Could not extract the article.", "url": ""},
+    {"title": "ECB raises rates", "text": "", "url": ARTICLE["url"]},
+])
+def test_failed_extraction_counts_as_failure(extract, answer):
+    breaker, run = extract
+    assert run(answer) == answer
+    assert breaker.is_open("slow.example")
+
+
+def test_api_error_is_not_held_against_the_publisher(extract):
+    breaker, run = extract
+    for _ in range(3):
+        # The retry is throttled too.
+        assert run(429, 429)["status"] == "error"
+    assert not breaker.is_open("slow.example")
+
+
+def test_api_error_releases_the_trial(extract):
+    breaker, run = extract
+    breaker.record_failure("slow.example")
+    run(503, 503)
+    assert breaker.is_open("slow.example")
+    assert breaker.allow("slow.example")
+
+
+def test_timeout_counts_as_failure(extract):
+    breaker, run = extract
+    with pytest.raises(worldnewsapi_async.ExtractionUnavailable):
+        run(1.0)
+    assert breaker.is_open("slow.example")
+
+
+def test_successful_trial_closes(extract):
+    breaker, run = extract
+    breaker.record_failure("slow.example")
+    assert run(ARTICLE) == ARTICLE
+    assert not breaker.is_open("slow.example")
+
+
+def test_scheduler_wait_is_not_timed(extract, monkeypatch):
+    breaker, run = extract
+
+    async def slow_acquire(priority=None):
+        await asyncio.sleep(0.1)
+
+    monkeypatch.setattr(worldnewsapi_async.api_scheduler, "acquire_async", slow_acquire)
+    assert run(ARTICLE) == ARTICLE
+    assert not breaker.is_open("slow.example")
+
+
+def test_rate_limited_trial_is_released(extract, monkeypatch):
+    breaker, run = extract
+    breaker.record_failure("slow.example")
+
+    async def rejected(priority=None):
+        raise RateLimitError("queue is full")
+
+    monkeypatch.setattr(worldnewsapi_async.api_scheduler, "acquire_async", rejected)
+    with pytest.raises(worldnewsapi_async.ExtractionUnavailable):
+        run()
+    # The trial ended without a verdict: still open, but the next call may try again.
+    assert breaker.is_open("slow.example")
+    assert breaker.allow("slow.example")
+
+
+def test_api_errors_are_retried(extract):
+    breaker, run = extract
+    assert run(503, ARTICLE) == ARTICLE
+    assert worldnewsapi_async.api_scheduler.stats()["retries"] == 1
+    assert not breaker.is_open("slow.example")
+
+
+def test_retries_stop_at_the_extract_deadline(extract, monkeypatch):
+    breaker, run = extract
+    # Every backoff now ends past the 0.05s extract deadline.
+    monkeypatch.setattr(worldnewsapi_async.api_scheduler, "backoff", 1)
+    assert run(429)["status"] == "error"
+    assert worldnewsapi_async.api_scheduler.stats()["retries"] == 0
@@ -0,0 +1,162 @@
+import asyncio
+
+import pytest
+
+from fake_firestore import FakeFirestore
+from services import history_writer
+from services.history_writer import HistoryWriter
+
+
+class FlakyFirestore(FakeFirestore):
+    """Fails the first 'failures' batch commits."""
+
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+
+    def _commit(self, operations):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("unavailable")
+        super()._commit(operations)
+
+
+class StrictFirestore(FakeFirestore):
+    """Rejects every commit that contains an invalid document."""
+
+    def _commit(self, operations):
+        if any(data and data.get("invalid") for _, _, data in operations):
+            raise ValueError("invalid document")
+        super()._commit(operations)
+
+
+@pytest.fixture
+def db():
+    return FakeFirestore()
+
+
+@pytest.fixture
+def writer(db):
+    return HistoryWriter(db, max_queue=10, flush_size=100, flush_interval=0.05, max_retries=2, backoff=0)
+
+
+def turn(db, session: str, messages: int = 2):
+    messages_ref = db.collection("chats").document("u1").collection("sessions").document(session).collection("messages")
+    return [(messages_ref.document(f"m{m}"), {"text": str(m)}) for m in range(messages)]
+
+
+def stored(db, session: str):
+    return db.collection("chats").document("u1").collection("sessions").document(session).collection("messages").document("m0").get().exists
+
+
+def test_turns_queued_together_are_committed_in_one_batch(db, writer):
+    async def run():
+        writer.start()
+        futures = [await writer.submit(turn(db, f"s{s}")) for s in range(3)]
+        await asyncio.gather(*futures)
+        await writer.close()
+
+    asyncio.run(run())
+
+    assert db.commits == 1
+    assert all(stored(db, f"s{s}") for s in range(3))
+    assert writer.stats()["committed_turns"] == 3
+    assert writer.stats()["committed_writes"] == 6
+
+
+def test_flush_size_commits_without_waiting_for_the_interval(db):
+    instance = HistoryWriter(db, max_queue=10, flush_size=2, flush_interval=60, max_retries=2, backoff=0)
+
+    async def run():
+        instance.start()
+        await asyncio.wait_for(await instance.submit(turn(db, "s0")), 1)
+        assert stored(db, "s0")
+        await instance.close()
+
+    asyncio.run(run())
+    assert instance.batches == 1
+
+
+def test_failed_commit_is_retried():
+    db = FlakyFirestore(failures=2)
+    instance = HistoryWriter(db, max_queue=10, flush_size=100, flush_interval=0.05, max_retries=2, backoff=0)
+
+    async def run():
+        instance.start()
+        await (await instance.submit(turn(db, "s0")))
+        await instance.close()
+
+    asyncio.run(run())
+
+    assert stored(db, "s0")
+    assert instance.retries == 2
+    assert instance.dropped_turns == 0
+
+
+def test_turns_are_dropped_after_max_retries():
+    db = FlakyFirestore(failures=10)
+    instance = HistoryWriter(db, max_queue=10, flush_size=100, flush_interval=0.05, max_retries=2, backoff=0)
+
+    async def run():
+        instance.start()
+        future = await instance.submit(turn(db, "s0"))
+        with pytest.raises(RuntimeError):
+            await future
+        await instance.close()
+
+    asyncio.run(run())
+
+    assert not stored(db, "s0")
+    assert instance.retries == 2
+    assert instance.dropped_turns == 1
+
+
+def test_close_writes_everything_still_queued(db):
+    instance = HistoryWriter(db, max_queue=10, flush_size=100, flush_interval=60, max_retries=2, backoff=0)
+
+    async def run():
+        instance.start()
+        futures = [await instance.submit(turn(db, f"s{s}")) for s in range(3)]
+        await instance.close()
+        return futures
+
+    futures = asyncio.run(run())
+
+    assert all(future.done() and future.exception() is None for future in futures)
+    assert all(stored(db, f"s{s}") for s in range(3))
+
+
+def test_submit_writes_synchronously_without_the_worker(db, writer):
+    async def run():
+        future = await writer.submit(turn(db, "s0"))
+        assert future.done()
+
+    asyncio.run(run())
+
+    assert stored(db, "s0")
+    assert writer.submitted == 0
+
+
+def test_one_invalid_turn_does_not_drop_the_rest_of_the_batch(monkeypatch):
+    errors = []
+    monkeypatch.setattr(history_writer.log, "error", lambda event, **fields: errors.append((event, fields)))
+    db = StrictFirestore()
+    instance = HistoryWriter(db, max_queue=10, flush_size=100, flush_interval=0.05, max_retries=1, backoff=0)
+    bad_turn = turn(db, "bad") + [(turn(db, "bad")[0][0], {"invalid": True})]
+
+    async def run():
+        instance.start()
+        futures = [await instance.submit(turn(db, f"s{s}")) for s in range(2)]
+        futures.insert(1, await instance.submit(bad_turn))
+        futures += [await instance.submit(turn(db, f"s{s}")) for s in range(2, 5)]
+        await instance.close()
+        return futures
+
+    futures = asyncio.run(run())
+
+    assert [future.exception() is None for future in futures] == [True, False, True, True, True, True]
+    assert all(stored(db, f"s{s}") for s in range(5))
+    assert not stored(db, "bad")
+    assert instance.stats()["committed_turns"] == 5
+    assert instance.stats()["dropped_turns"] == 1
+    assert [fields["session_ids"] for event, fields in errors if event == "history_turns_dropped"] == [["bad"]]
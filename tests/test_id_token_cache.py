@@ -0,0 +1,117 @@
+import asyncio
+import datetime
+import json
+import time
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt, jwt
+
+from services.id_token_cache import ID_TOKEN_ISSUER_PREFIX, IdTokenCache
+
+PROJECT_ID = "news-agents-test"
+KEY_ID = "test-key"
+
+
+def make_signer_and_cert():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "securetoken")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    pem_key = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+    signer = crypt.RSASigner.from_string(pem_key, key_id=KEY_ID)
+    return signer, cert.public_bytes(serialization.Encoding.PEM).decode("ascii")
+
+
+SIGNER, CERT = make_signer_and_cert()
+
+
+class FakeResponse:
+    def __init__(self, data: bytes, headers):
+        self.status = 200
+        self.headers = headers
+        self.data = data
+
+
+class FakeRequest:
+    """google.auth transport stand-in serving the test certificate."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, url, method="GET", body=None, headers=None, timeout=None, **kwargs):
+        self.calls.append((url, headers))
+        return FakeResponse(json.dumps({KEY_ID: CERT}).encode("utf-8"), {"cache-control": "public, max-age=21600"})
+
+
+def make_token(**overrides):
+    now = int(time.time())
+    claims = {
+        "iss": ID_TOKEN_ISSUER_PREFIX + PROJECT_ID,
+        "aud": PROJECT_ID,
+        "sub": "user-1",
+        "iat": now,
+        "exp": now + 3600,
+    }
+    claims.update(overrides)
+    return jwt.encode(SIGNER, claims).decode("ascii")
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    # conftest points firebase_admin at the emulator; these tests check real signatures.
+    monkeypatch.delenv("FIREBASE_AUTH_EMULATOR_HOST", raising=False)
+    return IdTokenCache(FakeRequest(), PROJECT_ID, max_entries=10, key_refresh_margin=300, key_retry_interval=30)
+
+
+def test_verify_returns_uid_and_caches_it(cache):
+    token = make_token()
+
+    assert asyncio.run(cache.verify(token)) == "user-1"
+    assert asyncio.run(cache.verify(token)) == "user-1"
+    assert cache.verified == 1
+    assert cache.cache.stats()["hits"] == 1
+
+
+@pytest.mark.parametrize("claims", [
+    {"aud": "other-project"},
+    {"iss": ID_TOKEN_ISSUER_PREFIX + "other-project"},
+    {"sub": ""},
+    {"sub": "x" * 129},
+    {"iat": int(time.time()) - 7200, "exp": int(time.time()) - 3600},
+])
+def test_verify_rejects_invalid_claims(cache, claims):
+    with pytest.raises(ValueError):
+        asyncio.run(cache.verify(make_token(**claims)))
+    assert cache.rejected == 1
+    assert cache.cache.stats()["entries"] == 0
+
+
+def test_concurrent_misses_share_one_verification(cache):
+    token = make_token()
+
+    async def verify_many():
+        return await asyncio.gather(*(cache.verify(token) for _ in range(5)))
+
+    assert asyncio.run(verify_many()) == ["user-1"] * 5
+    assert cache.verified == 1
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_fetch_keys_refetches_and_returns_max_age(cache):
+    assert cache._fetch_keys() == 21600
+    url, headers = cache.request.calls[-1]
+    assert "securetoken" in url
+    assert headers == {"Cache-Control": "no-cache"}
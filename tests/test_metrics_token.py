@@ -0,0 +1,35 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routes import metrics_router, stats_router
+from utils import metricsToken
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(metrics_router.metrics_router)
+    app.include_router(stats_router.stats_router)
+    return TestClient(app)
+
+
+def test_endpoints_are_off_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(metricsToken, "METRICS_TOKEN", "")
+    assert client.get("/metrics").status_code == 404
+    assert client.get("/stats", headers={"Authorization": "Bearer anything"}).status_code == 404
+
+
+@pytest.mark.parametrize("authorization", [None, "Bearer wrong", "Basic secret", "secret"])
+def test_wrong_or_missing_token_is_rejected(client, monkeypatch, authorization):
+    monkeypatch.setattr(metricsToken, "METRICS_TOKEN", "secret")
+    headers = {"Authorization": authorization} if authorization else {}
+    assert client.get("/metrics", headers=headers).status_code == 401
+    assert client.get("/stats", headers=headers).status_code == 401
+
+
+def test_valid_token_is_accepted(client, monkeypatch):
+    monkeypatch.setattr(metricsToken, "METRICS_TOKEN", "secret")
+    headers = {"Authorization": "Bearer secret"}
+    assert client.get("/metrics", headers=headers).status_code == 200
+    assert client.get("/stats", headers=headers).status_code == 200
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+import time
+
+from services.news_cache import EXTRACTION_FAILED_SENTINEL, ExtractionCache, is_cacheable_article
+from utils.ttlCache import TTLCache
+
+ARTICLE = {"title": "ECB raises rates", "text": "The European Central Bank raised rates.", "url": "https://news.example/ecb"}
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(ttl=60, max_entries=10)
+    cache.set("a", 1, ttl=0.02)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    time.sleep(0.03)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expirations"]) == (2, 1, 1)
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(ttl=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_byte_bound():
+    cache = TTLCache(ttl=60, max_entries=10, max_bytes=10)
+    cache.set("big", "x" * 20)
+    assert cache.get("big") is None
+    cache.set("a", "aaaa")
+    cache.set("b", "bbbb")
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] <= 10
+
+
+def test_ttl_cache_ignores_non_positive_ttl():
+    cache = TTLCache(ttl=60, max_entries=10)
+    cache.set("a", 1, ttl=0)
+    assert len(cache) == 0
+
+
+def test_only_real_extractions_are_cacheable():
+    assert is_cacheable_article(ARTICLE)
+    assert not is_cacheable_article({"status": "error", "error_message": "boom"})
+    assert not is_cacheable_article({"title": "", "text": "x"})
+    assert not is_cacheable_article({"title": "Error, malformed request", "text": "x"})
+    assert not is_cacheable_article({"title": f"Please {EXTRACTION_FAILED_SENTINEL}", "text": "x"})
+
+
+def test_extraction_cache_keys_by_canonical_url():
+    cache = ExtractionCache(ttl=60, max_entries=10, max_bytes=0)
+    cache.set("https://news.example/ecb?utm_source=feed", ARTICLE)
+    assert cache.get("https://news.example/ecb") == ARTICLE
+    cache.set("https://news.example/error", {"status": "error"})
+    assert cache.get("https://news.example/error") is None
+
+
+def test_disk_tier_survives_restart_and_is_promoted(tmp_path):
+    path = str(tmp_path / "cache.db")
+    ExtractionCache(ttl=60, max_entries=10, max_bytes=0, db_path=path).set(ARTICLE["url"], ARTICLE)
+
+    cache = ExtractionCache(ttl=60, max_entries=10, max_bytes=0, db_path=path)
+    assert cache.get(ARTICLE["url"]) == ARTICLE
+    assert cache.get(ARTICLE["url"]) == ARTICLE
+    assert cache.stats()["disk_hits"] == 1
+    assert cache.stats()["disk_entries"] == 1
+
+
+def test_async_access_keeps_sqlite_off_the_event_loop(tmp_path):
+    cache = ExtractionCache(ttl=60, max_entries=10, max_bytes=0, db_path=str(tmp_path / "cache.db"))
+    threads = []
+    for name in ("get", "set"):
+        method = getattr(cache.disk, name)
+
+        def recording(*args, method=method):
+            threads.append(threading.current_thread())
+            return method(*args)
+
+        setattr(cache.disk, name, recording)
+
+    async def scenario():
+        await cache.set_async(ARTICLE["url"], ARTICLE)
+        cache.memory.clear()
+        return await cache.get_async(ARTICLE["url"]), await cache.get_async(ARTICLE["url"])
+
+    assert asyncio.run(scenario()) == (ARTICLE, ARTICLE)
+    # One commit and one read (the second get is served by the promoted memory entry).
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
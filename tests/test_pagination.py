@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from fake_firestore import FakeFirestore
+from routes import sessions_router
+from services.session_list_cache import SessionListCache, paginate
+from utils.getUser import get_current_user_uid
+from utils.pageCursor import decode_cursor, encode_cursor
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def rows(count):
+    return [{"session_id": f"s{i}", "title": f"t{i}", "created_at": START - timedelta(minutes=i)} for i in range(count)]
+
+
+def test_cursor_round_trip():
+    token = encode_cursor("abc", START)
+    assert "=" not in token
+    assert decode_cursor(token) == {"id": "abc", "at": START}
+
+
+@pytest.mark.parametrize("token", ["", "not-base64!", encode_cursor("a", START)[:-4], "eyJpZCI6ImEifQ"])
+def test_invalid_cursor(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+
+
+def test_paginate_complete_rows():
+    all_rows = rows(5)
+    assert paginate(all_rows, True, None, 2) == (all_rows[:2], True)
+    assert paginate(all_rows, True, {"id": "s1"}, 2) == (all_rows[2:4], True)
+    assert paginate(all_rows, True, {"id": "s3"}, 2) == (all_rows[4:], False)
+    assert paginate(all_rows, True, None, None) == (all_rows, False)
+
+
+def test_paginate_prefix_rows():
+    head = rows(3)
+    assert paginate(head, False, None, 3) == (head, True)
+    # Past the end of a prefix, or a cursor outside it, must go to Firestore.
+    assert paginate(head, False, {"id": "s1"}, 3) is None
+    assert paginate(head, False, {"id": "s9"}, 1) is None
+    assert paginate(head, False, None, None) is None
+
+
+@pytest.fixture
+def client(monkeypatch):
+    db = FakeFirestore()
+    sessions = db.collection("chats").document("u1").collection("sessions")
+    for row in rows(7):
+        sessions.document(row["session_id"]).set({"title": row["title"], "created_at": row["created_at"]})
+    messages = sessions.document("s0").collection("messages")
+    for i in range(5):
+        messages.document(f"m{i}").set({"author": "user", "text": str(i), "timestamp": START + timedelta(seconds=i)})
+
+    monkeypatch.setattr(sessions_router, "db", db)
+    monkeypatch.setattr(sessions_router, "session_list_cache", SessionListCache(enabled=True, ttl=60, max_users=10, depth=3))
+    app = FastAPI()
+    app.include_router(sessions_router.session_router)
+    app.dependency_overrides[get_current_user_uid] = lambda: "u1"
+    return TestClient(app)
+
+
+def test_sessions_without_limit_returns_the_whole_list(client):
+    for _ in range(2):
+        response = client.get("/sessions")
+        assert [session["session_id"] for session in response.json()] == [f"s{i}" for i in range(7)]
+        assert sessions_router.NEXT_PAGE_HEADER not in response.headers
+
+
+def test_sessions_pages_through_header_cursor(client):
+    seen, token = [], None
+    while True:
+        params = {"limit": 2, **({"start_after": token} if token else {})}
+        response = client.get("/sessions", params=params)
+        assert response.status_code == 200
+        seen += [session["session_id"] for session in response.json()]
+        token = response.headers.get(sessions_router.NEXT_PAGE_HEADER)
+        if token is None:
+            break
+    assert seen == [f"s{i}" for i in range(7)]
+
+
+def test_sessions_rejects_bad_cursor(client):
+    assert client.get("/sessions", params={"limit": 2, "start_after": "bogus"}).status_code == 400
+
+
+def test_history_pages_are_opt_in(client):
+    full = client.get("/sessions/s0/history").json()
+    assert [message["text"] for message in full["messages"]] == ["0", "1", "2", "3", "4"]
+    assert full["next_page_token"] is None
+
+    first = client.get("/sessions/s0/history", params={"limit": 3}).json()
+    assert [message["text"] for message in first["messages"]] == ["0", "1", "2"]
+    rest = client.get("/sessions/s0/history", params={"limit": 3, "start_after": first["next_page_token"]}).json()
+    assert [message["text"] for message in rest["messages"]] == ["3", "4"]
+    assert rest["next_page_token"] is None
@@ -0,0 +1,80 @@
+import asyncio
+
+from news_agent.search_fanout import build_query_variants, detect_language, entity_filter, reciprocal_rank_fusion, run_variants
+
+
+def test_detect_language():
+    assert detect_language("Is it true that the ECB raised rates") == "en"
+    assert detect_language("Es verdad que el BCE subió las tasas") == "es"
+    assert detect_language("ECB rates") is None
+
+
+def test_english_variant_only_keeps_names_and_numbers():
+    variants = dict(build_query_variants("¿Es verdad que el Banco de México subió la tasa al 11.25% en 2023?"))
+    assert variants["language"]["language"] == "es"
+    english = variants["english"]
+    assert english["language"] == "en"
+    assert english["text"] == "Banco México 11.25% 2023"
+
+
+def test_english_variant_skips_sentence_initial_word():
+    variants = dict(build_query_variants("Subió el precio de Tesla en Alemania"))
+    assert variants["english"]["text"] == "Tesla Alemania"
+
+
+def test_no_english_variant_without_names():
+    variants = dict(build_query_variants("el precio del pan subió mucho en 2024"))
+    assert "english" not in variants
+    assert variants["keywords"]["text"]
+
+
+def test_no_english_variant_for_english_claims():
+    variants = dict(build_query_variants("Is it true that Elon Musk bought Twitter", "en"))
+    assert set(variants) == {"keywords", "entities", "language"}
+    assert variants["entities"]["entities"] == "PER:Elon Musk"
+
+
+def test_empty_claim_has_no_variants():
+    assert build_query_variants("is it true that") == []
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    a = {"url": "https://a.example/1"}
+    b = {"url": "https://b.example/2"}
+    c = {"url": "https://c.example/3?utm_source=x"}
+    fused = reciprocal_rank_fusion([[a, b], [c, b], [{"url": "https://c.example/3"}]], k=60)
+    assert [article["url"] for article in fused] == [c["url"], b["url"], a["url"]]
+
+
+def test_run_variants_reports_timeouts():
+    async def search(text, number, **filters):
+        if filters.get("language") == "en":
+            await asyncio.sleep(1)
+        return {"news": [{"url": text}]}
+
+    variants = [("keywords", {"text": "a"}), ("english", {"text": "b", "language": "en"})]
+    responses, timed_out = asyncio.run(run_variants(search, variants, number=5, timeout=0.05))
+    assert list(responses) == ["keywords"]
+    assert timed_out == ["english"]
+
+
+def test_entity_filter_types_organizations_and_people():
+    assert entity_filter(["European Central Bank", "Elon Musk"]) == "ORG:European Central Bank,PER:Elon Musk"
+    assert entity_filter(["Banco Santander", "Andrés Manuel López Obrador"]) == "ORG:Banco Santander,PER:Andrés Manuel López Obrador"
+
+
+def test_entity_filter_skips_phrases_that_are_not_names():
+    assert entity_filter(["US President", "White House", "New York", "Tesla"]) is None
+    assert entity_filter(["US President", "Joe Biden"]) == "PER:Joe Biden"
+
+
+def test_untyped_phrase_stays_in_the_search_text():
+    variants = dict(build_query_variants("Is it true that the US President visited Mexico", "en"))
+    assert "entities" not in variants
+
+
+def test_entities_variant_keeps_untyped_phrases_in_text():
+    variants = dict(build_query_variants("Is it true that Joe Biden met the US President Xi", "en"))
+    assert variants["entities"]["entities"] == "PER:Joe Biden"
+    assert '"US President Xi"' in variants["entities"]["text"]
+    assert "Joe Biden" not in variants["entities"]["text"]
@@ -0,0 +1,100 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from fake_firestore import FakeFirestore
+from services.session_deletion import DeletionJob, SessionDeleter
+
+
+@pytest.fixture
+def db():
+    db = FakeFirestore()
+    sessions = db.collection("chats").document("u1").collection("sessions")
+    for s in range(3):
+        session = sessions.document(f"s{s}")
+        session.set({"title": f"t{s}", "created_at": datetime.now(timezone.utc)})
+        for m in range(4):
+            session.collection("messages").document(f"m{m}").set({"author": "user", "text": str(m)})
+    return db
+
+
+@pytest.fixture
+def deleter(db):
+    return SessionDeleter(db, max_in_flight=2, max_sessions_in_flight=2, job_ttl=3600, progress_interval=0, stale_after=60)
+
+
+async def run_job(instance, user_id="u1"):
+    job = await instance.start_delete_all(user_id)
+    await asyncio.gather(*instance._tasks)
+    return job
+
+
+def remaining_sessions(db):
+    return [doc.id for doc in db.collection("chats").document("u1").collection("sessions").stream()]
+
+
+def test_delete_all_status_is_readable_from_another_instance(db, deleter):
+    job = asyncio.run(run_job(deleter))
+    assert remaining_sessions(db) == []
+
+    other = SessionDeleter(db, max_in_flight=2, max_sessions_in_flight=2, job_ttl=3600, progress_interval=0, stale_after=60)
+    stored = asyncio.run(other.get_job(job.job_id, "u1"))
+    assert stored.status == "completed"
+    assert (stored.sessions_total, stored.sessions_deleted, stored.sessions_failed, stored.messages_deleted) == (3, 3, 0, 12)
+    assert stored.finished_at is not None
+    assert asyncio.run(other.get_job(job.job_id, "someone-else")) is None
+
+
+def test_partial_failure_is_reported(db, deleter, monkeypatch):
+    delete_session = deleter.delete_session
+
+    async def flaky(session_ref, on_deleted=None):
+        if session_ref.id == "s1":
+            raise RuntimeError("commit failed")
+        return await delete_session(session_ref, on_deleted)
+
+    monkeypatch.setattr(deleter, "delete_session", flaky)
+    job = asyncio.run(run_job(deleter))
+
+    stored = asyncio.run(deleter.get_job(job.job_id, "u1"))
+    assert stored.status == "partial"
+    assert (stored.sessions_deleted, stored.sessions_failed) == (2, 1)
+    assert "1 of 3" in stored.error
+    assert remaining_sessions(db) == ["s1"]
+    assert deleter.stats()["failed_sessions"] == 1
+
+
+def test_failed_batch_keeps_the_session_document(db, deleter, monkeypatch):
+
+    def failing_commit(references):
+        raise RuntimeError("unavailable")
+
+    monkeypatch.setattr(deleter, "_commit_deletes", failing_commit)
+    session_ref = deleter.sessions_ref("u1").document("s0")
+    with pytest.raises(RuntimeError):
+        asyncio.run(deleter.delete_session(session_ref))
+    assert "s0" in remaining_sessions(db)
+
+
+def test_running_job_is_reused_until_it_goes_stale(db, deleter):
+    running = DeletionJob("u1")
+    deleter._save_job(running)
+
+    assert asyncio.run(deleter.start_delete_all("u1")).job_id == running.job_id
+    assert remaining_sessions(db)
+
+    # The deleter running it died: no progress for longer than stale_after.
+    stale = DeletionJob("u1", running.job_id, started_at=running.started_at - timedelta(minutes=5))
+    deleter.jobs_ref("u1").document(stale.job_id).set({**stale.to_document(), "updated_at": stale.started_at})
+    assert asyncio.run(deleter.get_job(stale.job_id, "u1")).status == "interrupted"
+
+    job = asyncio.run(run_job(deleter))
+    assert job.job_id != running.job_id
+    assert remaining_sessions(db) == []
+
+
+def test_finished_jobs_expire(db):
+    instance = SessionDeleter(db, max_in_flight=2, max_sessions_in_flight=2, job_ttl=0, progress_interval=0, stale_after=60)
+    job = asyncio.run(run_job(instance))
+    assert asyncio.run(instance.get_job(job.job_id, "u1")) is None
@@ -0,0 +1,125 @@
+"""
+BoundedSessionService hooks into InMemorySessionService internals
+(_create_session_impl, _get_session_impl and the self.sessions store), so
+these tests also pin the ADK behavior it relies on; they fail first when an
+ADK upgrade changes it.
+"""
+import asyncio
+import time
+
+from google.adk.events.event import Event
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from news_agent.session_service import BoundedSessionService
+
+APP = "app"
+USER = "u1"
+
+
+def make_event(author: str, text: str) -> Event:
+    role = "user" if author == "user" else "model"
+    return Event(author=author, invocation_id="inv", content=types.Content(role=role, parts=[types.Part(text=text)]))
+
+
+def test_adk_routes_public_calls_through_the_overridden_hooks(monkeypatch):
+    calls = []
+    for name in ("_create_session_impl", "_get_session_impl", "_delete_session_impl"):
+        original = getattr(InMemorySessionService, name)
+        monkeypatch.setattr(InMemorySessionService, name, lambda self, *a, _name=name, _original=original, **k: calls.append(_name) or _original(self, *a, **k))
+
+    service = InMemorySessionService()
+
+    async def run():
+        session = await service.create_session(app_name=APP, user_id=USER, session_id="s1")
+        assert "_create_session_impl" in calls
+        # Sessions are stored as sessions[app][user][id]; the public API hands out copies of them.
+        assert service.sessions[APP][USER]["s1"] is not session
+        calls.clear()
+        await service.get_session(app_name=APP, user_id=USER, session_id="s1")
+        assert calls == ["_get_session_impl"]
+        calls.clear()
+        await service.delete_session(app_name=APP, user_id=USER, session_id="s1")
+        assert "_delete_session_impl" in calls
+        assert "s1" not in service.sessions[APP][USER]
+
+    asyncio.run(run())
+
+
+def test_append_event_updates_the_stored_session():
+    service = InMemorySessionService()
+
+    async def run():
+        session = await service.create_session(app_name=APP, user_id=USER, session_id="s1")
+        await service.append_event(session, make_event("user", "hello"))
+        return service.sessions[APP][USER]["s1"].events
+
+    assert [event.content.parts[0].text for event in asyncio.run(run())] == ["hello"]
+
+
+def test_window_keeps_the_last_turns_starting_at_a_user_event():
+    service = BoundedSessionService(max_sessions=10, idle_ttl=3600, max_bytes=10**7, max_events=4, max_tokens=10**6)
+
+    async def run():
+        session = await service.create_session(app_name=APP, user_id=USER, session_id="s1")
+        for turn in range(4):
+            await service.append_event(session, make_event("user", f"question {turn}"))
+            await service.append_event(session, make_event("agent", f"call {turn}"))
+            await service.append_event(session, make_event("agent", f"answer {turn}"))
+        return await service.get_session(app_name=APP, user_id=USER, session_id="s1")
+
+    session = asyncio.run(run())
+
+    texts = [event.content.parts[0].text for event in session.events]
+    # Four events would split a turn, so only the last whole turn is kept.
+    assert texts == ["question 3", "call 3", "answer 3"]
+    assert service.trimmed_events == 9
+
+
+def test_window_is_also_bounded_by_tokens():
+    service = BoundedSessionService(max_sessions=10, idle_ttl=3600, max_bytes=10**7, max_events=100, max_tokens=300)
+
+    async def run():
+        session = await service.create_session(app_name=APP, user_id=USER, session_id="s1")
+        for turn in range(5):
+            await service.append_event(session, make_event("user", f"question {turn} " + "x" * 200))
+            await service.append_event(session, make_event("agent", f"answer {turn}"))
+        return await service.get_session(app_name=APP, user_id=USER, session_id="s1")
+
+    session = asyncio.run(run())
+
+    assert session.events[0].author == "user"
+    assert session.events[-1].content.parts[0].text == "answer 4"
+    assert len(session.events) < 10
+    assert service.stats()["bytes"] // 4 <= 300
+
+
+def test_least_recently_used_session_is_evicted():
+    service = BoundedSessionService(max_sessions=2, idle_ttl=3600, max_bytes=10**7, max_events=20, max_tokens=10**6)
+
+    async def run():
+        await service.create_session(app_name=APP, user_id=USER, session_id="s1")
+        await service.create_session(app_name=APP, user_id=USER, session_id="s2")
+        assert await service.get_session(app_name=APP, user_id=USER, session_id="s1") is not None
+        await service.create_session(app_name=APP, user_id=USER, session_id="s3")
+        return [await service.get_session(app_name=APP, user_id=USER, session_id=s) for s in ("s1", "s2", "s3")]
+
+    s1, s2, s3 = asyncio.run(run())
+
+    assert s1 is not None and s3 is not None
+    assert s2 is None
+    assert "s2" not in service.sessions[APP][USER]
+    assert service.stats()["evictions"]["lru"] == 1
+
+
+def test_idle_session_is_dropped_on_access():
+    service = BoundedSessionService(max_sessions=10, idle_ttl=0.05, max_bytes=10**7, max_events=20, max_tokens=10**6)
+
+    async def run():
+        await service.create_session(app_name=APP, user_id=USER, session_id="s1")
+        time.sleep(0.1)
+        return await service.get_session(app_name=APP, user_id=USER, session_id="s1")
+
+    assert asyncio.run(run()) is None
+    assert service.stats()["evictions"]["idle"] == 1
+    assert service.stats()["sessions"] == 0
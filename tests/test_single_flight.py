@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from utils.singleFlight import SingleFlight
+
+
+def test_concurrent_calls_share_one_run():
+    flight = SingleFlight()
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def run():
+        return await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["result"] * 5
+    assert len(runs) == 1
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 4}
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+
+    async def run():
+        return await asyncio.gather(flight.do("a", lambda: asyncio.sleep(0, "a")), flight.do("b", lambda: asyncio.sleep(0, "b")))
+
+    assert asyncio.run(run()) == ["a", "b"]
+    assert flight.leaders == 2
+    assert flight.coalesced == 0
+
+
+def test_exception_reaches_every_caller_and_key_is_released():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def run():
+        results = await asyncio.gather(flight.do("key", fail), flight.do("key", fail), return_exceptions=True)
+        assert not flight.is_in_flight("key")
+        # A later call starts a new run rather than reusing the failed one.
+        return results, await flight.do("key", lambda: asyncio.sleep(0, "retried"))
+
+    results, retried = asyncio.run(run())
+
+    assert [type(result) for result in results] == [ValueError, ValueError]
+    assert retried == "retried"
+    assert flight.leaders == 2
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    flight = SingleFlight()
+    release = None
+
+    async def work():
+        await release.wait()
+        return "result"
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        leader = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert flight.is_in_flight("key")
+
+        release.set()
+        return await follower
+
+    assert asyncio.run(run()) == "result"
+    assert flight.coalesced == 1
@@ -0,0 +1,68 @@
+from news_agent.snippets import estimate_tokens, select_snippets, split_sentences, truncate_to_tokens
+
+ECB = {"text": "The European Central Bank raised rates on Thursday. Markets fell after the decision. The weather was mild."}
+FED = {"text": "The Federal Reserve kept rates unchanged. Analysts expect a cut in the spring."}
+
+
+def test_every_article_gets_its_best_sentence():
+    snippets = select_snippets("ECB raised rates", [ECB, FED], 30)
+    assert snippets[0].startswith("The European Central Bank raised rates")
+    assert snippets[1] == "The Federal Reserve kept rates unchanged."
+
+
+def test_filler_skips_sentences_without_query_terms():
+    snippets = select_snippets("Central Bank rates", [ECB], 1000)
+    assert "weather" not in snippets[0]
+
+
+def test_adjacent_and_gapped_sentences_are_joined():
+    article = {"text": "Rates rose today. Rates rose again. Nothing else. Rates may rise later."}
+    snippets = select_snippets("rates rose rise", [article], 1000)
+    assert snippets[0] == "Rates rose today. Rates rose again. ... Rates may rise later."
+
+
+def test_oversized_sentence_is_truncated_not_dropped():
+    # Lowercase/unpunctuated text never splits and becomes one huge "sentence".
+    articles = [{"text": "ECB rates " * 500}, FED]
+    snippets = select_snippets("ECB rates", articles, 100)
+    assert snippets[0] and snippets[1]
+    assert snippets[0].endswith("…")
+    assert sum(estimate_tokens(snippet) for snippet in snippets) <= 100
+
+
+def test_budget_is_shared_between_oversized_articles():
+    articles = [{"text": "alpha " * 400}, {"text": "beta " * 400}]
+    snippets = select_snippets("alpha beta", articles, 50)
+    assert all(snippets)
+    assert sum(estimate_tokens(snippet) for snippet in snippets) <= 50
+
+
+def test_zero_budget_and_empty_articles():
+    assert select_snippets("ECB", [ECB, FED], 0) == ["", ""]
+    assert select_snippets("ECB", [{"text": ""}, {}], 100) == ["", ""]
+
+
+def test_truncate_cuts_at_word_boundary():
+    assert truncate_to_tokens("short", 10) == "short"
+    cut = truncate_to_tokens("one two three four five six", 4)
+    assert cut == "one two three…"
+    assert truncate_to_tokens("x" * 40, 2) == "x" * 7 + "…"
+    assert truncate_to_tokens("anything", 0) == ""
+
+
+def test_split_sentences_keeps_abbreviations_before_lowercase():
+    assert split_sentences("U.S. officials said no. Then they agreed.") == ["U.S. officials said no.", "Then they agreed."]
+
+
+def test_unmatched_articles_get_their_opening_sentences():
+    # A URL query or a claim in another language shares no term with the article.
+    snippets = select_snippets("https://example.com/noticia", [ECB, FED], 1000)
+    assert snippets[0] == ECB["text"]
+    assert snippets[1] == FED["text"]
+
+
+def test_unmatched_articles_only_take_what_matching_ones_left():
+    spanish = {"text": "El banco subió las tasas. Los mercados cayeron. Hizo buen tiempo."}
+    snippets = select_snippets("Central Bank rates", [ECB, spanish], 1000)
+    assert "weather" not in snippets[0]
+    assert snippets[1] == spanish["text"]
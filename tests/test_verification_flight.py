@@ -0,0 +1,27 @@
+import asyncio
+
+from news_agent import agent
+from news_agent.agent import VerificationOutcome
+
+
+def test_identical_requests_share_a_run_only_within_one_user(monkeypatch):
+    runs = []
+
+    async def verify_query(user_id, query, session_id, cleaned_query, url, emit):
+        runs.append((user_id, session_id))
+        await asyncio.sleep(0.01)
+        return VerificationOutcome(text=f"verdict for {user_id}", persist=True)
+
+    monkeypatch.setattr(agent, "verify_query", verify_query)
+
+    async def run():
+        return await asyncio.gather(
+            agent.verify("u1", "Is the claim true?", "s1"),
+            agent.verify("u1", "is the claim true", "s2"),
+            agent.verify("u2", "Is the claim true?", "s3"),
+        )
+
+    outcomes = asyncio.run(run())
+
+    assert runs == [("u1", "s1"), ("u2", "s3")]
+    assert [outcome.text for outcome in outcomes] == ["verdict for u1", "verdict for u1", "verdict for u2"]
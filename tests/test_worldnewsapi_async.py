@@ -0,0 +1,77 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from fake_worldnewsapi import FakeWorldNewsApi
+from services.worldnewsapi_async import AsyncWorldNewsApi
+from services.worldnewsapi_scheduler import RateLimitError
+
+FIXTURES = Path(__file__).resolve().parent.parent / "bench" / "fixtures" / "worldnewsapi.json"
+
+
+@pytest.fixture(scope="module")
+def fake_api():
+    articles = json.loads(FIXTURES.read_text(encoding="utf-8"))["articles"]
+    api = FakeWorldNewsApi(articles, latency=0.3, jitter=0)
+    api.start()
+    yield api
+    api.stop()
+
+
+def one_connection_client(fake_api):
+    return AsyncWorldNewsApi(fake_api.host, "test", max_connections=1, max_keepalive=1, timeout=5, pool_timeout=0.05)
+
+
+def test_pool_timeout_is_returned_as_an_error(fake_api):
+    client = one_connection_client(fake_api)
+
+    async def scenario():
+        try:
+            return await asyncio.gather(
+                client.get("/search-news", {"text": "rates", "number": 1}),
+                client.get("/search-news", {"text": "rates", "number": 1}),
+            )
+        finally:
+            await client.close()
+
+    answers = asyncio.run(scenario())
+    assert sorted("news" in answer for answer in answers) == [False, True]
+    assert [answer["status"] for answer in answers if "news" not in answer] == ["error"]
+    assert client.stats()["pool_timeouts"] == 1
+    assert client.stats()["pool_wait_seconds_max"] >= 0.05
+
+
+def test_pool_timeout_of_a_timed_call_is_local(fake_api):
+    client = one_connection_client(fake_api)
+
+    async def scenario():
+        busy = asyncio.ensure_future(client.get("/search-news", {"text": "rates", "number": 1}))
+        await asyncio.sleep(0.05)
+        try:
+            with pytest.raises(RateLimitError):
+                await client.get("/extract-news", {"url": "https://example.com/a"}, attempt_timeout=5)
+            assert "news" in await busy
+        finally:
+            await client.close()
+
+    asyncio.run(scenario())
+
+
+def test_stats_report_idle_connections_and_pool_wait(fake_api):
+    client = AsyncWorldNewsApi(fake_api.host, "test", max_connections=2, max_keepalive=2, timeout=5, pool_timeout=5)
+
+    async def scenario():
+        try:
+            await asyncio.gather(*(client.get("/search-news", {"text": "rates", "number": 1}) for _ in range(3)))
+            return client.stats()
+        finally:
+            await client.close()
+
+    stats = asyncio.run(scenario())
+    assert stats["open_connections"] == 2
+    assert stats["idle_connections"] == 2
+    # The third request waited for one of the two connections to come back.
+    assert stats["pool_wait_seconds_max"] >= 0.2
+    assert client.stats()["open_connections"] == 0
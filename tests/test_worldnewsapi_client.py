@@ -0,0 +1,56 @@
+import asyncio
+import inspect
+
+import pytest
+
+from services import worldnewsapi_async, worldnewsapi_client
+
+
+@pytest.fixture
+def fake_get(monkeypatch):
+    calls = []
+
+    async def get(path, params, **options):
+        calls.append((path, params, asyncio.get_running_loop()))
+        return {"available": 0, "sources": []}
+
+    monkeypatch.setattr(worldnewsapi_async.async_api, "get", get)
+    return calls
+
+
+def test_sync_wrapper_keeps_tool_signature_and_docs():
+    assert inspect.signature(worldnewsapi_client.search_news) == inspect.signature(worldnewsapi_async.search_news)
+    assert worldnewsapi_client.extract_news.__doc__ == worldnewsapi_async.extract_news.__doc__
+    assert not inspect.iscoroutinefunction(worldnewsapi_client.search_news_sources)
+
+
+def test_runs_standalone_without_app_loop(fake_get):
+    assert worldnewsapi_client.search_news_sources("BBC") == {"available": 0, "sources": []}
+    assert fake_get[0][:2] == ("/search-news-sources", {"name": "BBC"})
+    assert worldnewsapi_async.async_api.loop is None
+
+
+def test_runs_on_app_loop_from_worker_thread(fake_get):
+    async def app():
+        await worldnewsapi_async.async_api.start()
+        try:
+            await asyncio.to_thread(worldnewsapi_client.search_news_sources, "CNN")
+        finally:
+            await worldnewsapi_async.async_api.close()
+        return asyncio.get_running_loop()
+
+    loop = asyncio.run(app())
+    assert fake_get[0][2] is loop
+
+
+def test_refuses_to_block_the_event_loop(fake_get):
+    async def app():
+        await worldnewsapi_async.async_api.start()
+        try:
+            with pytest.raises(RuntimeError):
+                worldnewsapi_client.search_news_sources("CNN")
+        finally:
+            await worldnewsapi_async.async_api.close()
+
+    asyncio.run(app())
+    assert not fake_get
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services.worldnewsapi_scheduler import BATCH, INTERACTIVE, RateLimitError, WorldNewsApiScheduler
+
+
+def test_burst_is_granted_without_queueing():
+    s = WorldNewsApiScheduler(rate=20, burst=3, max_queue=10, queue_timeout=1, quota_reserve=50, max_retries=3, retry_deadline=5, backoff=0.1)
+    for _ in range(3):
+        s.acquire()
+    stats = s.stats()
+    assert stats["granted"] == 3
+    assert stats["waiting"] == 0
+    assert s._dispatcher is None
+
+
+def test_waits_for_refill():
+    s = WorldNewsApiScheduler(rate=20, burst=1, max_queue=10, queue_timeout=1, quota_reserve=50, max_retries=3, retry_deadline=5, backoff=0.1)
+    s.acquire()
+    started = time.monotonic()
+    s.acquire()
+    assert time.monotonic() - started >= 0.03
+    assert s.stats()["waiting"] == 0
+    s.close()
+
+
+def test_queue_timeout_raises_and_frees_the_slot():
+    s = WorldNewsApiScheduler(rate=0.01, burst=1, max_queue=1, queue_timeout=0.05, quota_reserve=50, max_retries=3, retry_deadline=5, backoff=0.1)
+    s.acquire()
+    for _ in range(3):
+        # A waiter that timed out no longer counts against max_queue.
+        with pytest.raises(RateLimitError, match="slot"):
+            s.acquire()
+    stats = s.stats()
+    assert stats["queue_timeouts"] == 3
+    assert stats["rejected"] == 0
+    assert stats["waiting"] == 0
+    assert len(s._queue) <= 1
+    s.close()
+
+
+def test_full_queue_rejects_at_once():
+    s = WorldNewsApiScheduler(rate=0.01, burst=1, max_queue=1, queue_timeout=0.5, quota_reserve=50, max_retries=3, retry_deadline=5, backoff=0.1)
+    s.acquire()
+    waiter = threading.Thread(target=lambda: pytest.raises(RateLimitError, s.acquire))
+    waiter.start()
+    time.sleep(0.05)
+    started = time.monotonic()
+    with pytest.raises(RateLimitError, match="full"):
+        s.acquire()
+    assert time.monotonic() - started < 0.1
+    waiter.join()
+    s.close()
+
+
+def test_cancelled_async_waiter_leaves_the_queue():
+    s = WorldNewsApiScheduler(rate=10, burst=1, max_queue=1, queue_timeout=1, quota_reserve=50, max_retries=3, retry_deadline=5, backoff=0.1)
+
+    async def scenario():
+        await s.acquire_async()
+        waiter = asyncio.ensure_future(s.acquire_async())
+        await asyncio.sleep(0.01)
+        assert s.stats()["waiting"] == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert s.stats()["waiting"] == 0
+        # Once the bucket refills the fast path is open again, with no queueing.
+        await asyncio.sleep(0.15)
+        started = time.monotonic()
+        await s.acquire_async()
+        assert time.monotonic() - started < 0.01
+
+    asyncio.run(scenario())
+    assert s.stats()["queue_timeouts"] == 0
+    s.close()
+
+
+def test_async_timeout():
+    s = WorldNewsApiScheduler(rate=0.01, burst=1, max_queue=10, queue_timeout=0.05, quota_reserve=50, max_retries=3, retry_deadline=5, backoff=0.1)
+
+    async def scenario():
+        await s.acquire_async()
+        with pytest.raises(RateLimitError):
+            await s.acquire_async()
+
+    asyncio.run(scenario())
+    assert s.stats()["waiting"] == 0
+    s.close()
+
+
+def test_interactive_calls_are_served_first():
+    s = WorldNewsApiScheduler(rate=50, burst=1, max_queue=10, queue_timeout=1, quota_reserve=50, max_retries=3, retry_deadline=5, backoff=0.1)
+    s.acquire()
+    order = []
+    threads = []
+    for priority in (BATCH, BATCH, INTERACTIVE):
+        thread = threading.Thread(target=lambda p=priority: (s.acquire(p), order.append(p)))
+        threads.append(thread)
+    # Hold the dispatcher until all three are queued.
+    s.observe_response(429, {"Retry-After": "0.1"})
+    for thread in threads:
+        thread.start()
+        time.sleep(0.01)
+    for thread in threads:
+        thread.join()
+    assert order == [INTERACTIVE, BATCH, BATCH]
+    s.close()
+
+
+def test_quota_reserve_only_lets_interactive_calls_through():
+    s = WorldNewsApiScheduler(rate=20, burst=5, max_queue=10, queue_timeout=1, quota_reserve=50, max_retries=3, retry_deadline=5, backoff=0.1)
+    s.observe_response(200, {"X-API-Quota-Left": "40", "X-API-Quota-Used": "960", "X-API-Quota-Request": "1.5"})
+    with pytest.raises(RateLimitError, match="quota"):
+        s.acquire(BATCH)
+    s.acquire(INTERACTIVE)
+    stats = s.stats()
+    assert stats["quota_left"] == 40
+    assert stats["last_request_points"] == 1.5
+
+
+def test_429_pauses_the_bucket():
+    s = WorldNewsApiScheduler(rate=20, burst=5, max_queue=10, queue_timeout=1, quota_reserve=50, max_retries=3, retry_deadline=5, backoff=0.1)
+    s.observe_response(429, {"Retry-After": "0.1"})
+    started = time.monotonic()
+    s.acquire()
+    assert time.monotonic() - started >= 0.08
+    assert s.stats()["throttled"] == 1
+    s.close()
+
+
+def test_retry_delay():
+    s = WorldNewsApiScheduler(rate=20, burst=1, max_queue=10, queue_timeout=1, quota_reserve=50, max_retries=2, retry_deadline=5, backoff=0.1)
+    deadline = time.monotonic() + 5
+    assert s.retry_delay(400, {}, 0, deadline) is None
+    assert 0.05 <= s.retry_delay(503, {}, 0, deadline) <= 0.15
+    assert s.retry_delay(429, {"Retry-After": "2"}, 1, deadline) >= 2
+    assert s.retry_delay(503, {}, 2, deadline) is None
+    assert s.retry_delay(429, {"Retry-After": "10"}, 0, deadline) is None
+    assert s.stats()["retries"] == 2